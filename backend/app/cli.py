@@ -0,0 +1,118 @@
+"""
+Maintenance commands for HRMS Lite.
+
+Usage:
+    python -m app.cli rebuild-rollups
+    python -m app.cli sync-roster roster.csv [--dry-run] [--keep-missing]
+    python -m app.cli partition-attendance
+    python -m app.cli create-partitions [--months-ahead 3]
+    python -m app.cli detach-partition 2025-01 [--drop]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from app.database import SessionLocal, engine, init_db
+from app.services import partitions, rollups, roster
+
+
+def rebuild_rollups(args):
+    """Recompute attendance_daily_summary from the attendance table"""
+    db = SessionLocal()
+    try:
+        rows = rollups.rebuild(db)
+    finally:
+        db.close()
+    print(f"Rebuilt attendance rollup: {rows} (date, department) rows")
+
+
+def sync_roster(args):
+    """Sync employees with a CSV or JSON roster file"""
+    path = Path(args.roster)
+    roster_format = "csv" if path.suffix.lower() == ".csv" else "json"
+    try:
+        entries = roster.parse_roster(path.read_text(encoding="utf-8-sig"), roster_format)
+        db = SessionLocal()
+        try:
+            report = roster.sync_roster(db, entries, deactivate_missing=not args.keep_missing, dry_run=args.dry_run)
+        finally:
+            db.close()
+    except roster.RosterError as exc:
+        print(f"{exc}:", file=sys.stderr)
+        for error in exc.errors:
+            print(f"  entry {error['index']} {error['field']}: {error['message']}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def partition_attendance(args):
+    """Convert an existing attendance table to monthly partitions"""
+    if engine.dialect.name != "postgresql":
+        print("Attendance partitioning requires PostgreSQL", file=sys.stderr)
+        return 1
+    with engine.begin() as connection:
+        converted = partitions.partition_existing(connection)
+    print("Attendance is now partitioned by month" if converted else "Attendance is already partitioned")
+    return 0
+
+
+def create_partitions(args):
+    """Create the attendance partitions for the coming months"""
+    with engine.begin() as connection:
+        if not partitions.is_partitioned(connection):
+            print("Attendance is not partitioned; run partition-attendance first (PostgreSQL only)", file=sys.stderr)
+            return 1
+        created = partitions.ensure_partitions(connection, args.months_ahead)
+    print(f"Created {len(created)} partition(s)" + "".join(f"\n  {name}" for name in created))
+    return 0
+
+
+def detach_partition(args):
+    """Detach (or drop) one month of attendance"""
+    try:
+        month = datetime.strptime(args.month, "%Y-%m").date()
+        with engine.begin() as connection:
+            name = partitions.detach_partition(connection, month, drop=args.drop)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"{'Dropped' if args.drop else 'Detached'} {name}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="HRMS Lite maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = commands.add_parser("rebuild-rollups", help="Recompute the daily attendance rollup table")
+    rebuild_parser.set_defaults(handler=rebuild_rollups)
+
+    sync_parser = commands.add_parser("sync-roster", help="Sync employees with a CSV or JSON roster file")
+    sync_parser.add_argument("roster", help="Path to the roster (.csv, or .json)")
+    sync_parser.add_argument("--dry-run", action="store_true", help="Report the changes without applying them")
+    sync_parser.add_argument("--keep-missing", action="store_true", help="Do not deactivate employees missing from the roster")
+    sync_parser.set_defaults(handler=sync_roster)
+
+    partition_parser = commands.add_parser("partition-attendance", help="Convert attendance to monthly partitions (PostgreSQL)")
+    partition_parser.set_defaults(handler=partition_attendance)
+
+    create_parser = commands.add_parser("create-partitions", help="Create attendance partitions for the coming months")
+    create_parser.add_argument("--months-ahead", type=int, default=partitions.ATTENDANCE_PARTITION_MONTHS_AHEAD,
+                               help="Months after the current one to create (default %(default)s)")
+    create_parser.set_defaults(handler=create_partitions)
+
+    detach_parser = commands.add_parser("detach-partition", help="Detach one month of attendance from the table")
+    detach_parser.add_argument("month", help="Month to detach, as YYYY-MM")
+    detach_parser.add_argument("--drop", action="store_true", help="Drop the detached partition instead of keeping it as a table")
+    detach_parser.set_defaults(handler=detach_partition)
+
+    args = parser.parse_args(argv)
+    init_db()
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
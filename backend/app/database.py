@@ -1,9 +1,15 @@
 import os
+import random
+import time
 from pathlib import Path
 from dotenv import load_dotenv
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app.pool import InstrumentedQueuePool
 
 # Load .env from backend directory
 env_path = Path(__file__).parent.parent / ".env"
@@ -14,9 +20,73 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
 
-engine = create_engine(DATABASE_URL)
+# Connection pool sizing. FastAPI runs sync routes on a worker thread pool (40 threads by
+# default), so pool_size + max_overflow should cover THREADPOOL_SIZE to avoid queueing on checkout.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "0")) or None
+
+# Opt-in async mode: routes run on an AsyncSession so waiting on the database does not hold a worker thread
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# Optional read replicas (comma-separated URLs). GET routes read from one of them through
+# get_read_db, except for clients that wrote within the last DATABASE_REPLICA_STICKY_SECONDS
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URL", "").split(",") if url.strip()]
+DATABASE_REPLICA_STICKY_SECONDS = float(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "5"))
+PRIMARY_UNTIL_COOKIE = "hrms_primary_until"
+
+def engine_options(url):
+    """Pool arguments for an engine; SQLite keeps SQLAlchemy's own pool choice"""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def replica_engine_options(url):
+    """Pool arguments for a replica engine; PostgreSQL sessions on it refuse writes"""
+    options = engine_options(url)
+    if url.startswith("postgresql"):
+        options["connect_args"] = {"options": "-c default_transaction_read_only=on"}
+    return options
+
+def async_database_url(url):
+    """Swap the URL's driver for its asyncio counterpart (asyncpg / aiosqlite)"""
+    scheme, separator, rest = url.partition("://")
+    backend = scheme.split("+")[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Async mode is not supported for '{backend}' databases")
+    return f"{ASYNC_DRIVERS[backend]}{separator}{rest}"
+
+def async_engine_options(url):
+    """Pool arguments for an async engine; asyncio engines need their own adapted pool class"""
+    options = engine_options(url)
+    options.pop("poolclass", None)
+    return options
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_engines = [create_engine(url, **replica_engine_options(url)) for url in DATABASE_REPLICA_URLS]
+# Bound per session to one of replica_engines; info marks the session as possibly lagging
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, info={"replica": True})
+
+# Objects are read after commit while serializing the response, so they must not expire
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+async_engine = None
+if DATABASE_ASYNC:
+    async_engine = create_async_engine(async_database_url(DATABASE_URL), **async_engine_options(DATABASE_URL))
+    AsyncSessionLocal.configure(bind=async_engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -26,5 +96,57 @@ def get_db():
     finally:
         db.close()
 
+def reads_from_primary(request: Request):
+    """True while the client's last write may not have reached the replicas yet"""
+    try:
+        return float(request.cookies.get(PRIMARY_UNTIL_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+def open_read_session():
+    """New session on a random replica, or on the primary when none is configured"""
+    if not replica_engines:
+        return SessionLocal()
+    return ReplicaSessionLocal(bind=random.choice(replica_engines))
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """Session for read-only routes: a random replica, or the primary session from get_db
+    when no replica is configured or the client wrote recently (read-your-writes)"""
+    if not replica_engines or reads_from_primary(request):
+        yield db
+        return
+    replica = open_read_session()
+    try:
+        yield replica
+    finally:
+        replica.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def dialect_insert(bind, table):
+    """Return an INSERT construct supporting ON CONFLICT for the bind's dialect"""
+    dialect = bind.get_bind().dialect if hasattr(bind, "get_bind") else bind.dialect
+    if dialect.name == "postgresql":
+        return postgresql.insert(table)
+    if dialect.name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported on '{dialect.name}'")
+
 def init_db():
+    from app.services import dedupe, partitions, search
+
     Base.metadata.create_all(bind=engine)
+    # Older databases may hold the duplicates the unique attendance index forbids
+    with engine.begin() as connection:
+        if dedupe.needs_dedupe(connection):
+            dedupe.dedupe_attendance(connection)
+    # create_all skips tables that already exist, so add any indexes introduced since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    with engine.begin() as connection:
+        search.install(connection)
+        partitions.ensure_partitions(connection)
@@ -2,4 +2,10 @@ import enum
 
 class AttendanceStatus(str, enum.Enum):
     PRESENT = "Present"
-    ABSENT = "Absent"
\ No newline at end of file
+    ABSENT = "Absent"
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
@@ -0,0 +1,62 @@
+"""
+Conditional GET support.
+
+A response's ETag is a hash of the request path and query string, the change
+versions of the tables the endpoint reads (see app.services.versions) and, for
+endpoints that depend on the current date, today's date. The dependency runs before
+the endpoint body, so a matching `If-None-Match` returns 304 after a single
+primary-key lookup instead of the full query and serialization.
+
+The async route clones (app.routes.async_routes) swap in an async variant of the
+check that reads the versions through the request's AsyncSession.
+"""
+import hashlib
+from datetime import date
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import get_async_db, get_read_db
+from app.services import versions
+
+# Responses may be stored, but clients must revalidate them on every use
+CACHE_CONTROL = "no-cache"
+
+
+def compute_etag(request, table_versions, daily=False):
+    """Strong ETag for a request given the versions of the tables it reads"""
+    parts = [request.url.path, request.url.query]
+    parts += [f"{table}={version}" for table, version in sorted(table_versions.items())]
+    if daily:
+        parts.append(date.today().isoformat())
+    return '"' + hashlib.sha256("|".join(parts).encode()).hexdigest()[:32] + '"'
+
+
+def if_none_match(header):
+    """Entity tags listed in an If-None-Match header; weak tags compare by their opaque value"""
+    if not header:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def _check(request, response, table_versions, daily):
+    etag = compute_etag(request, table_versions, daily=daily)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    matches = if_none_match(request.headers.get("if-none-match"))
+    if etag in matches or "*" in matches:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+def conditional(*tables, daily=False):
+    """Dependency that sets the ETag and answers 304 when the client's copy is current"""
+    def check_etag(request: Request, response: Response, db: Session = Depends(get_read_db)):
+        _check(request, response, versions.current(db, tables), daily)
+
+    async def check_etag_async(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+        _check(request, response, await db.run_sync(versions.current, tables), daily)
+
+    # Used instead of check_etag on the async route clones
+    check_etag.async_dependency = check_etag_async
+    return Depends(check_etag)
@@ -0,0 +1,247 @@
+"""
+In-process background jobs for heavy reports.
+
+A report request only queues a job and returns its ID (202 Accepted), so the request
+path stays short. The work runs on a small pool of worker threads
+(`REPORT_WORKERS`) with its own session from `read_session_factory` (a replica when
+one is configured), instead of holding a web worker thread and a pooled connection
+for the whole export. Clients poll the job for status and progress and download the
+result once it has succeeded.
+
+- work functions are called as `work(db, out, progress)`: they write the result to
+  the binary file `out` and call `progress(done, total)` as they go
+- results are files under `REPORT_RESULT_DIR`, never held in memory
+- finished jobs and their files are removed `REPORT_RESULT_TTL` seconds after finishing,
+  by a purge that runs on every submission and at most every `PURGE_INTERVAL` seconds
+  from polls, so results expire even when no new job arrives
+- at most `REPORT_MAX_PENDING` jobs may be queued or running per process;
+  `submit` raises `JobQueueFull` beyond that
+- with `REPORT_JOBS_PERSIST=true` job state is also written to `report_jobs` through
+  `session_factory`, so every worker process sharing `REPORT_RESULT_DIR` can answer
+  polls and serve results. Progress writes are throttled to one per second per job
+
+Jobs run in the process that accepted them. Jobs still queued at shutdown are marked
+failed; a job interrupted by a crash keeps its last persisted state.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, select
+
+from app.database import SessionLocal, open_read_session
+from app.enums import JobStatus
+from app.models.report_job import ReportJob
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_MAX_PENDING = int(os.getenv("REPORT_MAX_PENDING", "20"))
+REPORT_RESULT_TTL = float(os.getenv("REPORT_RESULT_TTL", "3600"))
+REPORT_RESULT_DIR = Path(os.getenv("REPORT_RESULT_DIR") or Path(tempfile.gettempdir()) / "hrms-reports")
+REPORT_JOBS_PERSIST = os.getenv("REPORT_JOBS_PERSIST", "false").lower() in ("1", "true", "yes")
+
+# Minimum seconds between persisted progress updates of one job
+PERSIST_INTERVAL = 1.0
+
+# Minimum seconds between purges triggered by polls
+PURGE_INTERVAL = 60.0
+
+ACTIVE = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised by JobRunner.submit when REPORT_MAX_PENDING jobs are already queued or running"""
+
+
+class Job:
+    """Mutable job state; read it through JobRunner, which hands out snapshots"""
+
+    FIELDS = ("id", "kind", "status", "done", "total", "error", "result_path", "media_type",
+              "filename", "created_at", "started_at", "finished_at")
+
+    def __init__(self, kind, media_type, filename):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.status = JobStatus.QUEUED
+        self.done = 0
+        self.total = None
+        self.error = None
+        self.result_path = None
+        self.media_type = media_type
+        self.filename = filename
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.persisted_at = 0.0
+
+    def snapshot(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class JobRunner:
+    """Thread-pool job queue with optional persistence of job state to the database"""
+
+    def __init__(self, workers=REPORT_WORKERS, max_pending=REPORT_MAX_PENDING, result_ttl=REPORT_RESULT_TTL,
+                 result_dir=REPORT_RESULT_DIR, persist=REPORT_JOBS_PERSIST,
+                 session_factory=SessionLocal, read_session_factory=open_read_session):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.result_dir = Path(result_dir)
+        self.persist = persist
+        # Sessions for persisted job state (primary) and for the report queries (replica if any)
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._futures = {}
+        self._executor = None
+        self._purged_at = 0.0
+
+    def submit(self, kind, work, media_type, filename):
+        """Queue `work(db, out, progress)`; returns the new job's snapshot"""
+        self.purge()
+        job = Job(kind, media_type, filename)
+        with self._lock:
+            pending = sum(1 for queued in self._jobs.values() if queued.status in ACTIVE)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} report jobs are already pending")
+            self._jobs[job.id] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report-job")
+            executor = self._executor
+        try:
+            self._persist(job, force=True)
+            self._futures[job.id] = executor.submit(self._run, job, work)
+        except Exception:
+            # A job that never reached the executor would count towards max_pending forever
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise
+        return job.snapshot()
+
+    def get(self, job_id):
+        """Snapshot of a job, from this process or (when persisted) the database; None if unknown or purged"""
+        if time.monotonic() - self._purged_at >= min(PURGE_INTERVAL, self.result_ttl):
+            self.purge()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.snapshot()
+        if not self.persist:
+            return None
+        db = self.session_factory()
+        try:
+            row = db.get(ReportJob, job_id)
+            return {field: getattr(row, field) for field in Job.FIELDS} if row is not None else None
+        finally:
+            db.close()
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job of this process has finished; its outcome is read with get()"""
+        future = self._futures.get(job_id)
+        if future is not None:
+            future.exception(timeout)
+
+    def purge(self):
+        """Forget jobs that finished more than result_ttl seconds ago and delete their results"""
+        self._purged_at = time.monotonic()
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.result_ttl)
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.finished_at is not None and job.finished_at < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+                self._futures.pop(job.id, None)
+        paths = [job.result_path for job in expired]
+
+        if self.persist:
+            db = self.session_factory()
+            try:
+                finished = ReportJob.finished_at < cutoff
+                paths += db.execute(select(ReportJob.result_path).where(finished)).scalars().all()
+                db.execute(delete(ReportJob).where(finished))
+                db.commit()
+            finally:
+                db.close()
+
+        for path in paths:
+            if path:
+                Path(path).unlink(missing_ok=True)
+
+    def clear(self):
+        """Forget every job of this process and delete its results (used by tests)"""
+        self.shutdown()
+        with self._lock:
+            jobs, self._jobs, self._futures = list(self._jobs.values()), {}, {}
+        for job in jobs:
+            if job.result_path:
+                Path(job.result_path).unlink(missing_ok=True)
+
+    def shutdown(self):
+        """Stop accepting work; running jobs finish, queued ones are marked failed"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        for job_id, future in list(self._futures.items()):
+            if future.cancelled():
+                self._finish(self._jobs[job_id], JobStatus.FAILED, error="The server shut down before the job started")
+
+    def _update(self, job, **changes):
+        with self._lock:
+            for field, value in changes.items():
+                setattr(job, field, value)
+
+    def _finish(self, job, status, **changes):
+        self._update(job, status=status, finished_at=datetime.now(timezone.utc), **changes)
+        self._persist(job, force=True)
+
+    def _progress(self, job, done, total=None):
+        self._update(job, done=done, **({"total": total} if total is not None else {}))
+        self._persist(job)
+
+    def _persist(self, job, force=False):
+        if not self.persist:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - job.persisted_at < PERSIST_INTERVAL:
+                return
+            job.persisted_at = now
+            state = job.snapshot()
+        db = self.session_factory()
+        try:
+            db.merge(ReportJob(**state))
+            db.commit()
+        finally:
+            db.close()
+
+    def _run(self, job, work):
+        self._update(job, status=JobStatus.RUNNING, started_at=datetime.now(timezone.utc))
+        self._persist(job, force=True)
+        self.result_dir.mkdir(parents=True, exist_ok=True)
+        path = self.result_dir / job.id
+        try:
+            db = self.read_session_factory()
+            try:
+                with open(path, "wb") as out:
+                    work(db, out, lambda done, total=None: self._progress(job, done, total))
+            finally:
+                db.close()
+        except Exception:
+            logger.exception("Report job %s (%s) failed", job.id, job.kind)
+            path.unlink(missing_ok=True)
+            self._finish(job, JobStatus.FAILED, error="Report generation failed")
+            return
+        self._finish(job, JobStatus.SUCCEEDED, result_path=str(path), done=job.total if job.total is not None else job.done)
+
+
+job_runner = JobRunner()
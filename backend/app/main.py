@@ -1,17 +1,32 @@
 import os
 from contextlib import asynccontextmanager
 
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import init_db
-from .routes import employees_router, attendance_router
+from fastapi.responses import PlainTextResponse
+from . import database
+from .database import engine, async_engine, init_db, DATABASE_ASYNC, THREADPOOL_SIZE
+from .metrics import METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, request_metrics
+from .pool import pool_status
+from .replicas import StickyPrimaryMiddleware
+from . import slow_queries  # noqa: F401  (registers the slow-query Engine hooks)
+from .services.employee_cache import employee_cache
+from .pagination import NEXT_CURSOR_HEADER
+from .jobs import job_runner
+from .routes import employees_router, attendance_router, reports_router, build_async_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
     init_db()
+    if THREADPOOL_SIZE:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     yield
+    job_runner.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title="HRMS Lite API",
@@ -33,11 +48,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
-# Include routers
+# Pins a client's reads to the primary right after it writes (no-op without replicas)
+app.add_middleware(StickyPrimaryMiddleware)
+
+# Added last so it is outermost and times CORS handling too
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Include routers; async clones are registered first so they take precedence
+if DATABASE_ASYNC:
+    app.include_router(build_async_router(employees_router, attendance_router))
 app.include_router(employees_router)
 app.include_router(attendance_router)
+app.include_router(reports_router)
 
 
 @app.get("/")
@@ -52,6 +78,29 @@ def root():
 def health_check():
     return {"status": "healthy", "service": "hrms-lite-api"}
 
+@app.get("/api/health/pool")
+async def pool_health():
+    """Database connection pool usage and checkout wait times"""
+    health = {
+        **pool_status(engine),
+        "threadpool_size": anyio.to_thread.current_default_thread_limiter().total_tokens
+    }
+    if async_engine is not None:
+        health["async_pool"] = pool_status(async_engine.sync_engine)
+    if database.replica_engines:
+        health["replica_pools"] = [pool_status(replica) for replica in database.replica_engines]
+    return health
+
+@app.get("/api/health/cache")
+def cache_health():
+    """Employee cache size and hit/miss counters"""
+    return {"employees": employee_cache.stats()}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Per-route latency, status codes and SQL usage in Prometheus text format"""
+    return PlainTextResponse(request_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
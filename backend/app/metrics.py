@@ -0,0 +1,213 @@
+"""
+Request and SQL instrumentation, exposed in Prometheus text format at `/metrics`.
+
+`MetricsMiddleware` times every HTTP request and labels it with the matched route
+template (`/api/employees/{employee_id}`, never the raw path, so label cardinality
+stays bounded). While a request runs, a context variable holds its statement
+counter; SQLAlchemy `before/after_cursor_execute` hooks on every Engine add each
+statement and its duration to it. The context is copied into the worker thread
+that runs a sync route and into `AsyncSession.run_sync`, so both paths are counted.
+
+Per (method, route) the registry keeps:
+
+- `hrms_http_requests_total` by status code
+- `hrms_http_request_duration_seconds` latency histogram
+- `hrms_db_queries_per_request` histogram of SQL statements per request
+- `hrms_db_queries_total` and `hrms_db_query_duration_seconds_total`
+
+Metrics are per process; with several workers, scrape each one or aggregate in Prometheus.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+# Requests that matched no route share one label instead of one per probed URL
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Prometheus-style histogram; counts are stored per bucket and made cumulative when rendered"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # bisect_left puts a value equal to a bound into that bound's bucket (le semantics)
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestStats:
+    """SQL statements issued on behalf of the current request"""
+
+    __slots__ = ("queries", "db_time", "scope")
+
+    def __init__(self, scope=None):
+        self.queries = 0
+        self.db_time = 0.0
+        self.scope = scope
+
+    @property
+    def route(self):
+        """"METHOD /route/template" once the router has matched the request, else None"""
+        route = self.scope.get("route") if self.scope else None
+        return f"{self.scope['method']} {route.path}" if route is not None else None
+
+
+_current_request: ContextVar = ContextVar("request_stats", default=None)
+
+
+def current_route():
+    """Route template of the request being served on this context, if any"""
+    stats = _current_request.get()
+    return stats.route if stats is not None else None
+
+
+class RequestMetrics:
+    """Thread-safe per-route request and SQL counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)
+            self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+            self.db_time = defaultdict(float)
+
+    def record(self, method, route, status_code, duration, stats):
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, str(status_code))] += 1
+            self.latency[key].observe(duration)
+            self.queries[key].observe(stats.queries)
+            self.db_time[key] += stats.db_time
+
+    def render(self):
+        """The registry in Prometheus text exposition format"""
+        with self._lock:
+            lines = []
+            _family(lines, "hrms_http_requests_total", "counter", "HTTP requests by route and status code")
+            for (method, route, status_code), count in sorted(self.requests.items()):
+                lines.append(_sample("hrms_http_requests_total", {"method": method, "route": route, "status": status_code}, count))
+
+            _family(lines, "hrms_http_request_duration_seconds", "histogram", "HTTP request latency by route")
+            for key, histogram in sorted(self.latency.items()):
+                _histogram(lines, "hrms_http_request_duration_seconds", _route_labels(key), histogram)
+
+            _family(lines, "hrms_db_queries_per_request", "histogram", "SQL statements issued per request by route")
+            for key, histogram in sorted(self.queries.items()):
+                _histogram(lines, "hrms_db_queries_per_request", _route_labels(key), histogram)
+
+            _family(lines, "hrms_db_queries_total", "counter", "SQL statements issued by route")
+            for key, histogram in sorted(self.queries.items()):
+                lines.append(_sample("hrms_db_queries_total", _route_labels(key), int(histogram.sum)))
+
+            _family(lines, "hrms_db_query_duration_seconds_total", "counter", "Time spent executing SQL by route")
+            for key, seconds in sorted(self.db_time.items()):
+                lines.append(_sample("hrms_db_query_duration_seconds_total", _route_labels(key), seconds))
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _route_labels(key):
+    return {"method": key[0], "route": key[1]}
+
+
+def _family(lines, name, metric_type, description):
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} {metric_type}")
+
+
+def _sample(name, labels, value):
+    rendered = ",".join(f'{label}="{_escape(text)}"' for label, text in labels.items())
+    return f"{name}{{{rendered}}} {value}"
+
+
+def _histogram(lines, name, labels, histogram):
+    for bound, count in histogram.cumulative():
+        lines.append(_sample(f"{name}_bucket", {**labels, "le": bound}, count))
+    lines.append(_sample(f"{name}_sum", labels, histogram.sum))
+    lines.append(_sample(f"{name}_count", labels, histogram.count))
+
+
+request_metrics = RequestMetrics()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        # Kept on the execution context, so a statement that fails leaves nothing behind
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    started = getattr(context, "_metrics_started", None)
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL usage per matched route"""
+
+    def __init__(self, app, metrics=request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_request.reset(token)
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            self.metrics.record(
+                scope["method"], getattr(route, "path", UNMATCHED_ROUTE), status_code,
+                time.perf_counter() - started, stats
+            )
@@ -1,4 +1,11 @@
 from .employee import Employee
 from .attendance import Attendance
+from .attendance_summary import AttendanceDailySummary
+from .table_version import TableVersion
+from .report_job import ReportJob
 
-__all__ = ["Employee", "Attendance"]
+__all__ = ["Employee", "Attendance", "AttendanceDailySummary", "TableVersion", "ReportJob"]
+
+# Registers the ORM events that keep attendance rollups in sync, the search index DDL,
+# the table change versions used for ETags and the attendance partition DDL
+from app.services import rollups, search, versions, partitions  # noqa: E402,F401
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -9,9 +9,20 @@ class Attendance(Base):
     __tablename__ = "attendance"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    employee_id = Column(String(36), ForeignKey("employees.id", ondelete="CASCADE"), nullable=False, index=True)
-    date = Column(Date, nullable=False, index=True)
+    employee_id = Column(String(36), ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    # Part of the primary key because PostgreSQL partitions the table by date
+    date = Column(Date, primary_key=True, nullable=False, index=True)
     status = Column(Enum(AttendanceStatus), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    employee = relationship("Employee", back_populates="attendance_records")
+    # Never lazy-load per row: list reads join the employee columns they need, and any new
+    # code path that would issue one SELECT per record fails loudly instead
+    employee = relationship("Employee", back_populates="attendance_records", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # One record per employee per day; also serves lookups by employee_id
+        Index("uq_attendance_employee_date", "employee_id", "date", unique=True),
+        Index("ix_attendance_date_id", "date", "id"),
+        # Monthly partitions are managed by app.services.partitions
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
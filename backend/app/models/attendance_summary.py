@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Date, Integer
+from app.database import Base
+
+class AttendanceDailySummary(Base):
+    """Per-day, per-department attendance counts maintained by app.services.rollups"""
+    __tablename__ = "attendance_daily_summary"
+
+    date = Column(Date, primary_key=True)
+    department = Column(String(100), primary_key=True)
+    present_count = Column(Integer, nullable=False, default=0)
+    absent_count = Column(Integer, nullable=False, default=0)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, DateTime, Boolean
+from sqlalchemy import Column, String, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from app.database import Base
 import uuid
 
@@ -13,7 +14,13 @@ class Employee(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     department = Column(String(100), nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set client-side as well so timestamps keep sub-second precision on every backend,
+    # which keeps (created_at, id) keyset pagination stable
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     attendance_records = relationship("Attendance", back_populates="employee", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_employees_created_at_id", "created_at", "id"),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, Enum, Integer, Text
+from app.database import Base
+from app.enums import JobStatus
+
+class ReportJob(Base):
+    """State of a background report job, written when REPORT_JOBS_PERSIST is enabled (see app.jobs)"""
+    __tablename__ = "report_jobs"
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False)
+    done = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    error = Column(Text)
+    result_path = Column(String(500))
+    media_type = Column(String(100))
+    filename = Column(String(255))
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True), index=True)
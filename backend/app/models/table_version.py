@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, BigInteger
+from app.database import Base
+
+class TableVersion(Base):
+    """Per-table change counter bumped on every commit that writes the table (see app.services.versions)"""
+    __tablename__ = "table_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,65 @@
+"""
+Read-your-writes stickiness for read replicas.
+
+GET routes read through `get_read_db` (app.database), which picks a replica when
+`DATABASE_REPLICA_URL` is set. Replicas lag the primary, so a client that just
+marked attendance could read the list back without its own change.
+`StickyPrimaryMiddleware` prevents that: every successful POST, PUT, PATCH or
+DELETE response sets the `hrms_primary_until` cookie to now +
+`DATABASE_REPLICA_STICKY_SECONDS`, and `get_read_db` serves that client's reads
+from the primary until it expires. Clients that have not written keep reading
+from the replicas.
+
+The cookie is `SameSite=None; Secure` over HTTPS so a frontend on another site
+sends it back with credentialed requests, and `SameSite=Lax` over plain HTTP.
+"""
+import math
+import time
+from http.cookies import SimpleCookie
+
+from app import database
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def read_only(endpoint):
+    """Mark a write-method endpoint that does not write, so its responses keep the client on the replicas"""
+    endpoint.read_only = True
+    return endpoint
+
+
+def primary_until_cookie(until, secure):
+    """Set-Cookie header value pinning the client's reads to the primary until `until` (epoch seconds)"""
+    cookie = SimpleCookie()
+    cookie[database.PRIMARY_UNTIL_COOKIE] = f"{until:.3f}"
+    morsel = cookie[database.PRIMARY_UNTIL_COOKIE]
+    morsel["path"] = "/"
+    morsel["max-age"] = math.ceil(database.DATABASE_REPLICA_STICKY_SECONDS)
+    morsel["httponly"] = True
+    morsel["samesite"] = "None" if secure else "Lax"
+    morsel["secure"] = secure
+    return morsel.OutputString()
+
+
+class StickyPrimaryMiddleware:
+    """ASGI middleware setting the primary-stickiness cookie on successful writes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS or not database.replica_engines:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            # The router has stored the matched endpoint in the scope by the time the response starts
+            writes = not getattr(scope.get("endpoint"), "read_only", False)
+            if message["type"] == "http.response.start" and message["status"] < 400 and writes:
+                header = primary_until_cookie(
+                    time.time() + database.DATABASE_REPLICA_STICKY_SECONDS, scope.get("scheme") == "https"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", header.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,81 @@
+"""
+Fast JSON responses for trusted, already-typed data.
+
+When a route returns plain data, FastAPI validates it against `response_model` and
+then serializes it. For list endpoints whose rows come straight from a column
+projection (or are built by the route itself) that validation repeats work the
+database schema already guarantees, so those routes return `json_response(...)`
+instead: the content is serialized once, by orjson when it is installed, and the
+`response_model` on the route only documents the shape.
+
+`JSON_RESPONSE=json` switches back to the standard library encoder.
+"""
+import json
+import os
+import uuid
+from collections.abc import Mapping
+from datetime import date, datetime
+from enum import Enum
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+JSON_RESPONSE = os.getenv("JSON_RESPONSE", "orjson").lower()
+
+
+def _encode_row(value):
+    # SQLAlchemy RowMapping results are mappings but not dicts
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        # UTC datetimes end in "Z", matching Pydantic's own serializer
+        if value.utcoffset() is not None and not value.utcoffset():
+            return value.replace(tzinfo=None).isoformat() + "Z"
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return _encode_row(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON rendered by orjson; dates, datetimes, enums and UUIDs are encoded natively"""
+
+    def render(self, content):
+        return orjson.dumps(content, default=_encode_row, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+class StdlibJSONResponse(JSONResponse):
+    """Standard library JSON with the same encoding of dates, enums and row mappings as FastJSONResponse"""
+
+    def render(self, content):
+        return json.dumps(content, default=_encode_value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response_class():
+    """The configured response class; falls back to the stdlib encoder without orjson"""
+    if JSON_RESPONSE == "orjson" and orjson is not None:
+        return FastJSONResponse
+    return StdlibJSONResponse
+
+
+JSON_RESPONSE_CLASS = json_response_class()
+
+
+def json_response(content, response=None, status_code=200):
+    """Serialize trusted content directly, keeping headers set on the injected `response`"""
+    rendered = JSON_RESPONSE_CLASS(content, status_code=status_code)
+    if response is not None:
+        rendered.headers.raw.extend(response.headers.raw)
+    return rendered
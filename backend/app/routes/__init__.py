@@ -1,4 +1,6 @@
 from .employees import router as employees_router
 from .attendance import router as attendance_router
+from .reports import router as reports_router
+from .async_routes import build_async_router
 
-__all__ = ["employees_router", "attendance_router"]
+__all__ = ["employees_router", "attendance_router", "reports_router", "build_async_router"]
@@ -0,0 +1,83 @@
+"""
+Async variants of the API routes, used when DATABASE_ASYNC is enabled.
+
+Each sync route is cloned into an `async def` endpoint bound to an AsyncSession.
+The handler body runs through `AsyncSession.run_sync`, which drives the same ORM
+code in a greenlet on the event loop: every database round trip awaits the async
+driver instead of blocking a worker thread, and the query logic stays in one place.
+Route dependencies with an `async_dependency` (the ETag checks) are replaced by it,
+so they share the clone's AsyncSession instead of taking a thread and a sync session.
+"""
+import inspect
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+
+# Streaming responses keep reading from the session after the handler returns,
+# which an AsyncSession cannot do outside run_sync; these stay on the sync path
+SYNC_ONLY_ENDPOINTS = {"export_attendance"}
+
+
+def _async_endpoint(route):
+    endpoint = route.endpoint
+    adapter = TypeAdapter(route.response_model) if route.response_model else None
+
+    async def handler(**kwargs):
+        db = kwargs.pop("db")
+
+        def call(session):
+            result = endpoint(**kwargs, db=session)
+            if adapter is None or isinstance(result, Response):
+                return result
+            # Serialize while lazy loads can still run inside the greenlet
+            return adapter.validate_python(result, from_attributes=True)
+
+        return await db.run_sync(call)
+
+    signature = inspect.signature(endpoint)
+    handler.__signature__ = signature.replace(parameters=[
+        parameter.replace(annotation=AsyncSession, default=Depends(get_async_db))
+        if name == "db" else parameter
+        for name, parameter in signature.parameters.items()
+    ])
+    handler.__name__ = endpoint.__name__
+    handler.__doc__ = endpoint.__doc__
+    # Markers such as replicas.read_only
+    handler.__dict__.update(endpoint.__dict__)
+    return handler
+
+
+def _async_dependencies(dependencies):
+    return [
+        Depends(getattr(dependency.dependency, "async_dependency", dependency.dependency), use_cache=dependency.use_cache)
+        for dependency in dependencies
+    ]
+
+
+def build_async_router(*routers):
+    """Clone the database-backed routes of `routers` into async endpoints"""
+    async_router = APIRouter()
+    for router in routers:
+        for route in router.routes:
+            if not isinstance(route, APIRoute) or route.endpoint.__name__ in SYNC_ONLY_ENDPOINTS:
+                continue
+            if "db" not in inspect.signature(route.endpoint).parameters:
+                continue
+            async_router.add_api_route(
+                route.path,
+                _async_endpoint(route),
+                methods=list(route.methods),
+                response_model=route.response_model,
+                status_code=route.status_code,
+                response_class=route.response_class,
+                name=route.name,
+                tags=route.tags,
+                dependencies=_async_dependencies(route.dependencies),
+                # The sync routes stay registered and document the API
+                include_in_schema=False,
+            )
+    return async_router
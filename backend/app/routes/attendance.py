@@ -1,199 +1,478 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from typing import List, Optional
-from datetime import date, datetime
-from app.database import get_db
+from sqlalchemy import and_, func, select, tuple_, update
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta
+import csv
+import io
+import json
+import uuid
+from app.database import get_db, get_read_db, dialect_insert
+from app.etag import conditional
+from app.pagination import decode_cursor, set_next_cursor
+from app.responses import json_response
 from app.models.employee import Employee
 from app.models.attendance import Attendance, AttendanceStatus
-from app.schemas.attendance import AttendanceCreate, AttendanceResponse, AttendanceWithEmployeeName
+from app.models.attendance_summary import AttendanceDailySummary
+from app.schemas.attendance import (
+    AttendanceCreate, AttendanceResponse, AttendanceWithEmployeeName,
+    AttendanceBulkCreate, AttendanceBulkItemResult, AttendanceBulkResponse, AttendanceMatrixResponse
+)
+from app.services import matrix, partitions, rollups
+from app.services.employee_cache import employee_cache
 
 router = APIRouter(prefix="/api/attendance", tags=["Attendance"])
 
+# List reads select exactly the response columns as plain rows instead of hydrating ORM instances
+ATTENDANCE_RESPONSE_COLUMNS = [
+    Attendance.id,
+    Attendance.employee_id,
+    Employee.full_name.label("employee_name"),
+    Employee.employee_id.label("employee_employee_id"),
+    Attendance.date,
+    Attendance.status,
+    Attendance.created_at,
+]
+
 @router.post("/", response_model=AttendanceResponse, status_code=status.HTTP_201_CREATED)
-def mark_attendance(attendance: AttendanceCreate, db: Session = Depends(get_db)):
+def mark_attendance(
+    attendance: AttendanceCreate,
+    response: Response,
+    upsert: bool = Query(False, description="Overwrite the status if attendance is already marked for the date"),
+    db: Session = Depends(get_db)
+):
     """Mark attendance for an employee on a specific date"""
     
     # Verify employee exists
-    employee = db.query(Employee).filter(
-        Employee.id == attendance.employee_id,
-        Employee.is_active == True
-    ).first()
+    employee = employee_cache.get(db, attendance.employee_id)
     
-    if not employee:
+    if not employee or not employee.is_active:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{attendance.employee_id}' not found"
         )
     
-    # Check if attendance already marked for this date
-    existing = db.query(Attendance).filter(
-        Attendance.employee_id == attendance.employee_id,
-        Attendance.date == attendance.date
-    ).first()
+    # The unique (employee_id, date) index makes duplicate detection part of the insert itself
+    returned = (Attendance.id, Attendance.date, Attendance.status, Attendance.created_at)
+    same_day = and_(Attendance.employee_id == attendance.employee_id, Attendance.date == attendance.date)
+    stmt = dialect_insert(db, Attendance.__table__).values(
+        employee_id=attendance.employee_id,
+        date=attendance.date,
+        status=attendance.status
+    ).on_conflict_do_nothing(index_elements=[Attendance.employee_id, Attendance.date])
+    record = db.execute(stmt.returning(*returned)).first()
+    
+    previous_status = None
+    if record is None and upsert:
+        # Lock the existing row before reading its status, so concurrent upserts of the
+        # same day each subtract the status they actually replaced from the rollup
+        previous_status = db.execute(select(Attendance.status).where(same_day).with_for_update()).scalar()
+        if previous_status is not None:
+            record = db.execute(
+                update(Attendance.__table__).where(same_day).values(status=attendance.status).returning(*returned)
+            ).first()
     
-    if existing:
+    if record is None:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Attendance already marked for employee '{employee.employee_id}' on {attendance.date}"
         )
     
-    # Create attendance record
-    db_attendance = Attendance(
-        employee_id=attendance.employee_id,
-        date=attendance.date,
-        status=attendance.status
-    )
-    db.add(db_attendance)
+    # Core inserts bypass the ORM events, so keep the rollup in step here
+    deltas = rollups.new_deltas()
+    if previous_status is not None:
+        rollups.add_delta(deltas, attendance.date, employee.department, previous_status, -1)
+        response.status_code = status.HTTP_200_OK
+    rollups.add_delta(deltas, attendance.date, employee.department, attendance.status)
+    rollups.apply_deltas(db, deltas)
     db.commit()
-    db.refresh(db_attendance)
     
     return AttendanceResponse(
-        id=db_attendance.id,
-        employee_id=db_attendance.employee_id,
+        id=record.id,
+        employee_id=attendance.employee_id,
         employee_name=employee.full_name,
         employee_employee_id=employee.employee_id,
-        date=db_attendance.date,
-        status=db_attendance.status,
-        created_at=db_attendance.created_at
+        date=record.date,
+        status=record.status,
+        created_at=record.created_at
     )
 
-@router.get("/", response_model=List[AttendanceWithEmployeeName])
+@router.post("/bulk", response_model=AttendanceBulkResponse)
+def mark_attendance_bulk(payload: AttendanceBulkCreate, db: Session = Depends(get_db)):
+    """Mark attendance for many employees at once, reporting a result per item"""
+    items = payload.items
+    
+    # Resolve every referenced employee with a single IN query
+    employee_ids = {item.employee_id for item in items}
+    departments = dict(db.execute(
+        select(Employee.id, Employee.department).where(
+            Employee.id.in_(employee_ids),
+            Employee.is_active == True
+        )
+    ).all())
+    
+    # Only the first occurrence of an (employee, date) pair in the batch is inserted
+    rows = {}
+    for index, item in enumerate(items):
+        key = (item.employee_id, item.date)
+        if item.employee_id in departments and key not in rows:
+            rows[key] = (index, {"id": str(uuid.uuid4()), "employee_id": item.employee_id, "date": item.date, "status": item.status})
+    
+    inserted = set()
+    if rows:
+        # One multi-row INSERT; pairs that are already marked are skipped by the unique index
+        stmt = dialect_insert(db, Attendance.__table__).values([row for _, row in rows.values()])
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Attendance.employee_id, Attendance.date])
+        inserted = set(db.execute(stmt.returning(Attendance.id)).scalars().all())
+    
+    results = []
+    deltas = rollups.new_deltas()
+    for index, item in enumerate(items):
+        result = AttendanceBulkItemResult(index=index, employee_id=item.employee_id, date=item.date, result="created")
+        first_index, row = rows.get((item.employee_id, item.date), (None, None))
+        if item.employee_id not in departments:
+            result.result = "not_found"
+            result.detail = f"Employee with ID '{item.employee_id}' not found"
+        elif first_index != index or row["id"] not in inserted:
+            result.result = "conflict"
+            result.detail = f"Attendance already marked on {item.date}"
+        else:
+            result.id = row["id"]
+            rollups.add_delta(deltas, item.date, departments[item.employee_id], item.status)
+        results.append(result)
+    
+    if rows:
+        # Core inserts bypass the ORM events, so the rollup is updated explicitly
+        rollups.apply_deltas(db, deltas)
+        db.commit()
+    
+    return AttendanceBulkResponse(
+        created=sum(1 for r in results if r.result == "created"),
+        conflicts=sum(1 for r in results if r.result == "conflict"),
+        not_found=sum(1 for r in results if r.result == "not_found"),
+        results=results
+    )
+
+@router.get("/", response_model=List[AttendanceWithEmployeeName], dependencies=[conditional(Attendance.__tablename__, Employee.__tablename__)])
 def get_attendance_records(
+    response: Response,
     employee_id: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[AttendanceStatus] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_read_db)
 ):
     """Get attendance records with optional filtering"""
-    query = db.query(Attendance).join(Employee).filter(Employee.is_active == True)
+    query = select(*ATTENDANCE_RESPONSE_COLUMNS).join(Employee, Employee.id == Attendance.employee_id).where(Employee.is_active == True)
     
     if employee_id:
-        query = query.filter(Attendance.employee_id == employee_id)
+        query = query.where(Attendance.employee_id == employee_id)
     
     if start_date:
-        query = query.filter(Attendance.date >= start_date)
+        query = query.where(Attendance.date >= start_date)
     
     if end_date:
-        query = query.filter(Attendance.date <= end_date)
+        query = query.where(Attendance.date <= end_date)
     
     if status:
-        query = query.filter(Attendance.status == status)
-    
-    records = query.order_by(Attendance.date.desc()).offset(skip).limit(limit).all()
-    
-    return [
-        AttendanceWithEmployeeName(
-            id=record.id,
-            employee_id=record.employee_id,
-            employee_name=record.employee.full_name,
-            employee_employee_id=record.employee.employee_id,
-            date=record.date,
-            status=record.status,
-            created_at=record.created_at
-        )
-        for record in records
-    ]
+        query = query.where(Attendance.status == status)
+    
+    if cursor:
+        # Keyset pagination: seek past the last (date, id) seen instead of scanning an offset.
+        # The plain date bound lets PostgreSQL prune later month partitions; row comparisons do not
+        cursor_date, cursor_id = decode_cursor(cursor, date.fromisoformat, str)
+        query = query.where(Attendance.date <= cursor_date, tuple_(Attendance.date, Attendance.id) < (cursor_date, cursor_id))
+        skip = 0
+    
+    records = db.execute(
+        query.order_by(Attendance.date.desc(), Attendance.id.desc()).offset(skip).limit(limit)
+    ).mappings().all()
+    set_next_cursor(response, records, limit, lambda r: (r["date"], r["id"]))
+    # Rows match AttendanceWithEmployeeName column for column, so they are serialized without re-validation
+    return json_response(records, response)
+
+EXPORT_COLUMNS = ["id", "employee_id", "employee_code", "employee_name", "department", "date", "status", "created_at"]
+EXPORT_BATCH_SIZE = 1000
+
+def export_statement(employee_id=None, department=None, start_date=None, end_date=None, status=None):
+    """Attendance export rows with their employee columns, oldest first"""
+    stmt = select(
+        Attendance.id,
+        Attendance.employee_id,
+        Employee.employee_id.label("employee_code"),
+        Employee.full_name.label("employee_name"),
+        Employee.department,
+        Attendance.date,
+        Attendance.status,
+        Attendance.created_at
+    ).join(Employee, Employee.id == Attendance.employee_id).where(Employee.is_active == True)
+    
+    if employee_id:
+        stmt = stmt.where(Attendance.employee_id == employee_id)
+    
+    if department:
+        stmt = stmt.where(Employee.department == department)
+    
+    if start_date:
+        stmt = stmt.where(Attendance.date >= start_date)
+    
+    if end_date:
+        stmt = stmt.where(Attendance.date <= end_date)
+    
+    if status:
+        stmt = stmt.where(Attendance.status == status)
+    
+    return stmt.order_by(Attendance.date, Attendance.id)
+
+def export_chunks(result, export_format, on_partition=None):
+    """Encode a streamed result one partition at a time so memory stays flat;
+    `on_partition(rows)` is called with each partition's row count once it is encoded"""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+    
+    for partition in result.partitions():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if export_format == "csv" else None
+        for row in partition:
+            values = [
+                row.id, row.employee_id, row.employee_code, row.employee_name, row.department,
+                row.date.isoformat(), AttendanceStatus(row.status).value,
+                row.created_at.isoformat() if row.created_at else None
+            ]
+            if writer:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))))
+                buffer.write("\n")
+        if on_partition:
+            on_partition(len(partition))
+        yield buffer.getvalue()
+    result.close()
+
+@router.get("/export")
+def export_attendance(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    employee_id: Optional[str] = None,
+    department: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[AttendanceStatus] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Stream attendance records as CSV or NDJSON without loading them into memory"""
+    stmt = export_statement(employee_id, department, start_date, end_date, status)
+    
+    # yield_per turns on a server-side cursor (stream_results) where the driver supports it
+    result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"attendance-{date.today():%Y%m%d}.{export_format}"
+    return StreamingResponse(
+        export_chunks(result, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
-@router.get("/employee/{employee_id}", response_model=List[AttendanceWithEmployeeName])
+@router.get("/employee/{employee_id}", response_model=List[AttendanceWithEmployeeName], dependencies=[conditional(Attendance.__tablename__, Employee.__tablename__)])
 def get_employee_attendance(
     employee_id: str,
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all attendance records for a specific employee"""
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+    employee = employee_cache.get(db, employee_id)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found"
         )
     
-    query = db.query(Attendance).filter(Attendance.employee_id == employee_id)
+    # The employee's name comes from the cache, so only attendance columns are selected
+    query = select(Attendance.id, Attendance.employee_id, Attendance.date, Attendance.status, Attendance.created_at).where(
+        Attendance.employee_id == employee_id
+    )
     
     if start_date:
-        query = query.filter(Attendance.date >= start_date)
+        query = query.where(Attendance.date >= start_date)
     
     if end_date:
-        query = query.filter(Attendance.date <= end_date)
-    
-    records = query.order_by(Attendance.date.desc()).all()
-    
-    return [
-        AttendanceWithEmployeeName(
-            id=record.id,
-            employee_id=record.employee_id,
-            employee_name=employee.full_name,
-            employee_employee_id=employee.employee_id,
-            date=record.date,
-            status=record.status,
-            created_at=record.created_at
-        )
+        query = query.where(Attendance.date <= end_date)
+    
+    records = db.execute(query.order_by(Attendance.date.desc())).mappings().all()
+    
+    return json_response([
+        {**record, "employee_name": employee.full_name, "employee_employee_id": employee.employee_id}
         for record in records
-    ]
+    ], response)
 
-@router.delete("/{attendance_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_attendance(attendance_id: str, db: Session = Depends(get_db)):
-    """Delete an attendance record"""
-    record = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+RECORD_DATE_DESCRIPTION = "Date of the record; lets PostgreSQL look it up in a single month partition"
+
+def get_record_or_404(db, attendance_id, attendance_date=None):
+    """Load an attendance record by id, narrowed to its date when the client knows it"""
+    # Without the date, a partitioned table probes the (id, date) primary key of every partition
+    query = db.query(Attendance).filter(Attendance.id == attendance_id)
+    if attendance_date is not None:
+        query = query.filter(Attendance.date == attendance_date)
+    record = query.first()
     if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Attendance record with ID '{attendance_id}' not found"
         )
+    return record
+
+@router.delete("/{attendance_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_attendance(
+    attendance_id: str,
+    attendance_date: Optional[date] = Query(None, alias="date", description=RECORD_DATE_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
+    """Delete an attendance record"""
+    record = get_record_or_404(db, attendance_id, attendance_date)
     
     db.delete(record)
     db.commit()
     return None
 
-@router.get("/today")
-def get_today_attendance(db: Session = Depends(get_db)):
-    """Get today's attendance status for all employees"""
+NOT_MARKED = "Not Marked"
+
+@router.get("/today", dependencies=[conditional(Attendance.__tablename__, Employee.__tablename__, daily=True)])
+def get_today_attendance(
+    response: Response,
+    department: Optional[str] = None,
+    status: Optional[Literal["Present", "Absent", "Not Marked"]] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_read_db)
+):
+    """Get today's attendance status for active employees"""
     today = date.today()
     
-    # Get all active employees
-    employees = db.query(Employee).filter(Employee.is_active == True).all()
+    # One LEFT JOIN: employees without a record for today come back with a NULL status
+    query = select(
+        Employee.id, Employee.employee_id, Employee.full_name, Employee.department, Attendance.status
+    ).outerjoin(
+        Attendance, and_(Attendance.employee_id == Employee.id, Attendance.date == today)
+    ).where(Employee.is_active == True)
+    
+    if department:
+        query = query.where(Employee.department == department)
+    
+    if status == NOT_MARKED:
+        query = query.where(Attendance.id.is_(None))
+    elif status:
+        query = query.where(Attendance.status == AttendanceStatus(status))
     
-    # Get today's attendance records
-    today_records = db.query(Attendance).filter(Attendance.date == today).all()
-    attendance_map = {r.employee_id: r.status for r in today_records}
+    if cursor:
+        # Keyset pagination on the unique employee code
+        query = query.where(Employee.employee_id > decode_cursor(cursor, str)[0])
+        skip = 0
     
-    result = []
-    for emp in employees:
-        result.append({
-            "employee_id": emp.id,
-            "employee_code": emp.employee_id,
-            "full_name": emp.full_name,
-            "department": emp.department,
+    rows = db.execute(query.order_by(Employee.employee_id).offset(skip).limit(limit)).all()
+    set_next_cursor(response, rows, limit, lambda row: (row.employee_id,))
+    
+    return json_response([
+        {
+            "employee_id": row.id,
+            "employee_code": row.employee_id,
+            "full_name": row.full_name,
+            "department": row.department,
             "date": today,
-            "status": attendance_map.get(emp.id, "Not Marked")
-        })
+            "status": row.status or NOT_MARKED
+        }
+        for row in rows
+    ], response)
+
+@router.get("/trend", dependencies=[conditional(AttendanceDailySummary.__tablename__, daily=True)])
+def get_attendance_trend(
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get daily present/absent totals from the attendance rollup (defaults to the last 30 days)"""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=29)
+    
+    query = db.query(
+        AttendanceDailySummary.date,
+        func.sum(AttendanceDailySummary.present_count).label("present"),
+        func.sum(AttendanceDailySummary.absent_count).label("absent")
+    ).filter(
+        AttendanceDailySummary.date >= start_date,
+        AttendanceDailySummary.date <= end_date
+    )
+    
+    if department:
+        query = query.filter(AttendanceDailySummary.department == department)
+    
+    rows = query.group_by(AttendanceDailySummary.date).order_by(AttendanceDailySummary.date).all()
     
-    return result
+    return json_response([
+        {
+            "date": row.date,
+            "present": row.present,
+            "absent": row.absent,
+            "attendance_rate": round(row.present / (row.present + row.absent) * 100, 2) if row.present + row.absent else 0
+        }
+        for row in rows
+    ], response)
+
+@router.get("/matrix", response_model=AttendanceMatrixResponse, dependencies=[conditional(Attendance.__tablename__, Employee.__tablename__, daily=True)])
+def get_attendance_matrix(
+    response: Response,
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="YYYY-MM (defaults to the current month)"),
+    department: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get a month of attendance as one status string per active employee"""
+    first_day = datetime.strptime(month, "%Y-%m").date() if month else date.today().replace(day=1)
+    
+    # Month bounds in the join keep employees without records and let PostgreSQL prune to one partition;
+    # grouping by employee returns one packed month per employee rather than one row per record
+    query = select(
+        Employee.id, Employee.employee_id, Employee.full_name, Employee.department, matrix.packed_month()
+    ).outerjoin(Attendance, and_(
+        Attendance.employee_id == Employee.id,
+        Attendance.date >= first_day,
+        Attendance.date < partitions.next_month(first_day)
+    )).where(Employee.is_active == True).group_by(
+        Employee.id, Employee.employee_id, Employee.full_name, Employee.department
+    )
+    
+    if department:
+        query = query.where(Employee.department == department)
+    
+    rows = db.execute(query.order_by(Employee.employee_id)).all()
+    return json_response(matrix.build_matrix(rows, first_day), response)
 
 @router.put("/{attendance_id}")
 def update_attendance(
     attendance_id: str,
     status: AttendanceStatus = Query(..., description="New attendance status"),
+    attendance_date: Optional[date] = Query(None, alias="date", description=RECORD_DATE_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """Update an existing attendance record"""
-    record = db.query(Attendance).filter(Attendance.id == attendance_id).first()
-    if not record:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Attendance record with ID '{attendance_id}' not found"
-        )
+    record = get_record_or_404(db, attendance_id, attendance_date)
     
     record.status = status
     db.commit()
     db.refresh(record)
     
-    employee = db.query(Employee).filter(Employee.id == record.employee_id).first()
+    employee = employee_cache.get(db, record.employee_id)
     
     return AttendanceResponse(
         id=record.id,
@@ -1,51 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, select, true, tuple_
 from typing import List, Optional
-from datetime import date
-from app.database import get_db
+from datetime import date, datetime
+from app.database import get_db, get_read_db
+from app.enums import AttendanceStatus
+from app.etag import conditional
+from app.pagination import decode_cursor, set_next_cursor
+from app.replicas import read_only
+from app.responses import json_response
+from app.services import roster as roster_sync
+from app.services.employee_cache import employee_cache
+from app.services import search as search_index
 from app.models.employee import Employee
 from app.models.attendance import Attendance
-from app.schemas.employee import EmployeeCreate, EmployeeResponse, EmployeeUpdate
+from app.models.attendance_summary import AttendanceDailySummary
+from app.schemas.employee import (
+    EmployeeCreate, EmployeeResponse, EmployeeUpdate, RosterSyncResponse, EmployeeSummaryRequest, EmployeeSummary
+)
 
 router = APIRouter(prefix="/api/employees", tags=["Employees"])
 
-@router.get("/dashboard/stats")
-def get_dashboard_stats(db: Session = Depends(get_db)):
-    total_employees = db.query(func.count(Employee.id)).filter(Employee.is_active == True).scalar() or 0
+# List reads select exactly the response columns as plain rows instead of hydrating ORM instances
+EMPLOYEE_RESPONSE_COLUMNS = [getattr(Employee, field) for field in EmployeeResponse.model_fields]
+
+# Present/absent counts as conditional aggregates, so any number of employees takes one GROUP BY
+PRESENT_COUNT = func.count(case((Attendance.status == AttendanceStatus.PRESENT, 1)))
+ABSENT_COUNT = func.count(case((Attendance.status == AttendanceStatus.ABSENT, 1)))
+
+def _attendance_rate(present, absent):
+    return round(present / (present + absent) * 100, 2) if present + absent else 0
+
+@router.get("/dashboard/stats", dependencies=[conditional(Employee.__tablename__, Attendance.__tablename__, AttendanceDailySummary.__tablename__, daily=True)])
+def get_dashboard_stats(response: Response, db: Session = Depends(get_read_db)):
+    today = date.today()
     
-    departments = db.query(
-        Employee.department,
-        func.count(Employee.id).label('count')
-    ).filter(Employee.is_active == True).group_by(Employee.department).all()
+    # Attendance figures are read from the daily rollup rather than the raw attendance table
+    attendance_stats = select(
+        func.coalesce(func.sum(case((AttendanceDailySummary.date == today, AttendanceDailySummary.present_count), else_=0)), 0).label("today_present"),
+        func.coalesce(func.sum(case((AttendanceDailySummary.date == today, AttendanceDailySummary.absent_count), else_=0)), 0).label("today_absent"),
+        func.coalesce(func.sum(AttendanceDailySummary.present_count + AttendanceDailySummary.absent_count), 0).label("total_records"),
+        func.coalesce(func.sum(AttendanceDailySummary.present_count), 0).label("total_present"),
+    ).cte("attendance_stats")
     
-    today = date.today()
-    today_present = db.query(func.count(Attendance.id)).filter(
-        Attendance.date == today,
-        Attendance.status == "Present"
-    ).scalar() or 0
+    department_counts = select(
+        Employee.department,
+        func.count(Employee.id).label("count")
+    ).filter(Employee.is_active == True).group_by(Employee.department).cte("department_counts")
     
-    today_absent = db.query(func.count(Attendance.id)).filter(
-        Attendance.date == today,
-        Attendance.status == "Absent"
-    ).scalar() or 0
+    # The stats CTE always yields exactly one row, so the outer join keeps it even with no employees
+    rows = db.execute(
+        select(attendance_stats, department_counts.c.department, department_counts.c.count)
+        .select_from(attendance_stats.outerjoin(department_counts, true()))
+        .order_by(department_counts.c.department)
+    ).all()
     
-    total_attendance_records = db.query(func.count(Attendance.id)).scalar() or 0
-    total_present = db.query(func.count(Attendance.id)).filter(Attendance.status == "Present").scalar() or 0
+    stats = rows[0]
+    departments = [(row.department, row.count) for row in rows if row.department is not None]
+    total_employees = sum(count for _, count in departments)
     
-    overall_attendance_rate = (total_present / total_attendance_records * 100) if total_attendance_records > 0 else 0
+    overall_attendance_rate = (stats.total_present / stats.total_records * 100) if stats.total_records > 0 else 0
     
-    recent_employees = db.query(Employee).filter(
-        Employee.is_active == True
-    ).order_by(Employee.created_at.desc()).limit(5).all()
+    recent_employees = db.execute(
+        select(Employee.id, Employee.employee_id, Employee.full_name, Employee.department, Employee.created_at)
+        .filter(Employee.is_active == True)
+        .order_by(Employee.created_at.desc())
+        .limit(5)
+    ).all()
     
-    return {
+    return json_response({
         "total_employees": total_employees,
         "departments": [{"name": dept, "count": count} for dept, count in departments],
         "today_attendance": {
-            "present": today_present,
-            "absent": today_absent,
-            "not_marked": total_employees - today_present - today_absent
+            "present": stats.today_present,
+            "absent": stats.today_absent,
+            "not_marked": total_employees - stats.today_present - stats.today_absent
         },
         "overall_attendance_rate": round(overall_attendance_rate, 2),
         "recent_employees": [
@@ -57,7 +86,7 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
                 "created_at": emp.created_at.isoformat() if emp.created_at else None
             } for emp in recent_employees
         ]
-    }
+    }, response)
 
 @router.post("/", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
 def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
@@ -97,33 +126,125 @@ def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
     db.refresh(db_employee)
     return db_employee
 
-@router.get("/", response_model=List[EmployeeResponse])
+async def read_roster(request: Request) -> List[EmployeeCreate]:
+    """Parse the request body as a CSV (text/csv) or JSON roster"""
+    roster_format = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "json"
+    try:
+        return roster_sync.parse_roster((await request.body()).decode("utf-8-sig"), roster_format)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Roster must be UTF-8 encoded")
+    except roster_sync.RosterError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": str(exc), "errors": exc.errors}
+        )
+
+@router.post(
+    "/sync",
+    response_model=RosterSyncResponse,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": {"type": "array", "items": EmployeeCreate.model_json_schema()}},
+        "text/csv": {"schema": {"type": "string"}},
+    }}}
+)
+def sync_employees(
+    entries: List[EmployeeCreate] = Depends(read_roster),
+    dry_run: bool = Query(False, description="Report the changes without applying them"),
+    deactivate_missing: bool = Query(True, description="Deactivate active employees that are not in the roster"),
+    db: Session = Depends(get_db)
+):
+    """Sync employees with a full HRIS roster, applying only the differences"""
+    try:
+        return roster_sync.sync_roster(db, entries, deactivate_missing=deactivate_missing, dry_run=dry_run)
+    except roster_sync.RosterError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(exc), "errors": exc.errors}
+        )
+
+def summaries_statement(start_date=None, end_date=None):
+    """Present/absent counts per employee over [start_date, end_date]; filter and order it to taste"""
+    # Date bounds go in the join condition so employees without records still get zero counts
+    joined = [Attendance.employee_id == Employee.id]
+    if start_date:
+        joined.append(Attendance.date >= start_date)
+    if end_date:
+        joined.append(Attendance.date <= end_date)
+    
+    return select(
+        Employee.id, Employee.employee_id, Employee.full_name, Employee.department,
+        PRESENT_COUNT.label("present"), ABSENT_COUNT.label("absent")
+    ).outerjoin(Attendance, and_(*joined)).group_by(
+        Employee.id, Employee.employee_id, Employee.full_name, Employee.department
+    )
+
+def summary_payload(row):
+    """EmployeeSummary fields for a summaries_statement row"""
+    return {
+        "employee_id": row.id,
+        "employee_code": row.employee_id,
+        "full_name": row.full_name,
+        "department": row.department,
+        "total_present": row.present,
+        "total_absent": row.absent,
+        "attendance_rate": _attendance_rate(row.present, row.absent)
+    }
+
+@router.post("/summaries", response_model=List[EmployeeSummary])
+@read_only
+def get_employee_summaries(payload: EmployeeSummaryRequest, db: Session = Depends(get_read_db)):
+    """Get attendance summaries for many active employees with a single grouped query"""
+    query = summaries_statement(payload.start_date, payload.end_date).where(Employee.is_active == True)
+    
+    if payload.employee_ids is not None:
+        query = query.where(Employee.id.in_(set(payload.employee_ids)))
+    if payload.department is not None:
+        query = query.where(Employee.department == payload.department)
+    
+    rows = db.execute(query.order_by(Employee.employee_id)).all()
+    
+    return json_response([summary_payload(row) for row in rows])
+
+@router.get("/", response_model=List[EmployeeResponse], dependencies=[conditional(Employee.__tablename__)])
 def get_employees(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     department: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_read_db)
 ):
     """Get all employees with optional filtering"""
-    query = db.query(Employee).filter(Employee.is_active == True)
+    query = select(*EMPLOYEE_RESPONSE_COLUMNS).filter(Employee.is_active == True)
     
     if department:
         query = query.filter(Employee.department.ilike(f"%{department}%"))
     
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Employee.full_name.ilike(search_filter)) |
-            (Employee.employee_id.ilike(search_filter)) |
-            (Employee.email.ilike(search_filter))
-        )
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not available for ranked search results; use skip and limit"
+            )
+        # Ranked by relevance first, newest first among equal matches
+        query = search_index.apply_search(query, db, search)
     
-    employees = query.order_by(Employee.created_at.desc()).offset(skip).limit(limit).all()
-    return employees
+    if cursor:
+        # Keyset pagination: seek past the last (created_at, id) seen instead of scanning an offset
+        query = query.filter(tuple_(Employee.created_at, Employee.id) < decode_cursor(cursor, datetime.fromisoformat, str))
+        skip = 0
+    
+    employees = db.execute(
+        query.order_by(Employee.created_at.desc(), Employee.id.desc()).offset(skip).limit(limit)
+    ).mappings().all()
+    if not search:
+        set_next_cursor(response, employees, limit, lambda e: (e["created_at"], e["id"]))
+    # Rows match EmployeeResponse column for column, so they are serialized without re-validation
+    return json_response(employees, response)
 
-@router.get("/{employee_id}", response_model=EmployeeResponse)
-def get_employee(employee_id: str, db: Session = Depends(get_db)):
+@router.get("/{employee_id}", response_model=EmployeeResponse, dependencies=[conditional(Employee.__tablename__)])
+def get_employee(employee_id: str, db: Session = Depends(get_read_db)):
     """Get a single employee by ID"""
     employee = db.query(Employee).filter(Employee.id == employee_id).first()
     if not employee:
@@ -166,6 +287,7 @@ def update_employee(
         setattr(employee, field, value)
     
     db.commit()
+    employee_cache.invalidate(employee_id)
     db.refresh(employee)
     return employee
 
@@ -182,12 +304,13 @@ def delete_employee(employee_id: str, db: Session = Depends(get_db)):
     # Hard delete - actually remove from database
     db.delete(employee)
     db.commit()
+    employee_cache.invalidate(employee_id)
     return None
 
-@router.get("/{employee_id}/summary")
-def get_employee_summary(employee_id: str, db: Session = Depends(get_db)):
+@router.get("/{employee_id}/summary", response_model=EmployeeSummary, dependencies=[conditional(Employee.__tablename__, Attendance.__tablename__)])
+def get_employee_summary(employee_id: str, response: Response, db: Session = Depends(get_read_db)):
     """Get attendance summary for an employee"""
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+    employee = employee_cache.get(db, employee_id)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -195,25 +318,16 @@ def get_employee_summary(employee_id: str, db: Session = Depends(get_db)):
         )
     
     # Get attendance statistics
-    total_present = db.query(func.count(Attendance.id)).filter(
-        Attendance.employee_id == employee_id,
-        Attendance.status == "Present"
-    ).scalar() or 0
+    total_present, total_absent = db.execute(
+        select(PRESENT_COUNT, ABSENT_COUNT).where(Attendance.employee_id == employee_id)
+    ).one()
     
-    total_absent = db.query(func.count(Attendance.id)).filter(
-        Attendance.employee_id == employee_id,
-        Attendance.status == "Absent"
-    ).scalar() or 0
-    
-    total_days = total_present + total_absent
-    attendance_rate = (total_present / total_days * 100) if total_days > 0 else 0
-    
-    return {
+    return json_response({
         "employee_id": employee.id,
         "employee_code": employee.employee_id,
         "full_name": employee.full_name,
         "department": employee.department,
         "total_present": total_present,
         "total_absent": total_absent,
-        "attendance_rate": round(attendance_rate, 2)
-    }
+        "attendance_rate": _attendance_rate(total_present, total_absent)
+    }, response)
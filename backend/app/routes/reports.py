@@ -0,0 +1,129 @@
+from fastapi import APIRouter, HTTPException, status, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import func, select
+from datetime import date
+from pathlib import Path
+import json
+from app.enums import JobStatus
+from app.jobs import ACTIVE, JobQueueFull, job_runner
+from app.replicas import read_only
+from app.models.employee import Employee
+from app.routes.attendance import EXPORT_BATCH_SIZE, export_chunks, export_statement
+from app.routes.employees import summaries_statement, summary_payload
+from app.schemas.report import AttendanceExportReportRequest, EmployeeSummaryReportRequest, ReportJobResponse
+
+router = APIRouter(prefix="/api/reports", tags=["Reports"])
+
+# Employees summarized per grouped query, and per progress update
+SUMMARY_BATCH_SIZE = 1000
+
+# Seconds clients should wait before polling an unfinished job again
+POLL_INTERVAL = 1
+
+def _job_payload(job):
+    total = job["total"]
+    return {
+        **{field: job[field] for field in ("id", "kind", "status", "done", "total", "error",
+                                           "created_at", "started_at", "finished_at")},
+        "progress": round(job["done"] / total * 100, 1) if total else (100.0 if total == 0 else None),
+        "result_url": f"/api/reports/{job['id']}/result" if job["status"] == JobStatus.SUCCEEDED else None,
+    }
+
+def _submit(kind, work, media_type, filename, response: Response):
+    """Queue a report job; the request returns as soon as the job is queued"""
+    try:
+        job = job_runner.submit(kind, work, media_type, filename)
+    except JobQueueFull as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Too many reports in progress ({exc}); try again later",
+            headers={"Retry-After": "30"}
+        )
+    response.headers["Location"] = f"/api/reports/{job['id']}"
+    response.headers["Retry-After"] = str(POLL_INTERVAL)
+    return _job_payload(job)
+
+def _get_job(job_id):
+    job = job_runner.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Report job with ID '{job_id}' not found"
+        )
+    return job
+
+@router.post("/attendance-export", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+@read_only
+def create_attendance_export(payload: AttendanceExportReportRequest, response: Response):
+    """Export attendance records (all of history by default) as CSV or NDJSON in the background"""
+    stmt = export_statement(payload.employee_id, payload.department, payload.start_date, payload.end_date, payload.status)
+
+    def work(db, out, progress):
+        total = db.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar()
+        progress(0, total)
+        done = 0
+
+        def advance(rows):
+            nonlocal done
+            done += rows
+            progress(done)
+
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for chunk in export_chunks(result, payload.format, on_partition=advance):
+            out.write(chunk.encode())
+
+    media_type = "text/csv" if payload.format == "csv" else "application/x-ndjson"
+    return _submit("attendance-export", work, media_type, f"attendance-{date.today():%Y%m%d}.{payload.format}", response)
+
+@router.post("/employee-summaries", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+@read_only
+def create_employee_summaries(payload: EmployeeSummaryReportRequest, response: Response):
+    """Attendance summaries of every active employee (or one department) over a date range, as a JSON array"""
+    selected = [Employee.is_active == True]
+    if payload.department:
+        selected.append(Employee.department == payload.department)
+    stmt = summaries_statement(payload.start_date, payload.end_date).where(*selected)
+
+    def work(db, out, progress):
+        total = db.execute(select(func.count()).select_from(Employee).where(*selected)).scalar()
+        progress(0, total)
+        out.write(b"[")
+        done, last_code = 0, None
+        # Keyset batches keep each grouped query (and its progress step) bounded
+        while True:
+            batch = stmt if last_code is None else stmt.where(Employee.employee_id > last_code)
+            rows = db.execute(batch.order_by(Employee.employee_id).limit(SUMMARY_BATCH_SIZE)).all()
+            if not rows:
+                break
+            for row in rows:
+                out.write((("," if done else "") + json.dumps(summary_payload(row))).encode())
+                done += 1
+            last_code = rows[-1].employee_id
+            progress(done)
+        out.write(b"]")
+
+    return _submit("employee-summaries", work, "application/json", f"employee-summaries-{date.today():%Y%m%d}.json", response)
+
+@router.get("/{job_id}", response_model=ReportJobResponse)
+def get_report_job(job_id: str, response: Response):
+    """Poll a report job's status and progress"""
+    job = _get_job(job_id)
+    if job["status"] in ACTIVE:
+        response.headers["Retry-After"] = str(POLL_INTERVAL)
+    return _job_payload(job)
+
+@router.get("/{job_id}/result")
+def get_report_result(job_id: str):
+    """Download a finished report"""
+    job = _get_job(job_id)
+    if job["status"] in ACTIVE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Report is not ready yet",
+            headers={"Retry-After": str(POLL_INTERVAL)}
+        )
+    if job["status"] == JobStatus.FAILED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=job["error"])
+    if not job["result_path"] or not Path(job["result_path"]).exists():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Report result is no longer available")
+    return FileResponse(job["result_path"], media_type=job["media_type"], filename=job["filename"])
@@ -1,7 +1,19 @@
-from .employee import EmployeeCreate, EmployeeResponse, EmployeeUpdate
-from .attendance import AttendanceCreate, AttendanceResponse, AttendanceWithEmployeeName
+from .employee import (
+    EmployeeCreate, EmployeeResponse, EmployeeUpdate, RosterSyncChange, RosterSyncResponse,
+    EmployeeSummaryRequest, EmployeeSummary
+)
+from .attendance import (
+    AttendanceCreate, AttendanceResponse, AttendanceWithEmployeeName,
+    AttendanceBulkCreate, AttendanceBulkItemResult, AttendanceBulkResponse,
+    AttendanceMatrixEmployee, AttendanceMatrixResponse
+)
+from .report import AttendanceExportReportRequest, EmployeeSummaryReportRequest, ReportJobResponse
 
 __all__ = [
-    "EmployeeCreate", "EmployeeResponse", "EmployeeUpdate",
-    "AttendanceCreate", "AttendanceResponse", "AttendanceWithEmployeeName"
+    "EmployeeCreate", "EmployeeResponse", "EmployeeUpdate", "RosterSyncChange", "RosterSyncResponse",
+    "EmployeeSummaryRequest", "EmployeeSummary",
+    "AttendanceCreate", "AttendanceResponse", "AttendanceWithEmployeeName",
+    "AttendanceBulkCreate", "AttendanceBulkItemResult", "AttendanceBulkResponse",
+    "AttendanceMatrixEmployee", "AttendanceMatrixResponse",
+    "AttendanceExportReportRequest", "EmployeeSummaryReportRequest", "ReportJobResponse"
 ]
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, datetime
-from typing import Annotated
+from typing import Annotated, Dict, List, Literal, Optional
 from app.enums import AttendanceStatus
 
 class AttendanceBase(BaseModel):
@@ -17,6 +17,9 @@ class AttendanceBase(BaseModel):
 class AttendanceCreate(AttendanceBase):
     pass
 
+class AttendanceBulkCreate(BaseModel):
+    items: List[AttendanceCreate] = Field(..., min_length=1, max_length=5000)
+
 class AttendanceResponse(BaseModel):
     id: str
     employee_id: str
@@ -33,4 +36,33 @@ class AttendanceWithEmployeeName(BaseModel):
     employee_employee_id: str
     date: date
     status: AttendanceStatus
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+class AttendanceBulkItemResult(BaseModel):
+    index: int
+    employee_id: str
+    date: date
+    result: Literal["created", "conflict", "not_found"]
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+class AttendanceBulkResponse(BaseModel):
+    created: int
+    conflicts: int
+    not_found: int
+    results: List[AttendanceBulkItemResult]
+
+class AttendanceMatrixEmployee(BaseModel):
+    employee_id: str
+    employee_code: str
+    full_name: str
+    department: str
+    days: str = Field(..., description="One character per day of the month: P present, A absent, - not marked")
+
+class AttendanceMatrixResponse(BaseModel):
+    month: str
+    days: int
+    legend: Dict[str, str]
+    employees: List[AttendanceMatrixEmployee]
+    daily_present: List[int]
+    daily_absent: List[int]
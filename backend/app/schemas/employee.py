@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import List, Optional
+from datetime import date, datetime
 
 class EmployeeBase(BaseModel):
     employee_id: str = Field(..., min_length=1, max_length=20, description="Unique employee ID")
@@ -52,3 +52,37 @@ class EmployeeResponse(EmployeeBase):
 
     class Config:
         from_attributes = True
+
+class RosterSyncChange(BaseModel):
+    employee_id: str
+    fields: List[str]
+
+class RosterSyncResponse(BaseModel):
+    dry_run: bool
+    created: List[str]
+    updated: List[RosterSyncChange]
+    deactivated: List[str]
+    unchanged: int
+
+class EmployeeSummaryRequest(BaseModel):
+    employee_ids: Optional[List[str]] = Field(None, min_length=1, max_length=1000, description="Employee UUIDs")
+    department: Optional[str] = Field(None, min_length=1, max_length=100, description="Every active employee in this department")
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @model_validator(mode='after')
+    def validate_selection(self):
+        if self.employee_ids is None and self.department is None:
+            raise ValueError('Provide employee_ids or department')
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError('start_date must not be after end_date')
+        return self
+
+class EmployeeSummary(BaseModel):
+    employee_id: str
+    employee_code: str
+    full_name: str
+    department: str
+    total_present: int
+    total_absent: int
+    attendance_rate: float
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
+from typing import Literal, Optional
+from app.enums import AttendanceStatus, JobStatus
+
+class ReportDateRange(BaseModel):
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @model_validator(mode='after')
+    def validate_range(self):
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError('start_date must not be after end_date')
+        return self
+
+class AttendanceExportReportRequest(ReportDateRange):
+    format: Literal["csv", "ndjson"] = "csv"
+    employee_id: Optional[str] = None
+    department: Optional[str] = Field(None, min_length=1, max_length=100)
+    status: Optional[AttendanceStatus] = None
+
+class EmployeeSummaryReportRequest(ReportDateRange):
+    department: Optional[str] = Field(None, min_length=1, max_length=100, description="Every active employee when omitted")
+
+class ReportJobResponse(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    done: int
+    total: Optional[int] = None
+    progress: Optional[float] = Field(None, description="Percent complete, once the total is known")
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result_url: Optional[str] = None
@@ -0,0 +1,51 @@
+"""
+Removal of duplicate attendance records ahead of the unique (employee_id, date) index.
+
+Databases created before `uq_attendance_employee_date` existed may hold several
+records for one employee and day, and creating the index on them would fail.
+`init_db` calls `dedupe_attendance` whenever that index is still missing: it keeps
+the latest record of each employee and day (by created_at, then id), deletes the
+others, recomputes the attendance rollup and creates the index, all in the caller's
+transaction so no new duplicate can slip in before the index exists.
+"""
+import logging
+
+from sqlalchemy import delete, func, inspect, select
+
+from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceDailySummary
+from app.services import rollups, versions
+
+UNIQUE_INDEX = "uq_attendance_employee_date"
+
+logger = logging.getLogger(__name__)
+
+
+def needs_dedupe(connection):
+    """True when attendance exists without its unique (employee_id, date) index"""
+    inspector = inspect(connection)
+    if not inspector.has_table(Attendance.__tablename__):
+        return False
+    return UNIQUE_INDEX not in {index["name"] for index in inspector.get_indexes(Attendance.__tablename__)}
+
+
+def dedupe_attendance(connection):
+    """Delete all but the latest record per employee and day, then create the unique index;
+    returns the number of records deleted"""
+    ranked = select(
+        Attendance.id,
+        func.row_number().over(
+            partition_by=(Attendance.employee_id, Attendance.date),
+            order_by=(Attendance.created_at.desc(), Attendance.id.desc()),
+        ).label("position"),
+    ).subquery()
+    deleted = connection.execute(
+        delete(Attendance).where(Attendance.id.in_(select(ranked.c.id).where(ranked.c.position > 1)))
+    ).rowcount
+    if deleted:
+        # The rollup counted every duplicate
+        rollups.recompute(connection)
+        versions.bump(connection, {Attendance.__tablename__, AttendanceDailySummary.__tablename__})
+        logger.warning("Removed %d duplicate attendance records before creating %s", deleted, UNIQUE_INDEX)
+    next(index for index in Attendance.__table__.indexes if index.name == UNIQUE_INDEX).create(connection)
+    return deleted
@@ -0,0 +1,107 @@
+"""
+In-process cache of employee records.
+
+Attendance endpoints look employees up by primary key on almost every request,
+usually for the same few hundred people. `employee_cache` keeps immutable
+snapshots of those rows in a bounded LRU with a TTL:
+
+- routes that change an employee call `invalidate` after committing
+- the TTL bounds staleness for writes made by other worker processes
+- lookups that find nothing are not cached, so new employees are visible at once
+- rows read from a read replica are returned but not cached, since the replica may
+  still hold a version the invalidation above has already dropped
+
+Hit/miss counters are exposed through `GET /api/health/cache` for tuning the size
+and TTL (`EMPLOYEE_CACHE_SIZE`, `EMPLOYEE_CACHE_TTL`).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.employee import Employee
+
+EMPLOYEE_CACHE_SIZE = int(os.getenv("EMPLOYEE_CACHE_SIZE", "1024"))
+EMPLOYEE_CACHE_TTL = float(os.getenv("EMPLOYEE_CACHE_TTL", "60"))
+
+
+class EmployeeSnapshot(NamedTuple):
+    """Read-only copy of the employee columns the attendance routes need"""
+    id: str
+    employee_id: str
+    full_name: str
+    email: str
+    department: str
+    is_active: bool
+
+
+_COLUMNS = [getattr(Employee, field) for field in EmployeeSnapshot._fields]
+
+
+class EmployeeCache:
+    """Thread-safe LRU + TTL cache of EmployeeSnapshot keyed by primary key"""
+
+    def __init__(self, maxsize=EMPLOYEE_CACHE_SIZE, ttl=EMPLOYEE_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, db: Session, employee_id):
+        """Return the employee's snapshot, loading it on a miss; None if it does not exist"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(employee_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        row = db.execute(select(*_COLUMNS).where(Employee.id == employee_id)).first()
+        if row is None:
+            return None
+        snapshot = EmployeeSnapshot(*row)
+        if self.maxsize > 0 and not db.info.get("replica"):
+            with self._lock:
+                self._entries[employee_id] = (now + self.ttl, snapshot)
+                self._entries.move_to_end(employee_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return snapshot
+
+    def invalidate(self, *employee_ids):
+        """Drop cached snapshots; call after committing a change to those employees"""
+        with self._lock:
+            for employee_id in employee_ids:
+                if self._entries.pop(employee_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+employee_cache = EmployeeCache()
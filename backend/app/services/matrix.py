@@ -0,0 +1,63 @@
+"""
+Monthly attendance matrix: employees x days of the month.
+
+The matrix is read with one aggregated query: the month's attendance is LEFT
+JOINed onto the selected employees and grouped by employee. Each record
+contributes a 2-bit status code (0 not marked, 1 absent, 2 present) shifted to
+its day of the month, so SUM packs an employee's whole month into one 62-bit
+integer. That returns one narrow row per employee instead of one row per record.
+
+The packed months are pivoted with numpy rather than per-cell Python code:
+shifting the column of integers by every day's offset unpacks the (employees x
+days) code grid, a lookup table maps codes to status bytes, and each grid row is
+viewed as one fixed-width string such as "PPA-P..." ("P" present, "A" absent,
+"-" not marked).
+"""
+import calendar
+
+import numpy as np
+from sqlalchemy import BigInteger, Integer, case, cast, extract, func
+
+from app.enums import AttendanceStatus
+from app.models.attendance import Attendance
+
+LEGEND = {"P": AttendanceStatus.PRESENT.value, "A": AttendanceStatus.ABSENT.value, "-": "Not Marked"}
+
+NOT_MARKED, ABSENT, PRESENT = 0, 1, 2
+CODE_BITS = 2
+SYMBOLS = np.frombuffer(b"-AP", dtype=np.uint8)
+
+
+def days_in_month(month):
+    return calendar.monthrange(month.year, month.month)[1]
+
+
+def packed_month():
+    """SUM of each record's status code shifted to its day; one integer per employee when grouped"""
+    code = cast(case((Attendance.status == AttendanceStatus.PRESENT, PRESENT), else_=ABSENT), BigInteger)
+    offset = (cast(extract("day", Attendance.date), Integer) - 1) * CODE_BITS
+    # Employees without records have no rows to sum
+    return cast(func.coalesce(func.sum(code.op("<<")(offset)), 0), BigInteger).label("packed")
+
+
+def build_matrix(rows, month):
+    """Unpack (id, employee_id, full_name, department, packed) rows into the matrix response"""
+    days = days_in_month(month)
+    ids, codes, names, departments, packed = zip(*rows) if rows else ((),) * 5
+
+    shifts = np.arange(days, dtype=np.int64) * CODE_BITS
+    grid = ((np.asarray(packed, dtype=np.int64).reshape(-1, 1) >> shifts) & 0b11).astype(np.uint8)
+    cells = SYMBOLS[grid].view(f"S{days}").ravel()
+
+    return {
+        "month": f"{month:%Y-%m}",
+        "days": days,
+        "legend": LEGEND,
+        "employees": [
+            {"employee_id": employee_id, "employee_code": code, "full_name": name,
+             "department": department, "days": cell.decode("ascii")}
+            for employee_id, code, name, department, cell in zip(ids, codes, names, departments, cells)
+        ],
+        "daily_present": (grid == PRESENT).sum(axis=0).tolist(),
+        "daily_absent": (grid == ABSENT).sum(axis=0).tolist(),
+    }
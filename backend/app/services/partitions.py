@@ -0,0 +1,174 @@
+"""
+Monthly range partitions for the attendance table on PostgreSQL.
+
+`attendance` is declared `PARTITION BY RANGE (date)`, so every query that filters
+on `date` only touches the partitions for the months it covers, and an old month
+can be detached (and archived or dropped) without deleting rows one by one.
+
+- each month lives in `attendance_yYYYYmMM`, covering [first day, first day of next month)
+- `attendance_default` catches dates without a month partition, so inserts never fail
+- `ensure_partitions` creates the current month and `ATTENDANCE_PARTITION_MONTHS_AHEAD`
+  months ahead, and moves any rows that landed in the default partition into their
+  own month. It runs on startup and from `python -m app.cli create-partitions`
+- `partition_existing` converts an attendance table created before partitioning
+
+Other databases keep a single table; the functions here do nothing for them.
+"""
+import os
+from datetime import date
+
+from sqlalchemy import DDL, delete, event, inspect, text
+
+from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceDailySummary
+from app.services import versions
+
+ATTENDANCE_PARTITION_MONTHS_AHEAD = int(os.getenv("ATTENDANCE_PARTITION_MONTHS_AHEAD", "3"))
+
+TABLE = Attendance.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+UNPARTITIONED_TABLE = f"{TABLE}_unpartitioned"
+
+# Serializes partition maintenance when several workers start at once
+_LOCK_KEY = 0x61747464
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    day = month_start(day)
+    return day.replace(year=day.year + 1, month=1) if day.month == 12 else day.replace(month=day.month + 1)
+
+
+def partition_name(day):
+    return f"{TABLE}_y{day.year:04d}m{day.month:02d}"
+
+
+def months_ahead(today, count):
+    """The month containing `today` followed by the next `count` months"""
+    months = [month_start(today)]
+    for _ in range(count):
+        months.append(next_month(months[-1]))
+    return months
+
+
+def is_partitioned(connection):
+    """True when attendance is a partitioned table on PostgreSQL"""
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": TABLE}
+    ).scalar()
+
+
+def existing_partitions(connection):
+    return set(connection.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+             "WHERE i.inhparent = to_regclass(:table)"),
+        {"table": TABLE}
+    ).scalars())
+
+
+def create_partition(connection, month):
+    """Create the partition for `month`, moving rows for it out of the default partition"""
+    name, start, end = partition_name(month), month_start(month), next_month(month)
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    in_range = {"start": start, "end": end}
+
+    stranded = connection.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end)"),
+        in_range
+    ).scalar()
+    if not stranded:
+        connection.exec_driver_sql(f"CREATE TABLE {name} PARTITION OF {TABLE} {bounds}")
+        return name
+
+    # A new range may not overlap rows already in the default partition: build the
+    # month as a plain table, move its rows over, then attach it
+    connection.exec_driver_sql(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)")
+    connection.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"),
+        in_range
+    )
+    connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"), in_range)
+    connection.exec_driver_sql(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} {bounds}")
+    return name
+
+
+def ensure_partitions(connection, count=ATTENDANCE_PARTITION_MONTHS_AHEAD, today=None):
+    """Create missing month partitions; returns the names of the partitions created"""
+    if not is_partitioned(connection):
+        return []
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+
+    existing = existing_partitions(connection)
+    months = set(months_ahead(today or date.today(), count))
+    months.update(connection.execute(
+        text(f"SELECT DISTINCT date_trunc('month', date)::date FROM {DEFAULT_PARTITION}")
+    ).scalars())
+    return [
+        create_partition(connection, month)
+        for month in sorted(months)
+        if partition_name(month) not in existing
+    ]
+
+
+def detach_partition(connection, month, drop=False):
+    """Detach the partition for `month` from attendance, optionally dropping it, and drop its rollup rows"""
+    if not is_partitioned(connection):
+        raise ValueError("Attendance is not partitioned")
+    name = partition_name(month)
+    if name not in existing_partitions(connection):
+        raise ValueError(f"No attendance partition for {month:%Y-%m}")
+
+    connection.exec_driver_sql(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+    if drop:
+        connection.exec_driver_sql(f"DROP TABLE {name}")
+
+    # The month's totals leave the rollup in the same transaction as its rows
+    connection.execute(delete(AttendanceDailySummary).where(
+        AttendanceDailySummary.date >= month_start(month), AttendanceDailySummary.date < next_month(month)
+    ))
+
+    # The rows are gone from attendance and the rollup, so cached responses over them are stale
+    versions.bump(connection, {TABLE, AttendanceDailySummary.__tablename__})
+    return name
+
+
+def partition_existing(connection):
+    """Rebuild an unpartitioned attendance table as a partitioned one; False if there was nothing to do"""
+    if connection.dialect.name != "postgresql" or is_partitioned(connection):
+        return False
+    if not inspect(connection).has_table(TABLE):
+        Attendance.__table__.create(connection)
+        return True
+
+    # Index names are schema-wide, so the old table's indexes make way for the new ones
+    connection.exec_driver_sql(f"ALTER TABLE {TABLE} RENAME TO {UNPARTITIONED_TABLE}")
+    for index in connection.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": UNPARTITIONED_TABLE}
+    ).scalars().all():
+        connection.exec_driver_sql(f'ALTER INDEX "{index}" RENAME TO "{index[:50]}_unpartitioned"')
+
+    Attendance.__table__.create(connection, checkfirst=True)
+    months = connection.execute(
+        text(f"SELECT DISTINCT date_trunc('month', date)::date FROM {UNPARTITIONED_TABLE}")
+    ).scalars().all()
+    for month in sorted(months):
+        create_partition(connection, month)
+
+    columns = ", ".join(column.name for column in Attendance.__table__.columns)
+    connection.exec_driver_sql(f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {UNPARTITIONED_TABLE}")
+    connection.exec_driver_sql(f"DROP TABLE {UNPARTITIONED_TABLE}")
+    ensure_partitions(connection)
+    return True
+
+
+event.listen(
+    Attendance.__table__,
+    "after_create",
+    DDL(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,161 @@
+"""
+Incrementally maintained attendance rollups.
+
+`attendance_daily_summary` holds present/absent counts per date and department so
+that dashboard and trend queries aggregate a few hundred rows instead of the full
+`attendance` table. ORM writes keep it in sync through the mapper events below;
+Core-level bulk writes must call `apply_deltas` themselves.
+"""
+from collections import defaultdict
+
+from sqlalchemy import event, func, inspect, select, delete, case
+from sqlalchemy.orm import Session, object_session
+
+from app.database import dialect_insert
+from app.enums import AttendanceStatus
+from app.models.employee import Employee
+from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceDailySummary
+from app.services import versions
+
+_DELTAS_KEY = "_attendance_rollup_deltas"
+
+
+def new_deltas():
+    """Mapping of (date, department) -> [present_delta, absent_delta]"""
+    return defaultdict(lambda: [0, 0])
+
+
+def add_delta(deltas, attendance_date, department, status, sign=1):
+    """Record a +1/-1 change for one attendance row in a deltas mapping"""
+    index = 0 if AttendanceStatus(status) == AttendanceStatus.PRESENT else 1
+    deltas[(attendance_date, department)][index] += sign
+
+
+def apply_deltas(bind, deltas):
+    """Fold accumulated deltas into the summary table with one multi-row upsert"""
+    # Rows in (date, department) order, so concurrent upserts lock them in the same order
+    rows = [
+        {"date": key[0], "department": key[1], "present_count": present, "absent_count": absent}
+        for key, (present, absent) in sorted(deltas.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+        if present or absent
+    ]
+    if not rows:
+        return
+
+    stmt = dialect_insert(bind, AttendanceDailySummary).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AttendanceDailySummary.date, AttendanceDailySummary.department],
+        set_={
+            "present_count": AttendanceDailySummary.present_count + stmt.excluded.present_count,
+            "absent_count": AttendanceDailySummary.absent_count + stmt.excluded.absent_count,
+        },
+    )
+    bind.execute(stmt)
+
+
+def reassign_department(bind, deltas, employee_ids, old_department, new_department):
+    """Move existing attendance counts for employees from one department bucket to another"""
+    counts = bind.execute(
+        select(Attendance.date, Attendance.status, func.count(Attendance.id))
+        .where(Attendance.employee_id.in_(employee_ids))
+        .group_by(Attendance.date, Attendance.status)
+    ).all()
+    for attendance_date, status, count in counts:
+        add_delta(deltas, attendance_date, old_department, status, -count)
+        add_delta(deltas, attendance_date, new_department, status, count)
+
+
+def recompute(bind):
+    """Replace the summary table's rows with counts from raw attendance rows, without committing"""
+    bind.execute(delete(AttendanceDailySummary))
+    grouped = (
+        select(
+            Attendance.date,
+            Employee.department,
+            func.count(case((Attendance.status == AttendanceStatus.PRESENT, 1))),
+            func.count(case((Attendance.status == AttendanceStatus.ABSENT, 1))),
+        )
+        .join(Employee, Employee.id == Attendance.employee_id)
+        .group_by(Attendance.date, Employee.department)
+    )
+    result = bind.execute(
+        AttendanceDailySummary.__table__.insert().from_select(
+            ["date", "department", "present_count", "absent_count"], grouped
+        )
+    )
+    return result.rowcount
+
+
+def rebuild(db: Session):
+    """Recompute the whole summary table from raw attendance rows"""
+    rows = recompute(db)
+    db.commit()
+    return rows
+
+
+# ==================== ORM SYNC ====================
+
+def _pending_deltas(target):
+    return object_session(target).info.setdefault(_DELTAS_KEY, new_deltas())
+
+
+def _department_for(connection, target, employee_id):
+    session = object_session(target)
+    employee = session.identity_map.get(session.identity_key(Employee, employee_id)) if session else None
+    if employee is not None:
+        return employee.department
+    return connection.execute(select(Employee.department).where(Employee.id == employee_id)).scalar()
+
+
+def _previous(target, attr):
+    history = inspect(target).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(target, attr)
+
+
+@event.listens_for(Attendance, "after_insert")
+def _attendance_inserted(mapper, connection, target):
+    department = _department_for(connection, target, target.employee_id)
+    add_delta(_pending_deltas(target), target.date, department, target.status)
+
+
+@event.listens_for(Attendance, "after_update")
+def _attendance_updated(mapper, connection, target):
+    old = (_previous(target, "employee_id"), _previous(target, "date"), _previous(target, "status"))
+    new = (target.employee_id, target.date, target.status)
+    if old == new:
+        return
+    deltas = _pending_deltas(target)
+    old_department = _department_for(connection, target, old[0])
+    # Status and date changes keep the employee, so its department is only looked up once
+    new_department = old_department if new[0] == old[0] else _department_for(connection, target, new[0])
+    add_delta(deltas, old[1], old_department, old[2], -1)
+    add_delta(deltas, new[1], new_department, new[2])
+
+
+@event.listens_for(Attendance, "after_delete")
+def _attendance_deleted(mapper, connection, target):
+    employee_id = _previous(target, "employee_id")
+    department = _department_for(connection, target, employee_id)
+    add_delta(_pending_deltas(target), _previous(target, "date"), department, _previous(target, "status"), -1)
+
+
+@event.listens_for(Employee, "after_update")
+def _employee_updated(mapper, connection, target):
+    history = inspect(target).attrs.department.history
+    if history.deleted and history.deleted[0] != target.department:
+        reassign_department(connection, _pending_deltas(target), [target.id], history.deleted[0], target.department)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_pending_deltas(session, flush_context):
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+        # Written on the raw connection, so the versions listeners would not see it
+        versions.touch(session, AttendanceDailySummary.__tablename__)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_deltas(session, previous_transaction):
+    session.info.pop(_DELTAS_KEY, None)
@@ -0,0 +1,176 @@
+"""
+Differential employee sync from an HRIS roster.
+
+The roster is the full list of employees that should be active. It is diffed
+against `employees` with a single query keyed on `employee_id`, and only the
+differences are written:
+
+- new employee IDs are inserted with multi-row INSERTs
+- changed names, emails or departments (and returning employees) are updated
+  with one executemany UPDATE. Changed emails are first parked on a placeholder
+  (the employee's own id) so swapping emails between employees never trips the
+  unique email index halfway through
+- active employees missing from the roster are deactivated with one UPDATE
+
+Attendance rollups follow department changes through `rollups.reassign_department`,
+since bulk statements bypass the ORM events.
+"""
+import csv
+import io
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.employee import Employee
+from app.schemas.employee import EmployeeCreate
+from app.services import rollups
+from app.services.employee_cache import employee_cache
+
+SYNCED_FIELDS = ("full_name", "email", "department")
+
+# Keeps multi-row INSERTs well under PostgreSQL's 65535 bind parameter limit
+INSERT_BATCH_SIZE = 1000
+
+
+class RosterError(ValueError):
+    """The roster cannot be parsed or would violate a uniqueness constraint"""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def parse_roster(content, roster_format):
+    """Parse CSV or JSON roster content into validated EmployeeCreate entries"""
+    if roster_format == "csv":
+        records = list(csv.DictReader(io.StringIO(content)))
+    elif roster_format == "json":
+        try:
+            records = json.loads(content)
+        except json.JSONDecodeError as exc:
+            raise RosterError(f"Roster is not valid JSON: {exc}") from exc
+        if isinstance(records, dict):
+            records = records.get("employees")
+        if not isinstance(records, list):
+            raise RosterError("JSON roster must be a list of employees or an object with an 'employees' list")
+    else:
+        raise RosterError(f"Unsupported roster format '{roster_format}'")
+
+    entries, errors = [], []
+    for index, record in enumerate(records):
+        try:
+            entries.append(EmployeeCreate.model_validate(record))
+        except ValidationError as exc:
+            errors.extend(
+                {"index": index, "field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]}
+                for error in exc.errors()
+            )
+    if errors:
+        raise RosterError("Roster contains invalid entries", errors)
+    return entries
+
+
+def _check_unique(entries, existing):
+    errors = []
+    seen_ids, seen_emails = {}, {}
+    for index, entry in enumerate(entries):
+        email = entry.email.lower()
+        if entry.employee_id in seen_ids:
+            errors.append({"index": index, "field": "employee_id", "message": f"Duplicate employee ID '{entry.employee_id}' in roster"})
+        if email in seen_emails:
+            errors.append({"index": index, "field": "email", "message": f"Duplicate email '{email}' in roster"})
+        seen_ids[entry.employee_id] = index
+        seen_emails.setdefault(email, index)
+
+    # Employees left out of the roster keep their email, even once deactivated
+    for row in existing.values():
+        if row.employee_id not in seen_ids and row.email in seen_emails:
+            errors.append({
+                "index": seen_emails[row.email],
+                "field": "email",
+                "message": f"Email '{row.email}' belongs to employee '{row.employee_id}'",
+            })
+    if errors:
+        raise RosterError("Roster conflicts with existing employees", errors)
+
+
+def sync_roster(db: Session, entries, deactivate_missing=True, dry_run=False):
+    """Bring `employees` in line with the roster and report what changed"""
+    existing = {
+        row.employee_id: row
+        for row in db.execute(
+            select(Employee.id, Employee.employee_id, Employee.full_name, Employee.email,
+                   Employee.department, Employee.is_active)
+        ).all()
+    }
+    _check_unique(entries, existing)
+
+    now = datetime.now(timezone.utc)
+    inserts, updates, updated, moves = [], [], [], defaultdict(list)
+    parked = []
+    roster_ids = set()
+    for entry in entries:
+        roster_ids.add(entry.employee_id)
+        values = {"full_name": entry.full_name, "email": entry.email.lower(), "department": entry.department}
+        row = existing.get(entry.employee_id)
+        if row is None:
+            inserts.append({"id": str(uuid.uuid4()), "employee_id": entry.employee_id, "is_active": True,
+                            "created_at": now, **values})
+            continue
+
+        changed = [field for field in SYNCED_FIELDS if getattr(row, field) != values[field]]
+        if not row.is_active:
+            changed.append("is_active")
+        if changed:
+            updates.append({"id": row.id, "is_active": True, "updated_at": now, **values})
+            updated.append({"employee_id": entry.employee_id, "fields": changed})
+            if "email" in changed:
+                parked.append({"id": row.id, "email": row.id})
+            if row.department != entry.department:
+                moves[(row.department, entry.department)].append(row.id)
+
+    deactivated = []
+    if deactivate_missing:
+        deactivated = sorted(
+            row.employee_id for employee_id, row in existing.items()
+            if row.is_active and employee_id not in roster_ids
+        )
+
+    report = {
+        "dry_run": dry_run,
+        "created": [row["employee_id"] for row in inserts],
+        "updated": updated,
+        "deactivated": deactivated,
+        "unchanged": len(entries) - len(inserts) - len(updates),
+    }
+    if dry_run:
+        return report
+
+    if deactivated:
+        db.execute(
+            update(Employee)
+            .where(Employee.employee_id.in_(deactivated))
+            .values(is_active=False, updated_at=now)
+        )
+    if updates:
+        # Attendance counts move with the employee before the department column changes
+        deltas = rollups.new_deltas()
+        for (old_department, new_department), ids in moves.items():
+            rollups.reassign_department(db, deltas, ids, old_department, new_department)
+        rollups.apply_deltas(db, deltas)
+        if parked:
+            db.execute(update(Employee), parked)
+        db.execute(update(Employee), updates)
+    for start in range(0, len(inserts), INSERT_BATCH_SIZE):
+        db.execute(insert(Employee), inserts[start:start + INSERT_BATCH_SIZE])
+    db.commit()
+    employee_cache.invalidate(
+        *(row["id"] for row in updates),
+        *(existing[employee_id].id for employee_id in deactivated)
+    )
+    return report
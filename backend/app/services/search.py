@@ -0,0 +1,108 @@
+"""
+Indexed substring search for the employee directory.
+
+`'%term%'` filters cannot use B-tree indexes, so each backend gets a search index
+that can answer substring queries over full name, employee ID and email:
+
+- PostgreSQL: a pg_trgm GIN index on the concatenated columns, ranked by word_similarity
+- SQLite: an external-content FTS5 table with the trigram tokenizer, ranked by bm25.
+  It is keyed on the implicit rowid of `employees` (whose primary key is a string),
+  which VACUUM may renumber, so `install` rebuilds it on every startup
+
+The backend is picked from the session's dialect. Terms shorter than a trigram, or
+databases without either index, fall back to the plain ILIKE filters.
+"""
+import sqlite3
+
+from sqlalchemy import DDL, column, event, func, literal_column, table
+
+from app.models.employee import Employee
+
+MIN_TRIGRAM_LENGTH = 3
+
+# FTS5's trigram tokenizer ships with SQLite 3.34+
+SQLITE_TRIGRAM = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+_fts = table("employees_fts", column("rowid"), column("rank"))
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_employees_search_trgm ON employees "
+    "USING gin ((full_name || ' ' || employee_id || ' ' || email) gin_trgm_ops)",
+]
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS employees_fts USING fts5("
+    "full_name, employee_id, email, content='employees', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS employees_fts_ai AFTER INSERT ON employees BEGIN "
+    "INSERT INTO employees_fts(rowid, full_name, employee_id, email) "
+    "VALUES (new.rowid, new.full_name, new.employee_id, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS employees_fts_ad AFTER DELETE ON employees BEGIN "
+    "INSERT INTO employees_fts(employees_fts, rowid, full_name, employee_id, email) "
+    "VALUES ('delete', old.rowid, old.full_name, old.employee_id, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS employees_fts_au AFTER UPDATE OF full_name, employee_id, email ON employees BEGIN "
+    "INSERT INTO employees_fts(employees_fts, rowid, full_name, employee_id, email) "
+    "VALUES ('delete', old.rowid, old.full_name, old.employee_id, old.email); "
+    "INSERT INTO employees_fts(rowid, full_name, employee_id, email) "
+    "VALUES (new.rowid, new.full_name, new.employee_id, new.email); END",
+]
+
+
+def install(connection):
+    """Create the search index for the connection's dialect if it does not exist yet, and
+    resync the SQLite index with the employees' current rowids"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+    elif dialect == "sqlite" and SQLITE_TRIGRAM:
+        for statement in _SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        # Indexes rows written before the FTS table existed, and re-keys every row
+        # after a VACUUM has renumbered the employees' rowids
+        connection.exec_driver_sql("INSERT INTO employees_fts(employees_fts) VALUES ('rebuild')")
+
+
+@event.listens_for(Employee.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    install(connection)
+
+
+# Dropping employees removes its triggers but would leave the FTS shadow tables behind
+event.listen(
+    Employee.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS employees_fts").execute_if(dialect="sqlite"),
+)
+
+
+def _escape_like(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_search(query, db, term):
+    """Filter an Employee query by a substring of name, employee ID or email, best matches first"""
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql" and len(term) >= MIN_TRIGRAM_LENGTH:
+        # Must render exactly like the indexed expression for the planner to use the GIN index
+        space = literal_column("' '")
+        document = Employee.full_name.op("||")(space).op("||")(Employee.employee_id).op("||")(space).op("||")(Employee.email)
+        return query.filter(
+            document.ilike(f"%{_escape_like(term)}%", escape="\\")
+        ).order_by(func.word_similarity(term, document).desc())
+
+    if dialect == "sqlite" and SQLITE_TRIGRAM and len(term) >= MIN_TRIGRAM_LENGTH:
+        phrase = '"' + term.replace('"', '""') + '"'
+        return query.join(
+            _fts, _fts.c.rowid == literal_column("employees.rowid")
+        ).filter(
+            literal_column("employees_fts").op("MATCH")(phrase)
+        ).order_by(_fts.c.rank)
+
+    search_filter = f"%{term}%"
+    return query.filter(
+        (Employee.full_name.ilike(search_filter)) |
+        (Employee.employee_id.ilike(search_filter)) |
+        (Employee.email.ilike(search_filter))
+    )
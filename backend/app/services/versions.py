@@ -0,0 +1,101 @@
+"""
+Per-table change versions.
+
+Every commit that writes a table increments that table's row in `table_versions`,
+one row per written table. Reading a handful of versions by primary key is far
+cheaper than re-running a list or dashboard query, so the versions back the ETags
+in `app.etag`: an unchanged set of versions means an unchanged response.
+
+Writes are picked up from ORM flushes and from Core/bulk statements run through a
+Session. SQL executed outside a Session (e.g. by hand in psql) does not bump versions.
+
+Session commits bump in a short transaction of their own right after the commit,
+not inside the writer's transaction, so writers to the same table no longer hold
+their row locks while queueing on its version row. Between the two commits a
+conditional GET can still be answered 304 from the old version; the bump always
+follows the data, never precedes it, so that window is the only staleness. A bump
+that fails is logged and the table catches up on its next write. Maintenance code
+that writes on a bare connection (partitions, dedupe) calls `bump` in its own
+transaction instead.
+"""
+import logging
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.table_version import TableVersion
+
+_TOUCHED_KEY = "_touched_tables"
+_VERSIONS_TABLE = TableVersion.__tablename__
+
+logger = logging.getLogger(__name__)
+
+
+def _touched(session):
+    return session.info.setdefault(_TOUCHED_KEY, set())
+
+
+def touch(session: Session, *tables):
+    """Count tables written outside the Session (e.g. on `session.connection()`) in its next commit"""
+    _touched(session).update(tables)
+
+
+def current(db: Session, tables):
+    """Return {table: version} for the given table names, 0 for tables never written"""
+    rows = dict(db.execute(
+        select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables))
+    ).all())
+    return {table: rows.get(table, 0) for table in tables}
+
+
+def bump(bind, tables):
+    """Increment the version of each table, creating missing rows"""
+    stmt = dialect_insert(bind, TableVersion).values([{"name": table, "version": 1} for table in sorted(tables)])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TableVersion.name],
+        set_={"version": TableVersion.version + 1},
+    )
+    bind.execute(stmt)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session, flush_context):
+    touched = _touched(session)
+    for obj in session.new | session.deleted:
+        touched.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            touched.add(obj.__table__.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None and table.name != _VERSIONS_TABLE:
+            _touched(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_versions(session):
+    # The commit flushed pending objects, so every table this transaction wrote is recorded
+    tables = session.info.pop(_TOUCHED_KEY, None)
+    if not tables:
+        return
+    bind = session.get_bind()
+    try:
+        if isinstance(bind, Connection):
+            bump(bind, tables)
+        else:
+            with bind.begin() as connection:
+                bump(connection, tables)
+    except Exception:
+        # The data is already committed; failing the request would misreport the write
+        logger.exception("Could not bump table versions for %s", ", ".join(sorted(tables)))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_touched_tables(session, previous_transaction):
+    session.info.pop(_TOUCHED_KEY, None)
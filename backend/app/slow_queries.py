@@ -0,0 +1,172 @@
+"""
+Slow-query log with automatic EXPLAIN capture.
+
+Every SQL statement is timed through SQLAlchemy `before/after_cursor_execute`
+hooks on every Engine. A statement slower than `SLOW_QUERY_MS` is logged as a
+warning on the `app.slow_queries` logger with:
+
+- the duration and the calling route (`GET /api/employees/dashboard/stats`,
+  taken from the metrics request context; "-" outside a request or with
+  `METRICS_ENABLED=false`)
+- the statement and its bound parameters, redacted: strings and bytes are
+  replaced by their type and length, numbers, dates and booleans are kept
+- the plan, from `EXPLAIN QUERY PLAN` on SQLite and `EXPLAIN` elsewhere, run on
+  the same connection with a raw DBAPI cursor so it is neither timed nor hooked
+
+To stay cheap under load, only `SLOW_QUERY_SAMPLE_RATE` of the slow statements
+are logged, and a statement's plan is captured at most once per
+`SLOW_QUERY_EXPLAIN_INTERVAL` seconds; the log line says when the plan was skipped.
+The fields are also attached to the record (`extra`) for structured log handlers.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from datetime import date, datetime, time as time_of_day
+from decimal import Decimal
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import current_route
+
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "60"))
+
+logger = logging.getLogger(__name__)
+
+# Statements EXPLAIN accepts; DDL, COPY, PRAGMA and the like are logged without a plan
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# Bounds the per-statement explain timestamps; cleared wholesale when full
+MAX_TRACKED_STATEMENTS = 1000
+
+_SAFE_TYPES = (bool, int, float, Decimal, date, datetime, time_of_day, type(None))
+
+
+def redact(parameters):
+    """Bound parameters with every string or bytes value replaced by its type and length"""
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return type(parameters)(redact(value) for value in parameters)
+    if isinstance(parameters, _SAFE_TYPES):
+        return parameters
+    if isinstance(parameters, (str, bytes, bytearray, memoryview)):
+        return f"<{type(parameters).__name__}:{len(parameters)}>"
+    return f"<{type(parameters).__name__}>"
+
+
+def explain(connection, statement, parameters):
+    """Plan lines for `statement`, or None when it cannot be explained"""
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    dialect = connection.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    cursor = connection.connection.cursor()
+    # A failed EXPLAIN would abort the surrounding PostgreSQL transaction
+    savepoint = dialect == "postgresql" and connection.in_transaction()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return None
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+    if dialect == "sqlite":
+        # (id, parent, notused, detail) rows; indent children under their parent
+        depth = {0: -1}
+        lines = []
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node] + detail)
+        return lines
+    return [" ".join(str(value) for value in row) for row in rows]
+
+
+class SlowQueryLog:
+    """Threshold, sampling and per-statement EXPLAIN throttling for the slow-query log"""
+
+    def __init__(self, threshold_ms=SLOW_QUERY_MS, sample_rate=SLOW_QUERY_SAMPLE_RATE,
+                 explain=SLOW_QUERY_EXPLAIN, explain_interval=SLOW_QUERY_EXPLAIN_INTERVAL):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self._lock = threading.Lock()
+        self._explained = {}
+
+    def reset(self):
+        with self._lock:
+            self._explained.clear()
+
+    def _should_explain(self, statement):
+        if not self.explain:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained.get(statement)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            if len(self._explained) >= MAX_TRACKED_STATEMENTS:
+                self._explained.clear()
+            self._explained[statement] = now
+            return True
+
+    def observe(self, connection, statement, parameters, executemany, duration):
+        duration_ms = duration * 1000
+        if duration_ms < self.threshold_ms or random.random() >= self.sample_rate:
+            return
+
+        route = current_route() or "-"
+        if executemany:
+            # One statement per parameter set; log the batch size and the first set
+            shown = {"executemany": len(parameters), "first": redact(parameters[0]) if parameters else None}
+            plan = None
+        else:
+            shown = redact(parameters)
+            plan = explain(connection, statement, parameters) if self._should_explain(statement) else None
+
+        if plan is not None:
+            plan_text = "\n".join("    " + line for line in plan)
+        elif executemany or not self.explain:
+            plan_text = "    (not captured)"
+        else:
+            plan_text = "    (not captured: explained recently or not explainable)"
+        logger.warning(
+            "Slow query: %.1f ms [%s]\n%s\nParameters: %r\nPlan:\n%s",
+            duration_ms, route, statement, shown, plan_text,
+            extra={
+                "duration_ms": round(duration_ms, 3),
+                "route": route,
+                "statement": statement,
+                "parameters": shown,
+                "plan": plan,
+            },
+        )
+
+
+slow_query_log = SlowQueryLog()
+
+
+if SLOW_QUERY_LOG_ENABLED:
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _check_duration(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is not None:
+            slow_query_log.observe(conn, statement, parameters, executemany, time.perf_counter() - started)
@@ -0,0 +1,172 @@
+"""
+Benchmark: ORM hydration vs column projection for the list endpoints.
+
+Compares, per 1,000 rows, the CPU time and peak Python memory of producing the
+response body of GET /api/employees/ and GET /api/attendance/ along
+
+- orm:        the old path: full Employee/Attendance instances (identity map,
+              instrumented attributes), validated into the response models and dumped
+              to JSON as FastAPI does for a route with `response_model`
+- projection: the path the routes take now: only the response columns as plain
+              rows, serialized once by `app.responses.json_response`
+
+CPU times are noisy at this scale, so the median of the runs is reported with the
+spread (max - min) of both paths; a difference smaller than that spread is reported
+as "within noise" rather than as a saving.
+
+Usage (from backend/):
+    python -m benchmarks.projection [--rows 5000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import contains_eager, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.enums import AttendanceStatus
+from app.models import Attendance, Employee
+from app.responses import json_response
+from app.routes.attendance import ATTENDANCE_RESPONSE_COLUMNS
+from app.routes.employees import EMPLOYEE_RESPONSE_COLUMNS
+from app.schemas.attendance import AttendanceWithEmployeeName
+from app.schemas.employee import EmployeeResponse
+
+
+def seed(session, rows):
+    """Insert `rows` employees with one attendance record each"""
+    now = datetime.now(timezone.utc)
+    employees = [
+        {"id": str(uuid.uuid4()), "employee_id": f"EMP{i:06d}", "full_name": f"Employee {i}",
+         "email": f"emp{i}@example.com", "department": f"Dept {i % 12}", "is_active": True,
+         "created_at": now - timedelta(seconds=i)}
+        for i in range(rows)
+    ]
+    session.execute(insert(Employee), employees)
+    session.execute(insert(Attendance), [
+        {"id": str(uuid.uuid4()), "employee_id": employee["id"], "date": date.today() - timedelta(days=i % 30),
+         "status": AttendanceStatus.PRESENT if i % 5 else AttendanceStatus.ABSENT, "created_at": now}
+        for i, employee in enumerate(employees)
+    ])
+    session.commit()
+
+
+EMPLOYEES = TypeAdapter(List[EmployeeResponse])
+ATTENDANCE = TypeAdapter(List[AttendanceWithEmployeeName])
+
+
+def employees_orm(session, rows):
+    employees = session.query(Employee).filter(Employee.is_active == True).order_by(
+        Employee.created_at.desc(), Employee.id.desc()).limit(rows).all()
+    return EMPLOYEES.dump_json(EMPLOYEES.validate_python(employees, from_attributes=True))
+
+
+def employees_projection(session, rows):
+    employees = session.execute(
+        select(*EMPLOYEE_RESPONSE_COLUMNS).where(Employee.is_active == True)
+        .order_by(Employee.created_at.desc(), Employee.id.desc()).limit(rows)
+    ).mappings().all()
+    return json_response(employees).body
+
+
+def attendance_orm(session, rows):
+    records = session.query(Attendance).join(Attendance.employee).options(contains_eager(Attendance.employee)).filter(
+        Employee.is_active == True).order_by(Attendance.date.desc(), Attendance.id.desc()).limit(rows).all()
+    return ATTENDANCE.dump_json([
+        AttendanceWithEmployeeName(
+            id=record.id, employee_id=record.employee_id, employee_name=record.employee.full_name,
+            employee_employee_id=record.employee.employee_id, date=record.date, status=record.status,
+            created_at=record.created_at,
+        )
+        for record in records
+    ])
+
+
+def attendance_projection(session, rows):
+    records = session.execute(
+        select(*ATTENDANCE_RESPONSE_COLUMNS).join(Employee, Employee.id == Attendance.employee_id)
+        .where(Employee.is_active == True).order_by(Attendance.date.desc(), Attendance.id.desc()).limit(rows)
+    ).mappings().all()
+    return json_response(records).body
+
+
+def measure(Session, read, rows, repeat):
+    """CPU seconds of every run and the lowest peak traced bytes for one read, scaled to 1,000 rows"""
+    with Session() as session:
+        assert len(json.loads(read(session, rows))) == rows
+    cpu, peak = [], []
+    for _ in range(repeat):
+        # A fresh session per run so the identity map starts empty, as it does per request
+        with Session() as session:
+            started = time.process_time()
+            read(session, rows)
+            cpu.append(time.process_time() - started)
+        # Memory is traced in a separate run because tracemalloc slows allocation down
+        with Session() as session:
+            tracemalloc.start()
+            read(session, rows)
+            peak.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    scale = 1000 / rows
+    return [seconds * scale for seconds in cpu], min(peak) * scale
+
+
+def compare(orm_cpu, projection_cpu):
+    """CPU saving of the projection path in percent, or None when it is within run-to-run noise"""
+    noise = max(max(orm_cpu) - min(orm_cpu), max(projection_cpu) - min(projection_cpu))
+    difference = statistics.median(orm_cpu) - statistics.median(projection_cpu)
+    if abs(difference) <= noise:
+        return None
+    return difference / statistics.median(orm_cpu) * 100
+
+
+def run(rows, repeat):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        seed(session, rows)
+
+    results = {}
+    for name, orm, projection in [
+        ("employees", employees_orm, employees_projection),
+        ("attendance", attendance_orm, attendance_projection),
+    ]:
+        results[name] = {
+            "orm": measure(Session, orm, rows, repeat),
+            "projection": measure(Session, projection, rows, repeat),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=5000, help="Rows per read (default 5000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant; the median is reported (default 5)")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.repeat)
+    print(f"Per 1,000 rows (median of {args.repeat} runs, {args.rows} rows per read)")
+    print(f"{'endpoint':<12}{'path':<12}{'cpu ms':>10}{'spread ms':>11}{'peak KiB':>12}")
+    for name, paths in results.items():
+        for path, (cpu, peak) in paths.items():
+            spread = max(cpu) - min(cpu)
+            print(f"{name:<12}{path:<12}{statistics.median(cpu) * 1000:>10.2f}{spread * 1000:>11.2f}{peak / 1024:>12.1f}")
+        (orm_cpu, orm_peak), (proj_cpu, proj_peak) = paths["orm"], paths["projection"]
+        saving = compare(orm_cpu, proj_cpu)
+        cpu_text = "within noise" if saving is None else f"{saving:.0f}%"
+        print(f"{'':<12}{'saved':<12}{cpu_text:>21}{(1 - proj_peak / orm_peak) * 100:>11.0f}%")
+
+if __name__ == "__main__":
+    main()
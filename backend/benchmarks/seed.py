@@ -0,0 +1,135 @@
+"""
+Bulk seeding for scale benchmarks.
+
+Employees are built from the test factories (`tests.factories.EmployeeFactory`,
+as plain dicts, never through a session) and inserted with one Core executemany.
+Attendance is generated as one record per employee per day and streamed into
+the database in chunks:
+
+- PostgreSQL: COPY FROM STDIN, one CSV buffer per chunk
+- other databases: driver-level executemany, skipping per-row type processing
+
+Secondary attendance indexes are dropped for the load and rebuilt afterwards,
+and attendance IDs are UUID-formatted but sequential so primary key inserts
+append instead of landing at random B-tree pages. The daily rollup is rebuilt
+once at the end, since bulk loads bypass the ORM events that maintain it.
+"""
+import csv
+import io
+import itertools
+import uuid
+from datetime import timedelta
+
+import factory
+from sqlalchemy import func, insert, select, text
+
+from app.database import SessionLocal, engine, init_db
+from app.enums import AttendanceStatus
+from app.models import Attendance, Employee
+from app.services import partitions, rollups
+from tests.factories import EmployeeFactory
+
+DEPARTMENTS = [
+    "Engineering", "Sales", "Marketing", "Finance", "HR", "Operations",
+    "Support", "Legal", "Product", "Design", "Research", "Facilities",
+]
+
+CHUNK_SIZE = 50_000
+
+# Employee codes from EmployeeFactory; employees the benchmark scenarios create use other prefixes
+SEEDED_CODE_PREFIX = "EMP"
+
+ATTENDANCE_COLUMNS = ("id", "employee_id", "date", "status")
+
+
+def employee_rows(count):
+    """Employee attributes from the test factory, spread evenly over DEPARTMENTS"""
+    EmployeeFactory.reset_sequence()
+    return factory.build_batch(
+        dict, count, FACTORY_CLASS=EmployeeFactory, department=factory.Iterator(DEPARTMENTS)
+    )
+
+
+def attendance_rows(employee_ids, days, end_date):
+    """(id, employee_id, date, status) tuples for `days` days up to `end_date`, about 80% present"""
+    sequence = itertools.count()
+    for offset in range(days - 1, -1, -1):
+        day = (end_date - timedelta(days=offset)).isoformat()
+        for index, employee_id in enumerate(employee_ids):
+            status = AttendanceStatus.ABSENT if (index * 7 + offset) % 5 == 0 else AttendanceStatus.PRESENT
+            # Enum columns store member names
+            yield str(uuid.UUID(int=next(sequence))), employee_id, day, status.name
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+
+def bulk_load(connection, table, columns, rows, chunk_size=CHUNK_SIZE):
+    """Stream tuples into `table`; returns the number of rows loaded"""
+    loaded = 0
+    column_list = ", ".join(columns)
+    if connection.dialect.name == "postgresql":
+        cursor = connection.connection.cursor()
+        for chunk in _chunks(rows, chunk_size):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            loaded += len(chunk)
+        return loaded
+
+    marker = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+    statement = f"INSERT INTO {table} ({column_list}) VALUES ({', '.join([marker] * len(columns))})"
+    for chunk in _chunks(rows, chunk_size):
+        connection.exec_driver_sql(statement, chunk)
+        loaded += len(chunk)
+    return loaded
+
+
+def row_counts():
+    """(seeded employees, attendance records) currently in the database"""
+    with engine.connect() as connection:
+        return (
+            connection.execute(
+                select(func.count()).select_from(Employee).where(Employee.employee_id.startswith(SEEDED_CODE_PREFIX))
+            ).scalar(),
+            connection.execute(select(func.count()).select_from(Attendance)).scalar(),
+        )
+
+
+def seed(employees, days, end_date, log=print):
+    """Create the schema and load `employees` x `days` attendance records"""
+    init_db()
+    with engine.begin() as connection:
+        log(f"Building {employees:,} employees from the test factories")
+        connection.execute(insert(Employee), employee_rows(employees))
+        employee_ids = connection.execute(select(Employee.id).order_by(Employee.employee_id)).scalars().all()
+
+        if partitions.is_partitioned(connection):
+            month, existing = end_date - timedelta(days=days - 1), partitions.existing_partitions(connection)
+            while month <= end_date:
+                if partitions.partition_name(month) not in existing:
+                    partitions.create_partition(connection, month)
+                month = partitions.next_month(month)
+
+        indexes = [index for index in Attendance.__table__.indexes]
+        for index in indexes:
+            index.drop(connection)
+        log(f"Loading {employees * days:,} attendance records")
+        loaded = bulk_load(connection, Attendance.__tablename__, ATTENDANCE_COLUMNS,
+                           attendance_rows(employee_ids, days, end_date))
+        log("Rebuilding attendance indexes")
+        for index in indexes:
+            index.create(connection)
+        connection.execute(text("ANALYZE"))
+
+    db = SessionLocal()
+    try:
+        log("Rebuilding the attendance rollup")
+        rollups.rebuild(db)
+    finally:
+        db.close()
+    return loaded
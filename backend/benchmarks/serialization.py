@@ -0,0 +1,73 @@
+"""
+Benchmark: response-model validation + serialization vs direct JSON for list rows.
+
+Compares, per 1,000 projected rows, the CPU time of
+
+- validated: FastAPI's path for a returned list with `response_model` set,
+             validating every row into the model and dumping it with Pydantic
+- direct:    `app.responses.json_response`, serializing the trusted rows once
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--rows 5000] [--repeat 5]
+"""
+import argparse
+import os
+import time
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Attendance, Employee
+from app.responses import JSON_RESPONSE_CLASS, json_response
+from app.routes.attendance import ATTENDANCE_RESPONSE_COLUMNS
+from app.routes.employees import EMPLOYEE_RESPONSE_COLUMNS
+from app.schemas.attendance import AttendanceWithEmployeeName
+from app.schemas.employee import EmployeeResponse
+from benchmarks.projection import seed
+
+
+def best_cpu(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        func()
+        timings.append(time.process_time() - started)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=5000, help="Rows per response (default 5000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant; the best is reported (default 5)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        seed(session, args.rows)
+        datasets = {
+            "employees": (EmployeeResponse, session.execute(select(*EMPLOYEE_RESPONSE_COLUMNS)).mappings().all()),
+            "attendance": (AttendanceWithEmployeeName, session.execute(
+                select(*ATTENDANCE_RESPONSE_COLUMNS).join(Employee, Employee.id == Attendance.employee_id)
+            ).mappings().all()),
+        }
+
+    scale = 1000 / args.rows
+    print(f"Per 1,000 rows (best of {args.repeat}, {args.rows} rows per response, direct = {JSON_RESPONSE_CLASS.__name__})")
+    print(f"{'endpoint':<12}{'validated ms':>14}{'direct ms':>12}{'saved':>8}")
+    for name, (model, rows) in datasets.items():
+        adapter = TypeAdapter(List[model])
+        validated = best_cpu(lambda: adapter.dump_json(adapter.validate_python(rows, from_attributes=True)), args.repeat)
+        direct = best_cpu(lambda: json_response(rows).body, args.repeat)
+        print(f"{name:<12}{validated * scale * 1000:>14.2f}{direct * scale * 1000:>12.2f}{(1 - direct / validated) * 100:>7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Scale benchmark: every API route against a realistically sized database.
+
+Seeds (once) 100,000 employees and 100 days of attendance for each, 10M records,
+through `benchmarks.seed`, then drives every route of the app in-process through
+the full middleware stack and records, per scenario:
+
+- latency p50 / p95 / p99 and mean over `--iterations` timed requests
+- SQL statements per request (min / median / max)
+- peak Python memory while serving one request (tracemalloc, in separate runs)
+
+The results are written as a JSON report keyed by scenario, so two commits can be
+compared with `--compare`. Routes the app exposes that no scenario covers are
+listed under "uncovered" in the report.
+
+The database is whatever DATABASE_URL points at (a SQLite file under
+benchmarks/.data by default). A database already holding exactly the requested
+data set (the seeded employees and their attendance; employees the write
+scenarios add are not counted) is reused; any other non-empty database, larger or
+smaller, is refused, because its timings would cover a different data size.
+
+Usage (from backend/):
+    python -m benchmarks.suite [--employees 100000] [--days 100] [--iterations 30]
+                               [--only attendance] [--output report.json] [--compare base.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+BENCHMARK_DIR = Path(__file__).parent
+DATA_DIR = BENCHMARK_DIR / ".data"
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DATA_DIR / 'suite.db'}")
+# Every request should pay for its own lookups rather than hit a warm employee cache
+os.environ.setdefault("EMPLOYEE_CACHE_SIZE", "0")
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import event, inspect, select
+
+from app.database import engine
+from app.jobs import job_runner
+from app.main import app
+from app.models import Attendance, Employee
+from benchmarks import seed
+
+
+class Scenario(NamedTuple):
+    method: str
+    route: str
+    # (context, iteration, prepared) -> keyword arguments for TestClient.request
+    build: Callable
+    label: str = ""
+    # Untimed setup run before each request; its result is passed to build as `prepared`
+    prepare: Optional[Callable] = None
+    # Untimed step run with each response, e.g. to let background work finish before the next request
+    settle: Optional[Callable] = None
+
+    @property
+    def name(self):
+        return f"{self.method} {self.route}{self.label}"
+
+
+def _employee(context, i):
+    return context["employees"][i % len(context["employees"])]
+
+
+def _new_employee(context, i, prefix):
+    tag = f"{prefix}{context['run']}{i:04d}"
+    return {"employee_id": tag, "full_name": f"Bench {tag}", "email": f"{tag.lower()}@example.com", "department": "Engineering"}
+
+
+def _create_employee(client, context, i):
+    return client.post("/api/employees/", json=_new_employee(context, i, "D")).json()["id"]
+
+
+def _mark_old_attendance(client, context, i):
+    # Dates long before the seeded range never collide with seeded records
+    return client.post("/api/attendance/", json={
+        "employee_id": _employee(context, i)["id"],
+        "date": str(date(2000, 1, 1) + timedelta(days=context["run"] % 100 * 100 + i)),
+        "status": "Present",
+    }).json()["id"]
+
+
+def _wait_for_job(response):
+    job_runner.wait(response.json()["id"])
+
+
+def _finished_report(client, context, i):
+    job_id = client.post("/api/reports/employee-summaries", json={"department": _employee(context, i)["department"]}).json()["id"]
+    job_runner.wait(job_id)
+    return job_id
+
+
+SCENARIOS = [
+    Scenario("GET", "/", lambda c, i, p: {"url": "/"}),
+    Scenario("GET", "/api/health", lambda c, i, p: {"url": "/api/health"}),
+    Scenario("GET", "/api/health/pool", lambda c, i, p: {"url": "/api/health/pool"}),
+    Scenario("GET", "/api/health/cache", lambda c, i, p: {"url": "/api/health/cache"}),
+    Scenario("GET", "/metrics", lambda c, i, p: {"url": "/metrics"}),
+
+    Scenario("GET", "/api/employees/dashboard/stats", lambda c, i, p: {"url": "/api/employees/dashboard/stats"}),
+    Scenario("GET", "/api/employees/", lambda c, i, p: {"url": "/api/employees/", "params": {"limit": 100}}),
+    Scenario("GET", "/api/employees/", lambda c, i, p: {
+        "url": "/api/employees/", "params": {"search": "smith", "limit": 100},
+    }, label=" ?search"),
+    Scenario("GET", "/api/employees/", lambda c, i, p: {
+        "url": "/api/employees/", "params": {"department": "Sales", "limit": 100},
+    }, label=" ?department"),
+    Scenario("GET", "/api/employees/{employee_id}", lambda c, i, p: {"url": f"/api/employees/{_employee(c, i)['id']}"}),
+    Scenario("GET", "/api/employees/{employee_id}/summary", lambda c, i, p: {
+        "url": f"/api/employees/{_employee(c, i)['id']}/summary",
+    }),
+    Scenario("POST", "/api/employees/summaries", lambda c, i, p: {
+        "url": "/api/employees/summaries",
+        "json": {"department": _employee(c, i)["department"], "start_date": str(c["end_date"] - timedelta(days=29))},
+    }, label=" ?department"),
+    Scenario("POST", "/api/employees/sync", lambda c, i, p: {
+        "url": "/api/employees/sync", "params": {"dry_run": True, "deactivate_missing": False}, "json": c["roster"],
+    }, label=" ?dry_run (1,000 entries)"),
+    Scenario("POST", "/api/employees/", lambda c, i, p: {"url": "/api/employees/", "json": _new_employee(c, i, "C")}),
+    Scenario("PUT", "/api/employees/{employee_id}", lambda c, i, p: {
+        "url": f"/api/employees/{_employee(c, 0)['id']}", "json": {"full_name": f"Renamed {i % 2}"},
+    }),
+    Scenario("DELETE", "/api/employees/{employee_id}", lambda c, i, p: {"url": f"/api/employees/{p}"},
+             prepare=_create_employee),
+
+    Scenario("POST", "/api/attendance/", lambda c, i, p: {
+        "url": "/api/attendance/", "params": {"upsert": True},
+        "json": {"employee_id": _employee(c, i)["id"], "date": str(c["end_date"]), "status": "Present"},
+    }, label=" ?upsert"),
+    Scenario("POST", "/api/attendance/bulk", lambda c, i, p: {
+        "url": "/api/attendance/bulk",
+        "json": {"items": [{"employee_id": employee["id"], "date": str(c["end_date"]), "status": "Present"}
+                           for employee in c["employees"][:100]]},
+    }, label=" (100 items)"),
+    Scenario("GET", "/api/attendance/", lambda c, i, p: {"url": "/api/attendance/", "params": {"limit": 100}}),
+    Scenario("GET", "/api/attendance/", lambda c, i, p: {
+        "url": "/api/attendance/",
+        "params": {"start_date": str(c["end_date"] - timedelta(days=6)), "status": "Absent", "limit": 100},
+    }, label=" ?start_date&status"),
+    Scenario("GET", "/api/attendance/export", lambda c, i, p: {
+        "url": "/api/attendance/export", "params": {"start_date": str(c["end_date"]), "end_date": str(c["end_date"])},
+    }, label=" (one day)"),
+    Scenario("GET", "/api/attendance/employee/{employee_id}", lambda c, i, p: {
+        "url": f"/api/attendance/employee/{_employee(c, i)['id']}",
+    }),
+    Scenario("GET", "/api/attendance/today", lambda c, i, p: {"url": "/api/attendance/today"}),
+    Scenario("GET", "/api/attendance/trend", lambda c, i, p: {"url": "/api/attendance/trend"}),
+    Scenario("GET", "/api/attendance/matrix", lambda c, i, p: {"url": "/api/attendance/matrix"}),
+    Scenario("GET", "/api/attendance/matrix", lambda c, i, p: {
+        "url": "/api/attendance/matrix", "params": {"department": _employee(c, i)["department"]},
+    }, label=" ?department"),
+    Scenario("PUT", "/api/attendance/{attendance_id}", lambda c, i, p: {
+        "url": f"/api/attendance/{c['attendance_id']}", "params": {"status": ("Present", "Absent")[i % 2]},
+    }),
+    Scenario("DELETE", "/api/attendance/{attendance_id}", lambda c, i, p: {"url": f"/api/attendance/{p}"},
+             prepare=_mark_old_attendance),
+
+    # Report requests only queue a job; the job itself runs outside the timed request
+    Scenario("POST", "/api/reports/attendance-export", lambda c, i, p: {
+        "url": "/api/reports/attendance-export", "json": {"start_date": str(c["end_date"] - timedelta(days=29))},
+    }, settle=_wait_for_job),
+    Scenario("POST", "/api/reports/employee-summaries", lambda c, i, p: {
+        "url": "/api/reports/employee-summaries", "json": {"department": _employee(c, i)["department"]},
+    }, settle=_wait_for_job),
+    Scenario("GET", "/api/reports/{job_id}", lambda c, i, p: {"url": f"/api/reports/{p}"}, prepare=_finished_report),
+    Scenario("GET", "/api/reports/{job_id}/result", lambda c, i, p: {"url": f"/api/reports/{p}/result"},
+             prepare=_finished_report),
+]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return values[max(0, min(len(values) - 1, round(fraction * len(values) + 0.5) - 1))]
+
+
+def uncovered_routes(scenarios):
+    covered = {(scenario.method, scenario.route) for scenario in scenarios}
+    exposed = {
+        (method, route.path)
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    return sorted(f"{method} {path}" for method, path in exposed - covered)
+
+
+def build_context():
+    with engine.connect() as connection:
+        sample = [
+            dict(row) for row in connection.execute(
+                select(Employee.id, Employee.employee_id, Employee.full_name, Employee.email, Employee.department)
+                .where(Employee.is_active == True).order_by(Employee.employee_id).limit(1000)
+            ).mappings()
+        ]
+        end_date = connection.execute(select(Attendance.date).order_by(Attendance.date.desc()).limit(1)).scalar()
+        attendance_id = connection.execute(
+            select(Attendance.id).where(Attendance.employee_id == sample[0]["id"], Attendance.date == end_date)
+        ).scalar()
+    return {
+        "employees": sample,
+        "end_date": end_date,
+        "attendance_id": attendance_id,
+        "roster": [{key: employee[key] for key in ("employee_id", "full_name", "email", "department")} for employee in sample],
+        # Distinguishes identities created by repeated runs against the same database
+        "run": int(time.time()) % 100_000,
+    }
+
+
+def run_scenario(client, scenario, context, iterations, warmup, memory_runs):
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, execution_context, executemany):
+        # Report jobs run on their own threads and are not part of the request
+        if not threading.current_thread().name.startswith("report-job"):
+            statements.append(statement)
+
+    latencies, queries, statuses = [], [], {}
+    for i in range(warmup + iterations):
+        prepared = scenario.prepare(client, context, i) if scenario.prepare else None
+        request = scenario.build(context, i, prepared)
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", _count)
+        started = time.perf_counter()
+        try:
+            response = client.request(scenario.method, **request)
+        finally:
+            elapsed = time.perf_counter() - started
+            event.remove(engine, "before_cursor_execute", _count)
+        if scenario.settle:
+            scenario.settle(response)
+        if i >= warmup:
+            latencies.append(elapsed)
+            queries.append(len(statements))
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    peaks = []
+    for i in range(memory_runs):
+        prepared = scenario.prepare(client, context, warmup + iterations + i) if scenario.prepare else None
+        request = scenario.build(context, warmup + iterations + i, prepared)
+        tracemalloc.start()
+        response = client.request(scenario.method, **request)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if scenario.settle:
+            scenario.settle(response)
+
+    latencies.sort()
+    return {
+        "method": scenario.method,
+        "route": scenario.route,
+        "status": statuses,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "queries": {"min": min(queries), "median": statistics.median(queries), "max": max(queries)},
+        "peak_kib": round(max(peaks) / 1024, 1) if peaks else None,
+    }
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def compare(base, current):
+    """Print p95 latency and query count changes of `current` against `base`"""
+    print(f"\n{'scenario':<58}{'p95 ms':>10}{'base':>10}{'change':>9}{'queries':>10}{'base':>7}")
+    for name, result in current["routes"].items():
+        before = base["routes"].get(name)
+        if before is None:
+            print(f"{name:<58}{result['p95_ms']:>10.2f}{'new':>10}")
+            continue
+        change = (result["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+        print(f"{name:<58}{result['p95_ms']:>10.2f}{before['p95_ms']:>10.2f}{change:>8.0f}%"
+              f"{result['queries']['max']:>10}{before['queries']['max']:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--employees", type=int, default=100_000, help="Employees to seed (default 100000)")
+    parser.add_argument("--days", type=int, default=100, help="Days of attendance per employee (default 100)")
+    parser.add_argument("--iterations", type=int, default=30, help="Timed requests per scenario (default 30)")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per scenario (default 2)")
+    parser.add_argument("--memory-runs", type=int, default=3, help="Traced requests per scenario for peak memory (default 3)")
+    parser.add_argument("--only", help="Run only scenarios whose name contains this text")
+    parser.add_argument("--output", type=Path, help="Report path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier report to compare the results against")
+    args = parser.parse_args(argv)
+
+    DATA_DIR.mkdir(exist_ok=True)
+    employees, records = seed.row_counts() if inspect(engine).has_table(Employee.__tablename__) else (0, 0)
+    if (employees, records) == (0, 0):
+        started = time.perf_counter()
+        records = seed.seed(args.employees, args.days, date.today())
+        employees = args.employees
+        print(f"Seeded in {time.perf_counter() - started:.0f}s")
+    elif (employees, records) != (args.employees, args.employees * args.days):
+        print(f"{engine.url.render_as_string()} already holds {employees:,} seeded employees and {records:,} attendance records; "
+              "point DATABASE_URL at an empty database or one seeded with the same sizes", file=sys.stderr)
+        return 1
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or args.only in scenario.name]
+    context = build_context()
+    results = {}
+    with TestClient(app) as client:
+        for scenario in scenarios:
+            results[scenario.name] = run_scenario(client, scenario, context, args.iterations, args.warmup, args.memory_runs)
+            result = results[scenario.name]
+            print(f"{scenario.name:<58}p50 {result['p50_ms']:>9.2f}  p95 {result['p95_ms']:>9.2f}  "
+                  f"p99 {result['p99_ms']:>9.2f} ms  queries {result['queries']['max']:>3}  peak {result['peak_kib'] or '-':>9} KiB")
+
+    commit, dirty = git_revision()
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": commit,
+            "dirty": dirty,
+            "database": engine.dialect.name,
+            "employees": employees,
+            "attendance_records": records,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "python": platform.python_version(),
+        },
+        "routes": results,
+        "uncovered": uncovered_routes(SCENARIOS),
+    }
+    output = args.output or BENCHMARK_DIR / "results" / f"{(commit or 'report')[:12]}{'-dirty' if dirty else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nReport written to {output}")
+    if report["uncovered"]:
+        print("Routes without a scenario: " + ", ".join(report["uncovered"]))
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
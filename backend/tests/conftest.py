@@ -4,11 +4,12 @@ Provides database setup, test client, and sample data fixtures.
 """
 import os
 import pytest
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticMemoryPool
+from sqlalchemy.pool import StaticPool
 import factory
 
 # Set test environment before importing app modules
@@ -20,6 +21,8 @@ from app.main import app
 from app.models.employee import Employee
 from app.models.attendance import Attendance
 from app.enums import AttendanceStatus
+from app.metrics import request_metrics
+from app.services.employee_cache import employee_cache
 
 # Import factories
 from tests.factories import (
@@ -44,7 +47,7 @@ SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticMemoryPool,
+    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -53,6 +56,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def db_session():
     """Create a fresh database session for each test."""
     Base.metadata.create_all(bind=engine)
+    employee_cache.clear()
+    request_metrics.reset()
     session = TestingSessionLocal()
     try:
         yield session
@@ -61,6 +66,71 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@contextmanager
+def count_queries():
+    """Record every SQL statement run on the test engine while the block runs."""
+    statements = []
+    
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def query_counter():
+    """
+    Context manager that records every SQL statement run on the test engine.
+    
+    Usage:
+        with query_counter() as queries:
+            client.get("/api/employees/")
+        assert len(queries) <= 2
+    """
+    return count_queries
+
+
+class QueryBudget:
+    """
+    ASGI wrapper failing any request that runs more SQL statements than its route's budget.
+    
+    Budgets are keyed by "METHOD /route/template", the template the router matched
+    (e.g. "GET /api/employees/{employee_id}"). A request to a route without a
+    budget fails too, so new routes have to declare one. The employee cache is
+    cleared before every request, so budgets cover the cold-cache worst case.
+    """
+    
+    def __init__(self, app, budgets):
+        self.app = app
+        self.budgets = budgets
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        employee_cache.clear()
+        with count_queries() as queries:
+            await self.app(scope, receive, send)
+        
+        # The router stores the matched route in the shared scope
+        route = scope.get("route")
+        if route is None:
+            return
+        key = f"{scope['method']} {route.path}"
+        if key not in self.budgets:
+            raise AssertionError(f"No query budget declared for {key}")
+        if len(queries) > self.budgets[key]:
+            raise AssertionError(
+                f"{key} ran {len(queries)} SQL statements, over its budget of {self.budgets[key]}:\n"
+                + "\n".join(queries)
+            )
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with database dependency override."""
@@ -183,6 +253,8 @@ def sample_data(db_session):
 def db_session():
     """Create a fresh database session for each test."""
     Base.metadata.create_all(bind=engine)
+    employee_cache.clear()
+    request_metrics.reset()
     session = TestingSessionLocal()
     try:
         yield session
@@ -192,8 +264,12 @@ def db_session():
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with database dependency override."""
+def client(db_session, request):
+    """
+    Create a test client with database dependency override.
+    
+    When the test module declares QUERY_BUDGETS, every request is checked against it (see QueryBudget).
+    """
     def override_get_db():
         try:
             yield db_session
@@ -201,7 +277,8 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
+    budgets = getattr(request.module, "QUERY_BUDGETS", None)
+    with TestClient(app if budgets is None else QueryBudget(app, budgets)) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
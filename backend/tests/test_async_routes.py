@@ -0,0 +1,148 @@
+"""
+Tests for the opt-in async database mode.
+Runs the async route clones against an aiosqlite engine sharing a SQLite file with a sync session.
+"""
+import inspect
+import pytest
+from datetime import date
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base, async_database_url, get_async_db
+from app.enums import AttendanceStatus
+from app.models.attendance_summary import AttendanceDailySummary
+from app.routes import attendance_router, build_async_router, employees_router
+
+
+@pytest.fixture
+def async_app(tmp_path):
+    """App serving only the async route clones, plus a sync session on the same database."""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    async_engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    AsyncTestingSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as db:
+            yield db
+
+    session = sessionmaker(bind=sync_engine)()
+
+    app = FastAPI()
+    app.include_router(build_async_router(employees_router, attendance_router))
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(app) as test_client:
+        yield test_client, session
+    session.close()
+    sync_engine.dispose()
+
+
+class TestAsyncDatabaseUrl:
+    """Tests for mapping database URLs onto async drivers."""
+
+    def test_postgres_uses_asyncpg(self):
+        """Test PostgreSQL URLs, with or without a sync driver, map to asyncpg."""
+        assert async_database_url("postgresql://u:p@db/hrms") == "postgresql+asyncpg://u:p@db/hrms"
+        assert async_database_url("postgresql+psycopg2://u:p@db/hrms") == "postgresql+asyncpg://u:p@db/hrms"
+
+    def test_sqlite_uses_aiosqlite(self):
+        """Test SQLite URLs map to aiosqlite."""
+        assert async_database_url("sqlite:///./hrms.db") == "sqlite+aiosqlite:///./hrms.db"
+
+    def test_unsupported_backend(self):
+        """Test other databases are rejected."""
+        with pytest.raises(ValueError):
+            async_database_url("mysql://u:p@db/hrms")
+
+
+class TestAsyncRouter:
+    """Tests for the cloned async routes."""
+
+    def test_routes_are_coroutines(self):
+        """Test every database route except the streaming export gets an async clone."""
+        router = build_async_router(employees_router, attendance_router)
+        names = {route.name for route in router.routes}
+
+        assert "get_employees" in names
+        assert "mark_attendance_bulk" in names
+        assert "export_attendance" not in names
+        assert all(inspect.iscoroutinefunction(route.endpoint) for route in router.routes)
+        assert all(
+            inspect.iscoroutinefunction(dependency.dependency)
+            for route in router.routes for dependency in route.dependencies
+        )
+        assert not any(route.include_in_schema for route in router.routes)
+
+    def test_employee_crud(self, async_app):
+        """Test creating, listing and reading employees through the async session."""
+        client, _ = async_app
+        response = client.post("/api/employees/", json={
+            "employee_id": "EMP001",
+            "full_name": "Ada Lovelace",
+            "email": "ada@example.com",
+            "department": "Engineering"
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        created = response.json()
+
+        response = client.get("/api/employees/")
+        assert response.status_code == status.HTTP_200_OK
+        assert [e["employee_id"] for e in response.json()] == ["EMP001"]
+
+        response = client.get(f"/api/employees/{created['id']}")
+        assert response.json()["full_name"] == "Ada Lovelace"
+
+        response = client.get("/api/employees/missing-id")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_attendance_updates_rollup(self, async_app):
+        """Test writes through the async session still maintain the attendance rollup."""
+        client, session = async_app
+        employee = client.post("/api/employees/", json={
+            "employee_id": "EMP002",
+            "full_name": "Grace Hopper",
+            "email": "grace@example.com",
+            "department": "Engineering"
+        }).json()
+
+        response = client.post("/api/attendance/", json={
+            "employee_id": employee["id"],
+            "date": str(date.today()),
+            "status": AttendanceStatus.PRESENT.value
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["employee_name"] == "Grace Hopper"
+
+        summary = session.query(AttendanceDailySummary).one()
+        assert (summary.department, summary.present_count) == ("Engineering", 1)
+
+        response = client.get("/api/employees/dashboard/stats")
+        assert response.json()["today_attendance"]["present"] == 1
+
+    def test_conditional_get(self, async_app):
+        """Test ETags are checked through the async session and change after a write."""
+        client, _ = async_app
+        response = client.get("/api/employees/")
+        etag = response.headers["ETag"]
+
+        response = client.get("/api/employees/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.post("/api/employees/", json={
+            "employee_id": "EMP003",
+            "full_name": "Alan Turing",
+            "email": "alan@example.com",
+            "department": "Research"
+        })
+        response = client.get("/api/employees/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
@@ -0,0 +1,173 @@
+"""
+Tests for ETag / conditional GET support and the table versions behind it.
+"""
+from datetime import date
+
+from fastapi import status
+from sqlalchemy import event
+
+from app.enums import AttendanceStatus
+from app.services import versions
+from tests.conftest import engine
+
+
+class TestTableVersions:
+    """Tests for per-table change versions."""
+
+    def test_orm_commit_bumps_written_tables(self, db_session, create_test_employee):
+        """Test committing an ORM write bumps only the tables that were written."""
+        before = versions.current(db_session, ["employees", "attendance"])
+        create_test_employee()
+
+        after = versions.current(db_session, ["employees", "attendance"])
+        assert after["employees"] == before["employees"] + 1
+        assert after["attendance"] == before["attendance"]
+
+    def test_bulk_statements_bump_tables(self, client, db_session, create_test_employee):
+        """Test Core bulk inserts run through the session are tracked."""
+        employee = create_test_employee()
+        before = versions.current(db_session, ["attendance"])["attendance"]
+
+        client.post("/api/attendance/bulk", json={"items": [
+            {"employee_id": employee.id, "date": str(date.today()), "status": AttendanceStatus.PRESENT.value}
+        ]})
+
+        assert versions.current(db_session, ["attendance"])["attendance"] == before + 1
+
+    def test_rollback_does_not_bump(self, client, db_session, create_test_employee):
+        """Test a rejected write leaves the version unchanged."""
+        create_test_employee(employee_id="EMP001", email="one@example.com")
+        before = versions.current(db_session, ["employees"])["employees"]
+
+        response = client.post("/api/employees/", json={
+            "employee_id": "EMP001",
+            "full_name": "Duplicate",
+            "email": "other@example.com",
+            "department": "Engineering"
+        })
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        assert versions.current(db_session, ["employees"])["employees"] == before
+
+    def test_bump_runs_after_the_write_commits(self, db_session, create_test_employee):
+        """Test the version row is written in its own transaction once the data is committed."""
+        steps = []
+
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            steps.append("bump" if "table_versions" in statement else "write")
+
+        def record_commit(conn):
+            steps.append("commit")
+
+        event.listen(engine, "before_cursor_execute", record_statement)
+        event.listen(engine, "commit", record_commit)
+        try:
+            create_test_employee()
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+            event.remove(engine, "commit", record_commit)
+
+        bump = steps.index("bump")
+        assert steps[:bump] == ["write", "commit"]
+        assert steps[bump + 1] == "commit"
+
+    def test_failed_bump_keeps_the_write(self, client, db_session, monkeypatch, sample_employee_data):
+        """Test a version bump that fails is logged without failing the committed write."""
+        def broken(bind, tables):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(versions, "bump", broken)
+        response = client.post("/api/employees/", json=sample_employee_data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert client.get(f"/api/employees/{response.json()['id']}").status_code == status.HTTP_200_OK
+
+
+class TestConditionalGet:
+    """Tests for ETag headers and 304 responses."""
+
+    def test_matching_etag_returns_304(self, client, query_counter, create_test_employee):
+        """Test If-None-Match with the current ETag skips the query and the body."""
+        create_test_employee()
+        response = client.get("/api/employees/")
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "no-cache"
+
+        with query_counter() as queries:
+            response = client.get("/api/employees/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert len(queries) == 1
+
+    def test_write_changes_etag(self, client, create_test_employee):
+        """Test a write to a table the endpoint reads invalidates the ETag."""
+        employee = create_test_employee()
+        etag = client.get("/api/employees/dashboard/stats").headers["ETag"]
+
+        client.post("/api/attendance/", json={
+            "employee_id": employee.id,
+            "date": str(date.today()),
+            "status": AttendanceStatus.PRESENT.value
+        })
+
+        response = client.get("/api/employees/dashboard/stats", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert response.json()["today_attendance"]["present"] == 1
+
+    def test_rollup_writes_change_trend_etag(self, client, create_test_employee, create_test_attendance):
+        """Test ORM updates and deletes of attendance invalidate the rollup-backed trend."""
+        employee = create_test_employee()
+        attendance = create_test_attendance(employee, date.today(), AttendanceStatus.PRESENT)
+        url = f"/api/attendance/trend?start_date={date.today()}"
+        etag = client.get(url).headers["ETag"]
+
+        client.put(f"/api/attendance/{attendance.id}?status=Absent")
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["absent"] == 1
+        etag = response.headers["ETag"]
+
+        client.delete(f"/api/attendance/{attendance.id}")
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["absent"] == 0
+
+    def test_department_move_changes_trend_etag(self, client, create_test_employee, create_test_attendance):
+        """Test moving an employee to another department invalidates the trend."""
+        employee = create_test_employee(department="Sales")
+        create_test_attendance(employee, date.today(), AttendanceStatus.PRESENT)
+        url = f"/api/attendance/trend?department=Support&start_date={date.today()}"
+        etag = client.get(url).headers["ETag"]
+
+        client.put(f"/api/employees/{employee.id}", json={"department": "Support"})
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["present"] == 1
+
+    def test_unrelated_write_keeps_etag(self, client, create_test_employee, create_test_attendance):
+        """Test attendance writes do not invalidate the employee list."""
+        employee = create_test_employee()
+        etag = client.get("/api/employees/").headers["ETag"]
+
+        create_test_attendance(employee=employee)
+
+        response = client.get("/api/employees/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_etag_varies_with_query(self, client, create_test_employee):
+        """Test different filters of the same endpoint get different ETags."""
+        create_test_employee()
+        all_employees = client.get("/api/employees/").headers["ETag"]
+        filtered = client.get("/api/employees/?department=Sales").headers["ETag"]
+        assert all_employees != filtered
+
+    def test_weak_and_listed_tags_match(self, client):
+        """Test weak comparison and lists of tags in If-None-Match."""
+        etag = client.get("/api/attendance/today").headers["ETag"]
+
+        response = client.get("/api/attendance/today", headers={"If-None-Match": f'"stale", W/{etag}'})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,83 @@
+"""
+Tests for request/SQL instrumentation and the Prometheus /metrics endpoint.
+"""
+from fastapi import status
+
+from app.metrics import Histogram, RequestMetrics, RequestStats
+
+
+def samples(text):
+    """Parse Prometheus text into {series: value}, skipping comments."""
+    parsed = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            parsed[series] = float(value)
+    return parsed
+
+
+class TestRegistry:
+    """Tests for the histogram and text rendering."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test values land in the first bucket whose bound they do not exceed."""
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 7):
+            histogram.observe(value)
+
+        assert list(histogram.cumulative()) == [(1, 2), (5, 3), ("+Inf", 4)]
+        assert histogram.sum == 11.5
+
+    def test_render_escapes_labels(self):
+        """Test label values are escaped per the exposition format."""
+        metrics = RequestMetrics()
+        metrics.record("GET", 'odd"route', 200, 0.01, RequestStats())
+
+        assert 'route="odd\\"route"' in metrics.render()
+
+
+class TestMetricsEndpoint:
+    """Tests for the middleware, SQL hooks and /metrics."""
+
+    def test_request_latency_and_status(self, client, create_test_employee):
+        """Test requests are counted per route template and status code."""
+        employee = create_test_employee()
+        client.get(f"/api/employees/{employee.id}")
+        client.get("/api/employees/missing-id")
+
+        response = client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+        data = samples(response.text)
+        route = 'method="GET",route="/api/employees/{employee_id}"'
+        assert data[f'hrms_http_requests_total{{{route},status="200"}}'] == 1
+        assert data[f'hrms_http_requests_total{{{route},status="404"}}'] == 1
+        assert data[f'hrms_http_request_duration_seconds_count{{{route}}}'] == 2
+        assert data[f'hrms_http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 2
+
+    def test_sql_counted_per_request(self, client, query_counter, multiple_employees):
+        """Test the statements a request issues are attributed to its route."""
+        with query_counter() as queries:
+            client.get("/api/employees/")
+
+        data = samples(client.get("/metrics").text)
+        route = 'method="GET",route="/api/employees/"'
+        assert data[f"hrms_db_queries_total{{{route}}}"] == len(queries)
+        assert data[f"hrms_db_query_duration_seconds_total{{{route}}}"] > 0
+        assert data[f'hrms_db_queries_per_request_count{{{route}}}'] == 1
+
+    def test_statements_outside_requests_not_counted(self, client, create_test_employee):
+        """Test fixture setup queries are not attributed to any route."""
+        create_test_employee()
+
+        data = samples(client.get("/metrics").text)
+        assert not any(series.startswith("hrms_db_queries_total") for series in data)
+
+    def test_unmatched_routes_share_a_label(self, client):
+        """Test unknown URLs do not create one series per path."""
+        client.get("/does-not-exist")
+        client.get("/also-missing")
+
+        data = samples(client.get("/metrics").text)
+        assert data['hrms_http_requests_total{method="GET",route="unmatched",status="404"}'] == 2
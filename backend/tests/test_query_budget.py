@@ -0,0 +1,34 @@
+"""
+Tests for the per-route SQL statement budgets enforced by the test client.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from tests.conftest import QueryBudget
+
+
+class TestQueryBudget:
+    """Tests for the QueryBudget ASGI wrapper."""
+    
+    def test_within_budget(self, client, multiple_employees):
+        """Test requests within their route's budget pass through."""
+        with TestClient(QueryBudget(app, {"GET /api/employees/": 2})) as budgeted:
+            assert budgeted.get("/api/employees/").status_code == 200
+    
+    def test_over_budget_fails(self, client, multiple_employees):
+        """Test a request running more statements than its budget fails with the statements listed."""
+        with TestClient(QueryBudget(app, {"GET /api/employees/": 1})) as budgeted:
+            with pytest.raises(AssertionError, match=r"GET /api/employees/ ran 2 SQL statements, over its budget of 1"):
+                budgeted.get("/api/employees/")
+    
+    def test_missing_budget_fails(self, client):
+        """Test a request to a route without a declared budget fails."""
+        with TestClient(QueryBudget(app, {})) as budgeted:
+            with pytest.raises(AssertionError, match=r"No query budget declared for GET /api/health"):
+                budgeted.get("/api/health")
+    
+    def test_unmatched_paths_are_not_budgeted(self, client):
+        """Test requests that match no route are left alone."""
+        with TestClient(QueryBudget(app, {})) as budgeted:
+            assert budgeted.get("/api/missing").status_code == 404
@@ -0,0 +1,115 @@
+"""
+Tests for read-replica routing and read-your-writes stickiness.
+"""
+import time
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import database
+from app.database import Base, PRIMARY_UNTIL_COOKIE, ReplicaSessionLocal
+from app.models.employee import Employee
+from app.routes.reports import create_attendance_export, create_employee_summaries
+from app.services.employee_cache import employee_cache
+
+
+@pytest.fixture
+def replica(db_session, monkeypatch):
+    """A second in-memory database standing in for a lagging replica."""
+    replica_engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(database, "replica_engines", [replica_engine])
+    yield replica_engine
+    replica_engine.dispose()
+
+
+def add_replica_employee(replica_engine, **fields):
+    with Session(replica_engine) as session:
+        employee = Employee(**fields)
+        session.add(employee)
+        session.commit()
+        return employee.id
+
+
+class TestReplicaRouting:
+    """Tests for choosing between the primary and the replicas."""
+    
+    def test_reads_go_to_replica(self, client, replica, create_test_employee):
+        """Test GET routes read from the replica, not the primary."""
+        create_test_employee()
+        add_replica_employee(replica, employee_id="REP001", full_name="Replica Only",
+                             email="replica@example.com", department="Sales")
+        
+        response = client.get("/api/employees/")
+        assert [e["employee_id"] for e in response.json()] == ["REP001"]
+        assert client.get("/api/employees/dashboard/stats").json()["total_employees"] == 1
+    
+    def test_write_pins_reads_to_primary(self, client, replica, sample_employee_data):
+        """Test a client reads its own write from the primary right after making it."""
+        response = client.post("/api/employees/", json=sample_employee_data)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert PRIMARY_UNTIL_COOKIE in response.cookies
+        assert "httponly" in response.headers["set-cookie"].lower()
+        
+        listed = client.get("/api/employees/").json()
+        assert [e["employee_id"] for e in listed] == [sample_employee_data["employee_id"]]
+    
+    def test_expired_stickiness_returns_to_replica(self, client, replica, create_test_employee):
+        """Test reads go back to the replica once the stickiness window has passed."""
+        create_test_employee()
+        client.cookies.set(PRIMARY_UNTIL_COOKIE, f"{time.time() - 1:.3f}")
+        
+        assert client.get("/api/employees/").json() == []
+    
+    def test_invalid_cookie_is_ignored(self, client, replica, create_test_employee):
+        """Test a malformed stickiness cookie does not pin reads to the primary."""
+        create_test_employee()
+        client.cookies.set(PRIMARY_UNTIL_COOKIE, "soon")
+        
+        assert client.get("/api/employees/").json() == []
+    
+    def test_failed_write_does_not_pin(self, client, replica):
+        """Test rejected writes do not set the stickiness cookie."""
+        response = client.post("/api/employees/", json={"employee_id": "EMP001"})
+        
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        assert PRIMARY_UNTIL_COOKIE not in response.cookies
+    
+    def test_read_only_posts_do_not_pin(self, client, replica, create_test_employee):
+        """Test POST endpoints that only read keep the client on the replicas."""
+        employee_id = add_replica_employee(replica, employee_id="REP001", full_name="Replica Only",
+                                           email="replica@example.com", department="Sales")
+        create_test_employee()
+        
+        response = client.post("/api/employees/summaries", json={"employee_ids": [employee_id]})
+        assert response.status_code == status.HTTP_200_OK
+        assert [summary["employee_code"] for summary in response.json()] == ["REP001"]
+        assert PRIMARY_UNTIL_COOKIE not in response.cookies
+        assert create_attendance_export.read_only and create_employee_summaries.read_only
+    
+    def test_no_replicas_no_cookie(self, client, sample_employee_data):
+        """Test nothing changes when no replica is configured."""
+        response = client.post("/api/employees/", json=sample_employee_data)
+        
+        assert PRIMARY_UNTIL_COOKIE not in response.cookies
+        assert len(client.get("/api/employees/").json()) == 1
+    
+    def test_replica_rows_are_not_cached(self, replica):
+        """Test employees read from a replica are returned but not cached."""
+        employee_id = add_replica_employee(replica, employee_id="REP001", full_name="Replica Only",
+                                           email="replica@example.com", department="Sales")
+        session = ReplicaSessionLocal(bind=replica)
+        try:
+            assert employee_cache.get(session, employee_id).employee_id == "REP001"
+            assert employee_cache.stats()["size"] == 0
+        finally:
+            session.close()
+    
+    def test_pool_health_lists_replicas(self, client, replica):
+        """Test the pool health endpoint reports each replica's pool."""
+        assert len(client.get("/api/health/pool").json()["replica_pools"]) == 1
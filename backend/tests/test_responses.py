@@ -0,0 +1,90 @@
+"""
+Tests for the fast JSON response path used by list endpoints.
+"""
+import json
+from datetime import date, datetime, timezone
+from typing import List
+
+import pytest
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.enums import AttendanceStatus
+from app.responses import StdlibJSONResponse, FastJSONResponse, json_response, orjson
+from app.routes.employees import EMPLOYEE_RESPONSE_COLUMNS
+from app.schemas.employee import EmployeeResponse
+
+
+ROW = {
+    "employee_id": "EMP001",
+    "full_name": "John Doe",
+    "email": "john@example.com",
+    "department": "Engineering",
+    "id": "550e8400-e29b-41d4-a716-446655440000",
+    "is_active": True,
+    "created_at": datetime(2026, 2, 28, 10, 30, 0, 123456, tzinfo=timezone.utc),
+    "updated_at": None,
+}
+
+
+class TestResponseClasses:
+    """Tests for the orjson and stdlib renderers."""
+
+    @pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+    def test_fast_json_matches_pydantic(self):
+        """Test orjson output is identical to serializing through the response model."""
+        adapter = TypeAdapter(List[EmployeeResponse])
+        expected = adapter.dump_json(adapter.validate_python([ROW]))
+
+        assert FastJSONResponse([ROW]).body == expected
+
+    def test_stdlib_json_matches_pydantic(self):
+        """Test the stdlib fallback produces the same document as the response model."""
+        adapter = TypeAdapter(List[EmployeeResponse])
+        expected = adapter.dump_json(adapter.validate_python([ROW]))
+
+        assert StdlibJSONResponse([ROW]).body == expected
+
+    def test_encoded_json_handles_rows(self, db_session, create_test_employee):
+        """Test the stdlib fallback encodes row mappings, dates and enums."""
+        create_test_employee()
+        rows = db_session.execute(select(*EMPLOYEE_RESPONSE_COLUMNS)).mappings().all()
+
+        body = json.loads(StdlibJSONResponse({"rows": rows, "day": date(2026, 2, 28), "status": AttendanceStatus.PRESENT}).body)
+        assert body["rows"][0]["employee_id"] == "EMP001"
+        assert body["day"] == "2026-02-28"
+        assert body["status"] == "Present"
+
+    @pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+    def test_fast_json_handles_rows(self, db_session, create_test_employee):
+        """Test orjson encodes SQLAlchemy row mappings."""
+        create_test_employee()
+        rows = db_session.execute(select(*EMPLOYEE_RESPONSE_COLUMNS)).mappings().all()
+
+        assert json.loads(FastJSONResponse(rows).body)[0]["full_name"] == "John Doe"
+
+    def test_json_response_keeps_headers(self):
+        """Test headers set on the injected response are carried over."""
+        injected = Response()
+        injected.headers["ETag"] = '"abc"'
+        rendered = json_response([], injected)
+        assert rendered.headers["ETag"] == '"abc"'
+        assert rendered.headers["content-type"] == "application/json"
+
+
+class TestTrustedListResponses:
+    """Tests that list endpoints serialize rows directly and keep their headers."""
+
+    def test_employee_list_headers_and_body(self, client, create_test_employee):
+        """Test cursor and ETag headers survive the direct response path."""
+        create_test_employee(employee_id="EMP001", email="one@example.com")
+        create_test_employee(employee_id="EMP002", email="two@example.com")
+
+        response = client.get("/api/employees/?limit=1")
+        assert response.headers["X-Next-Cursor"]
+        assert response.headers["ETag"]
+
+        employee = response.json()[0]
+        assert set(employee) == set(EmployeeResponse.model_fields)
+        assert EmployeeResponse.model_validate(employee).employee_id == "EMP002"
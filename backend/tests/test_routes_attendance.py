@@ -2,11 +2,32 @@
 Integration tests for Attendance API endpoints.
 Tests CRUD operations, filtering, and business logic.
 """
+import csv
+import io
+import json
 import pytest
 from datetime import date, datetime, timedelta
 from fastapi import status
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
 
 from app.enums import AttendanceStatus
+from app.models.attendance import Attendance
+
+# Most SQL statements any single request to each route may run on a cold employee cache (enforced by the client fixture)
+QUERY_BUDGETS = {
+    "POST /api/attendance/": 6,
+    # Independent of the number of items: lookups and writes are batched
+    "POST /api/attendance/bulk": 4,
+    "GET /api/attendance/": 2,
+    "GET /api/attendance/export": 1,
+    "GET /api/attendance/employee/{employee_id}": 3,
+    "GET /api/attendance/today": 2,
+    "GET /api/attendance/trend": 2,
+    "GET /api/attendance/matrix": 2,
+    "PUT /api/attendance/{attendance_id}": 7,
+    "DELETE /api/attendance/{attendance_id}": 5,
+    "GET /api/employees/dashboard/stats": 3,
+}
 
 
 class TestAttendanceEndpoints:
@@ -76,6 +97,58 @@ class TestAttendanceEndpoints:
         assert response2.status_code == status.HTTP_409_CONFLICT
         assert "already marked" in response2.json()["detail"]
     
+    def test_mark_attendance_upsert_overwrites_status(self, client, create_test_employee):
+        """Test upsert=true replaces an existing record's status instead of conflicting."""
+        employee = create_test_employee()
+        attendance_data = {
+            "employee_id": employee.id,
+            "date": str(date.today()),
+            "status": AttendanceStatus.PRESENT.value
+        }
+        
+        first = client.post("/api/attendance/?upsert=true", json=attendance_data)
+        assert first.status_code == status.HTTP_201_CREATED
+        
+        attendance_data["status"] = AttendanceStatus.ABSENT.value
+        second = client.post("/api/attendance/?upsert=true", json=attendance_data)
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json()["id"] == first.json()["id"]
+        assert second.json()["status"] == AttendanceStatus.ABSENT.value
+        
+        stats = client.get("/api/employees/dashboard/stats").json()
+        assert stats["today_attendance"]["present"] == 0
+        assert stats["today_attendance"]["absent"] == 1
+    
+    def test_mark_attendance_unique_per_employee_and_date(self, db_session, create_test_attendance):
+        """Test the database itself rejects a second record for the same day."""
+        attendance = create_test_attendance()
+        
+        db_session.add(Attendance(
+            employee_id=attendance.employee_id,
+            date=attendance.date,
+            status=AttendanceStatus.ABSENT
+        ))
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+        db_session.rollback()
+    
+    def test_mark_attendance_write_statements(self, client, query_counter, create_test_employee):
+        """Test the write path no longer does a separate duplicate lookup."""
+        employee = create_test_employee()
+        attendance_data = {
+            "employee_id": employee.id,
+            "date": str(date.today()),
+            "status": AttendanceStatus.PRESENT.value
+        }
+        
+        with query_counter() as queries:
+            client.post("/api/attendance/", json=attendance_data)
+        
+        inserts = [q for q in queries if q.lstrip().upper().startswith("INSERT INTO ATTENDANCE ")]
+        assert len(inserts) == 1
+        assert "ON CONFLICT" in inserts[0].upper()
+        assert not any(q.lstrip().upper().startswith("SELECT") and "FROM ATTENDANCE" in q.upper() for q in queries)
+    
     def test_mark_attendance_different_dates(self, client, create_test_employee):
         """Test marking attendance for same employee on different dates."""
         employee = create_test_employee()
@@ -133,6 +206,86 @@ class TestAttendanceEndpoints:
         response = client.post("/api/attendance/", json=attendance_data)
         assert response.status_code == status.HTTP_404_NOT_FOUND
     
+    # ==================== BULK MARK ATTENDANCE TESTS ====================
+
+    def test_mark_attendance_bulk_success(self, client, multiple_employees):
+        """Test marking attendance for a whole team in one request."""
+        items = [
+            {"employee_id": emp.id, "date": str(date.today()), "status": AttendanceStatus.PRESENT.value}
+            for emp in multiple_employees
+        ]
+
+        response = client.post("/api/attendance/bulk", json={"items": items})
+        assert response.status_code == status.HTTP_200_OK
+
+        data = response.json()
+        assert data["created"] == 3
+        assert data["conflicts"] == 0
+        assert data["not_found"] == 0
+        assert all(r["result"] == "created" and r["id"] for r in data["results"])
+
+        response = client.get("/api/attendance/today")
+        assert {r["status"] for r in response.json()} == {"Present"}
+
+    def test_mark_attendance_bulk_per_item_results(self, client, multiple_employees, create_test_attendance):
+        """Test conflicts and unknown employees are reported without failing the batch."""
+        create_test_attendance(multiple_employees[0], date.today(), AttendanceStatus.PRESENT)
+        items = [
+            {"employee_id": multiple_employees[0].id, "date": str(date.today()), "status": "Absent"},
+            {"employee_id": multiple_employees[1].id, "date": str(date.today()), "status": "Absent"},
+            {"employee_id": multiple_employees[1].id, "date": str(date.today()), "status": "Present"},
+            {"employee_id": "non-existent-id", "date": str(date.today()), "status": "Present"},
+        ]
+
+        response = client.post("/api/attendance/bulk", json={"items": items})
+        data = response.json()
+
+        assert [r["result"] for r in data["results"]] == ["conflict", "created", "conflict", "not_found"]
+        assert data["created"] == 1
+        assert data["conflicts"] == 2
+        assert data["not_found"] == 1
+
+    def test_mark_attendance_bulk_inactive_employee(self, client, create_test_employee):
+        """Test inactive employees are reported as not found."""
+        employee = create_test_employee(is_active=False)
+        items = [{"employee_id": employee.id, "date": str(date.today()), "status": "Present"}]
+
+        data = client.post("/api/attendance/bulk", json={"items": items}).json()
+        assert data["results"][0]["result"] == "not_found"
+        assert data["created"] == 0
+
+    def test_mark_attendance_bulk_updates_dashboard(self, client, multiple_employees):
+        """Test bulk-created records are reflected in the dashboard rollup."""
+        items = [
+            {"employee_id": multiple_employees[0].id, "date": str(date.today()), "status": "Present"},
+            {"employee_id": multiple_employees[1].id, "date": str(date.today()), "status": "Absent"},
+        ]
+        client.post("/api/attendance/bulk", json={"items": items})
+
+        data = client.get("/api/employees/dashboard/stats").json()
+        assert data["today_attendance"]["present"] == 1
+        assert data["today_attendance"]["absent"] == 1
+        assert data["overall_attendance_rate"] == 50.0
+
+    def test_mark_attendance_bulk_fixed_query_count(self, client, query_counter, department_employees):
+        """Test the number of statements does not grow with the batch size."""
+        employees = department_employees("Engineering", count=25)
+        items = [
+            {"employee_id": emp.id, "date": str(date.today()), "status": "Present"}
+            for emp in employees
+        ]
+
+        with query_counter() as queries:
+            response = client.post("/api/attendance/bulk", json={"items": items})
+
+        assert response.json()["created"] == 25
+        assert len(queries) <= 4
+
+    def test_mark_attendance_bulk_empty(self, client):
+        """Test an empty batch is rejected."""
+        response = client.post("/api/attendance/bulk", json={"items": []})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
     # ==================== GET ATTENDANCE RECORDS TESTS ====================
     
     def test_get_all_attendance_records(self, client, sample_attendance_records):
@@ -210,6 +363,64 @@ class TestAttendanceEndpoints:
         data = response.json()
         assert len(data) == 2
     
+    def test_get_attendance_cursor_pagination(self, client, multiple_employees, create_test_attendance):
+        """Test walking every page with the opaque next cursor."""
+        for days_ago in range(3):
+            for employee in multiple_employees:
+                create_test_attendance(employee, date.today() - timedelta(days=days_ago), AttendanceStatus.PRESENT)
+        
+        seen = []
+        response = client.get("/api/attendance/?limit=4")
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            seen.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            response = client.get(f"/api/attendance/?limit=4&cursor={cursor}")
+        
+        assert len(seen) == 9
+        assert len({r["id"] for r in seen}) == 9
+        assert [r["date"] for r in seen] == sorted((r["date"] for r in seen), reverse=True)
+    
+    def test_get_attendance_last_page_has_no_cursor(self, client, sample_attendance_records):
+        """Test a partial page does not advertise a next cursor."""
+        response = client.get("/api/attendance/?limit=10")
+        assert "X-Next-Cursor" not in response.headers
+    
+    def test_get_attendance_invalid_cursor(self, client):
+        """Test a malformed cursor is rejected."""
+        response = client.get("/api/attendance/?cursor=not-a-cursor")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_get_attendance_fixed_query_count(self, client, db_session, query_counter, sample_data):
+        """Test the listing loads employee names with the page, not one SELECT per employee."""
+        sample_data(employee_count=20)
+        
+        counts = []
+        for limit in (5, 50, 140):
+            # The client shares this session; an empty identity map exposes any per-row lazy loads
+            db_session.expunge_all()
+            with query_counter() as queries:
+                response = client.get(f"/api/attendance/?limit={limit}")
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.json()) == limit
+            assert all(record["employee_name"] for record in response.json())
+            counts.append(len(queries))
+        
+        # One table-version lookup for the ETag plus the page itself, whatever the page size
+        assert counts == [2, 2, 2]
+    
+    def test_attendance_employee_never_lazy_loads(self, db_session, create_test_attendance):
+        """Test Attendance.employee refuses to emit a per-row SELECT."""
+        attendance = create_test_attendance()
+        key = (attendance.id, attendance.date)
+        db_session.expunge_all()
+        record = db_session.get(Attendance, key)
+        
+        with pytest.raises(InvalidRequestError):
+            record.employee
+    
     def test_get_attendance_ordered_by_date_desc(self, client, create_test_employee, create_test_attendance):
         """Test that attendance records are ordered by date descending."""
         employee = create_test_employee()
@@ -230,6 +441,55 @@ class TestAttendanceEndpoints:
         assert data[0]["date"] == str(date.today())
         assert data[2]["date"] == str(date.today() - timedelta(days=5))
     
+    # ==================== EXPORT ATTENDANCE TESTS ====================
+    
+    def test_export_attendance_csv(self, client, sample_attendance_records, multiple_employees):
+        """Test exporting attendance as CSV."""
+        response = client.get("/api/attendance/export")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 4
+        assert rows[0]["date"] <= rows[-1]["date"]
+        alice = next(r for r in rows if r["employee_id"] == multiple_employees[0].id)
+        assert alice["employee_code"] == "EMP001"
+        assert alice["employee_name"] == "Alice Johnson"
+        assert alice["department"] == "Engineering"
+        assert alice["status"] == "Present"
+    
+    def test_export_attendance_ndjson_with_filters(self, client, sample_attendance_records):
+        """Test exporting filtered attendance as NDJSON."""
+        response = client.get(f"/api/attendance/export?format=ndjson&status=Present&start_date={date.today()}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 1
+        assert records[0]["status"] == "Present"
+        assert records[0]["date"] == str(date.today())
+    
+    def test_export_attendance_empty(self, client):
+        """Test exporting with no records yields only the CSV header."""
+        response = client.get("/api/attendance/export")
+        assert response.text.strip() == "id,employee_id,employee_code,employee_name,department,date,status,created_at"
+    
+    def test_export_attendance_invalid_format(self, client):
+        """Test unsupported export formats are rejected."""
+        response = client.get("/api/attendance/export?format=xml")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    def test_export_attendance_single_statement(self, client, query_counter, sample_data):
+        """Test the export streams from one statement instead of paging."""
+        sample_data(employee_count=5)
+        
+        with query_counter() as queries:
+            response = client.get("/api/attendance/export?format=ndjson")
+        
+        assert len(response.text.splitlines()) == 35
+        assert len(queries) == 1
+    
     # ==================== GET EMPLOYEE ATTENDANCE TESTS ====================
     
     def test_get_employee_attendance(self, client, create_test_employee, create_test_attendance):
@@ -352,6 +612,68 @@ class TestAttendanceEndpoints:
         record = next((r for r in data if r["employee_id"] == employee.id), None)
         assert record["status"] == "Present"
 
+    def test_get_today_attendance_filters(self, client, multiple_employees, create_test_attendance):
+        """Test department and status filters, including Not Marked."""
+        create_test_attendance(multiple_employees[0], date.today(), AttendanceStatus.PRESENT)
+        create_test_attendance(multiple_employees[1], date.today(), AttendanceStatus.ABSENT)
+        
+        response = client.get("/api/attendance/today?status=Not Marked")
+        assert [r["employee_code"] for r in response.json()] == ["EMP003"]
+        
+        response = client.get("/api/attendance/today?department=Engineering&status=Present")
+        assert [r["employee_code"] for r in response.json()] == ["EMP001"]
+        
+        # Departments match exactly, as in the matrix, summaries and rollup
+        assert client.get("/api/attendance/today?department=Eng").json() == []
+        
+        response = client.get("/api/attendance/today?status=Late")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    def test_get_today_attendance_cursor_pagination(self, client, multiple_employees):
+        """Test pages follow the X-Next-Cursor header in employee code order."""
+        response = client.get("/api/attendance/today?limit=2")
+        assert [r["employee_code"] for r in response.json()] == ["EMP001", "EMP002"]
+        
+        cursor = response.headers["X-Next-Cursor"]
+        response = client.get(f"/api/attendance/today?limit=2&cursor={cursor}")
+        assert [r["employee_code"] for r in response.json()] == ["EMP003"]
+        assert "X-Next-Cursor" not in response.headers
+    
+    def test_get_today_attendance_single_query(self, client, query_counter, sample_data):
+        """Test the board is one statement (plus the ETag version lookup) at any size."""
+        sample_data(employee_count=20)
+        
+        with query_counter() as queries:
+            response = client.get("/api/attendance/today")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) <= 2
+
+    # ==================== ATTENDANCE TREND TESTS ====================
+
+    def test_get_attendance_trend(self, client, sample_attendance_records):
+        """Test daily totals are returned oldest first from the rollup."""
+        response = client.get("/api/attendance/trend")
+        assert response.status_code == status.HTTP_200_OK
+
+        data = response.json()
+        assert [day["date"] for day in data] == [
+            str(date.today() - timedelta(days=1)),
+            str(date.today()),
+        ]
+        assert data[0]["present"] == 2 and data[0]["absent"] == 0
+        assert data[1]["present"] == 1 and data[1]["absent"] == 1
+        assert data[1]["attendance_rate"] == 50.0
+
+    def test_get_attendance_trend_by_department(self, client, sample_attendance_records):
+        """Test trend can be restricted to a single department."""
+        response = client.get(f"/api/attendance/trend?department=Marketing&start_date={date.today()}")
+
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["present"] == 0
+        assert data[0]["absent"] == 1
+
 
 class TestAttendanceEdgeCases:
     """Tests for edge cases and boundary conditions."""
@@ -407,3 +729,78 @@ class TestAttendanceEdgeCases:
         assert "employee_employee_id" in record
         assert record["employee_name"] == employee.full_name
         assert record["employee_employee_id"] == employee.employee_id
+
+
+class TestAttendanceMatrix:
+    """Tests for the monthly attendance matrix."""
+    
+    def test_matrix_status_strings(self, client, create_test_employee, create_test_attendance):
+        """Test each employee gets one status character per day of the month."""
+        first = create_test_employee(employee_id="EMP001", email="one@example.com")
+        second = create_test_employee(employee_id="EMP002", email="two@example.com")
+        create_test_attendance(first, date(2026, 2, 1), AttendanceStatus.PRESENT)
+        create_test_attendance(first, date(2026, 2, 3), AttendanceStatus.ABSENT)
+        create_test_attendance(first, date(2026, 2, 28), AttendanceStatus.PRESENT)
+        create_test_attendance(first, date(2026, 3, 1), AttendanceStatus.ABSENT)
+        
+        response = client.get("/api/attendance/matrix?month=2026-02")
+        assert response.status_code == status.HTTP_200_OK
+        
+        data = response.json()
+        assert data["month"] == "2026-02"
+        assert data["days"] == 28
+        assert [row["employee_code"] for row in data["employees"]] == ["EMP001", "EMP002"]
+        assert data["employees"][0]["days"] == "P-A" + "-" * 24 + "P"
+        assert data["employees"][1]["days"] == "-" * 28
+        assert data["daily_present"][0] == 1
+        assert data["daily_absent"][2] == 1
+        assert sum(data["daily_present"]) == 2
+    
+    def test_matrix_last_day_of_long_month(self, client, create_test_employee, create_test_attendance):
+        """Test day 31 still fits in the packed month."""
+        employee = create_test_employee()
+        create_test_attendance(employee, date(2026, 1, 1), AttendanceStatus.ABSENT)
+        create_test_attendance(employee, date(2026, 1, 31), AttendanceStatus.PRESENT)
+        
+        data = client.get("/api/attendance/matrix?month=2026-01").json()
+        assert data["employees"][0]["days"] == "A" + "-" * 29 + "P"
+    
+    def test_matrix_department_filter(self, client, create_test_employee):
+        """Test the department filter limits the rows to active employees in it."""
+        create_test_employee(employee_id="EMP001", email="one@example.com", department="Engineering")
+        create_test_employee(employee_id="EMP002", email="two@example.com", department="Sales")
+        create_test_employee(employee_id="EMP003", email="three@example.com", department="Sales", is_active=False)
+        
+        response = client.get("/api/attendance/matrix?month=2026-02&department=Sales")
+        assert [row["employee_code"] for row in response.json()["employees"]] == ["EMP002"]
+    
+    def test_matrix_defaults_to_current_month(self, client, create_test_employee, create_test_attendance):
+        """Test today's record shows up when no month is given."""
+        employee = create_test_employee()
+        create_test_attendance(employee, date.today(), AttendanceStatus.PRESENT)
+        
+        data = client.get("/api/attendance/matrix").json()
+        assert data["month"] == f"{date.today():%Y-%m}"
+        assert data["employees"][0]["days"][date.today().day - 1] == "P"
+    
+    def test_matrix_empty(self, client):
+        """Test a month without employees returns an empty grid."""
+        data = client.get("/api/attendance/matrix?month=2024-02").json()
+        assert data["days"] == 29
+        assert data["employees"] == []
+        assert data["daily_present"] == [0] * 29
+    
+    @pytest.mark.parametrize("month", ["2026-13", "2026-2", "February"])
+    def test_matrix_invalid_month(self, client, month):
+        """Test malformed months are rejected."""
+        response = client.get(f"/api/attendance/matrix?month={month}")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    def test_matrix_single_query(self, client, query_counter, multiple_employees, create_test_attendance):
+        """Test the grid is read with one statement besides the ETag version lookup."""
+        for employee in multiple_employees:
+            create_test_attendance(employee, date.today(), AttendanceStatus.PRESENT)
+        
+        with query_counter() as queries:
+            client.get("/api/attendance/matrix")
+        assert len(queries) <= 2
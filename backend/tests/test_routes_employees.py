@@ -5,8 +5,27 @@ Tests CRUD operations, filtering, and business logic.
 import pytest
 from datetime import date, datetime, timedelta
 from fastapi import status
+from sqlalchemy import text
 
 from app.enums import AttendanceStatus
+from app.services import search as search_index
+
+# Most SQL statements any single request to each route may run on a cold employee cache (enforced by the client fixture)
+QUERY_BUDGETS = {
+    "GET /": 0,
+    "GET /api/health": 0,
+    "GET /api/employees/": 2,
+    "GET /api/employees/{employee_id}": 2,
+    "GET /api/employees/{employee_id}/summary": 3,
+    "GET /api/employees/dashboard/stats": 3,
+    "POST /api/employees/": 5,
+    "PUT /api/employees/{employee_id}": 5,
+    "DELETE /api/employees/{employee_id}": 4,
+    "POST /api/employees/summaries": 1,
+    # Independent of roster size: lookups and writes are batched
+    "POST /api/employees/sync": 6,
+    "GET /api/attendance/trend": 2,
+}
 
 
 class TestEmployeeEndpoints:
@@ -106,6 +125,26 @@ class TestEmployeeEndpoints:
         data = response.json()
         assert len(data) == 2
     
+    def test_get_employees_cursor_pagination(self, client, department_employees):
+        """Test walking every page with the opaque next cursor."""
+        department_employees("Engineering", count=7)
+        
+        first = client.get("/api/employees/?limit=3")
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get(f"/api/employees/?limit=3&cursor={cursor}")
+        third = client.get(f"/api/employees/?limit=3&cursor={second.headers['X-Next-Cursor']}")
+        
+        pages = [first.json(), second.json(), third.json()]
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert "X-Next-Cursor" not in third.headers
+        ids = [emp["id"] for page in pages for emp in page]
+        assert len(set(ids)) == 7
+    
+    def test_get_employees_invalid_cursor(self, client):
+        """Test a malformed cursor is rejected."""
+        response = client.get("/api/employees/?cursor=e30")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
     def test_get_employees_filter_by_department(self, client, multiple_employees):
         """Test filtering employees by department."""
         response = client.get("/api/employees/?department=Engineering")
@@ -143,6 +182,68 @@ class TestEmployeeEndpoints:
         assert len(data) == 1
         assert data[0]["email"] == "bob@example.com"
     
+    def test_get_employees_search_substring(self, client, multiple_employees):
+        """Test search matches substrings inside words."""
+        response = client.get("/api/employees/?search=lic")
+        
+        data = response.json()
+        assert [emp["full_name"] for emp in data] == ["Alice Johnson"]
+    
+    def test_get_employees_search_short_term(self, client, multiple_employees):
+        """Test terms shorter than a trigram still match via the fallback filter."""
+        response = client.get("/api/employees/?search=ch")
+        
+        data = response.json()
+        assert [emp["full_name"] for emp in data] == ["Charlie Brown"]
+    
+    def test_get_employees_search_ranked(self, client, create_test_employee):
+        """Test stronger matches are returned before weaker ones."""
+        create_test_employee(employee_id="EMP001", full_name="Joanne Bloggs", email="jb@example.com")
+        create_test_employee(employee_id="EMP002", full_name="Ann Annerson", email="ann@example.com")
+        
+        response = client.get("/api/employees/?search=ann")
+        
+        data = response.json()
+        assert [emp["employee_id"] for emp in data] == ["EMP002", "EMP001"]
+    
+    def test_get_employees_search_follows_updates(self, client, create_test_employee):
+        """Test the search index tracks renamed and deleted employees."""
+        employee = create_test_employee(full_name="Old Name")
+        client.put(f"/api/employees/{employee.id}", json={"full_name": "Fresh Name"})
+        
+        assert client.get("/api/employees/?search=Old").json() == []
+        assert len(client.get("/api/employees/?search=Fresh").json()) == 1
+        
+        client.delete(f"/api/employees/{employee.id}")
+        assert client.get("/api/employees/?search=Fresh").json() == []
+    
+    def test_get_employees_search_survives_rowid_renumbering(self, client, db_session, create_test_employee):
+        """Test reinstalling the search index re-keys it after employees' rowids change (as VACUUM may do)."""
+        create_test_employee(employee_id="EMP001", full_name="Ada Lovelace", email="ada@example.com")
+        create_test_employee(employee_id="EMP002", full_name="Grace Hopper", email="grace@example.com")
+        # Swap the two rowids, so the stale index points each match at the other employee
+        db_session.execute(text("UPDATE employees SET rowid = -rowid"))
+        db_session.execute(text("UPDATE employees SET rowid = 3 + rowid"))
+        db_session.commit()
+        
+        search_index.install(db_session.connection())
+        db_session.commit()
+        
+        data = client.get("/api/employees/?search=Lovelace").json()
+        assert [emp["employee_id"] for emp in data] == ["EMP001"]
+    
+    def test_get_employees_search_uses_index(self, client, query_counter, multiple_employees):
+        """Test SQLite search goes through the FTS5 trigram index."""
+        with query_counter() as queries:
+            client.get("/api/employees/?search=Alice")
+        
+        assert any("employees_fts MATCH" in q for q in queries)
+    
+    def test_get_employees_search_rejects_cursor(self, client, multiple_employees):
+        """Test ranked search results cannot be combined with a cursor."""
+        response = client.get("/api/employees/?search=Alice&cursor=abc")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
     # ==================== GET SINGLE EMPLOYEE TESTS ====================
     
     def test_get_employee_by_id(self, client, create_test_employee):
@@ -312,6 +413,268 @@ class TestDashboardStats:
             # Last created should be first in list
             assert recent[0]["employee_id"] == "EMP003"
 
+    def test_dashboard_overall_attendance_rate(self, client, multiple_employees, create_test_attendance):
+        """Test overall attendance rate spans all dates, not just today."""
+        create_test_attendance(multiple_employees[0], date.today(), AttendanceStatus.PRESENT)
+        create_test_attendance(multiple_employees[0], date.today() - timedelta(days=1), AttendanceStatus.PRESENT)
+        create_test_attendance(multiple_employees[1], date.today() - timedelta(days=1), AttendanceStatus.ABSENT)
+        create_test_attendance(multiple_employees[2], date.today() - timedelta(days=2), AttendanceStatus.PRESENT)
+
+        response = client.get("/api/employees/dashboard/stats")
+        data = response.json()
+
+        assert data["overall_attendance_rate"] == 75.0
+        assert data["today_attendance"]["present"] == 1
+        assert data["today_attendance"]["not_marked"] == 2
+        assert {d["name"]: d["count"] for d in data["departments"]} == {"Engineering": 2, "Marketing": 1}
+
+    def test_dashboard_excludes_inactive_employees(self, client, create_test_employee):
+        """Test inactive employees are left out of headcount and departments."""
+        create_test_employee(employee_id="EMP001", email="a@example.com", department="Engineering")
+        create_test_employee(employee_id="EMP002", email="b@example.com", department="Sales", is_active=False)
+
+        data = client.get("/api/employees/dashboard/stats").json()
+        assert data["total_employees"] == 1
+        assert data["departments"] == [{"name": "Engineering", "count": 1}]
+        assert len(data["recent_employees"]) == 1
+
+    def test_dashboard_query_budget(self, client, query_counter, sample_data):
+        """Test dashboard stats use a fixed number of statements regardless of data size."""
+        sample_data(employee_count=15)
+
+        with query_counter() as queries:
+            response = client.get("/api/employees/dashboard/stats")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total_employees"] == 15
+        # One table-version lookup for the ETag plus the two dashboard statements
+        assert len(queries) <= 3
+
+
+class TestRosterSync:
+    """Tests for the differential roster sync endpoint."""
+
+    @staticmethod
+    def roster_entry(employee_id, full_name, email, department="Engineering"):
+        return {"employee_id": employee_id, "full_name": full_name, "email": email, "department": department}
+
+    def test_sync_applies_only_differences(self, client, db_session, create_test_employee):
+        """Test inserts, updates and deactivations are applied and reported."""
+        create_test_employee(employee_id="EMP001", full_name="Unchanged", email="one@example.com")
+        create_test_employee(employee_id="EMP002", full_name="Old Name", email="two@example.com")
+        create_test_employee(employee_id="EMP003", full_name="Leaver", email="three@example.com")
+
+        response = client.post("/api/employees/sync", json=[
+            self.roster_entry("EMP001", "Unchanged", "one@example.com"),
+            self.roster_entry("emp002", "New Name", "two@example.com", "Sales"),
+            self.roster_entry("EMP004", "Joiner", "Four@Example.com"),
+        ])
+        assert response.status_code == status.HTTP_200_OK
+
+        data = response.json()
+        assert data["created"] == ["EMP004"]
+        assert data["updated"] == [{"employee_id": "EMP002", "fields": ["full_name", "department"]}]
+        assert data["deactivated"] == ["EMP003"]
+        assert data["unchanged"] == 1
+        assert data["dry_run"] is False
+
+        listed = {e["employee_id"]: e for e in client.get("/api/employees/").json()}
+        assert set(listed) == {"EMP001", "EMP002", "EMP004"}
+        assert listed["EMP002"]["department"] == "Sales"
+        assert listed["EMP004"]["email"] == "four@example.com"
+
+    def test_sync_csv_roster(self, client, create_test_employee):
+        """Test a CSV roster is accepted and returning employees are reactivated."""
+        create_test_employee(employee_id="EMP001", email="one@example.com", is_active=False)
+
+        csv_roster = "employee_id,full_name,email,department\nEMP001,John Doe,one@example.com,Engineering\n"
+        response = client.post(
+            "/api/employees/sync",
+            content=csv_roster,
+            headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["updated"] == [{"employee_id": "EMP001", "fields": ["is_active"]}]
+
+    def test_sync_dry_run(self, client, create_test_employee):
+        """Test a dry run reports changes without writing them."""
+        create_test_employee(employee_id="EMP001", email="one@example.com")
+
+        response = client.post("/api/employees/sync?dry_run=true", json=[
+            self.roster_entry("EMP002", "Joiner", "two@example.com"),
+        ])
+        data = response.json()
+        assert data["created"] == ["EMP002"]
+        assert data["deactivated"] == ["EMP001"]
+
+        assert [e["employee_id"] for e in client.get("/api/employees/").json()] == ["EMP001"]
+
+    def test_sync_keep_missing(self, client, create_test_employee):
+        """Test employees missing from a partial roster can be left active."""
+        create_test_employee(employee_id="EMP001", email="one@example.com")
+
+        response = client.post("/api/employees/sync?deactivate_missing=false", json=[
+            self.roster_entry("EMP002", "Joiner", "two@example.com"),
+        ])
+        assert response.json()["deactivated"] == []
+        assert len(client.get("/api/employees/").json()) == 2
+
+    def test_sync_moves_attendance_rollup(self, client, create_test_employee, create_test_attendance):
+        """Test a department change in the roster moves attendance counts with the employee."""
+        employee = create_test_employee()
+        attendance = create_test_attendance(employee=employee, status=AttendanceStatus.PRESENT)
+
+        client.post("/api/employees/sync", json=[
+            self.roster_entry(employee.employee_id, employee.full_name, employee.email, "Sales"),
+        ])
+
+        departments = client.get("/api/employees/dashboard/stats").json()["departments"]
+        assert departments == [{"name": "Sales", "count": 1}]
+        trend = client.get(f"/api/attendance/trend?department=Sales&start_date={attendance.date}").json()
+        assert trend[0]["present"] == 1
+
+    def test_sync_invalid_entries(self, client):
+        """Test validation errors are reported per roster entry."""
+        response = client.post("/api/employees/sync", json=[
+            self.roster_entry("EMP001", "Valid", "one@example.com"),
+            self.roster_entry("EMP002", "Invalid", "not-an-email"),
+        ])
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"]["errors"][0]["index"] == 1
+
+    def test_sync_email_conflicts(self, client, create_test_employee):
+        """Test duplicate emails, within the roster or against other employees, are rejected."""
+        create_test_employee(employee_id="EMP001", email="taken@example.com")
+
+        response = client.post("/api/employees/sync?deactivate_missing=false", json=[
+            self.roster_entry("EMP002", "Joiner", "taken@example.com"),
+        ])
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = client.post("/api/employees/sync", json=[
+            self.roster_entry("EMP002", "Joiner", "same@example.com"),
+            self.roster_entry("EMP003", "Joiner", "same@example.com"),
+        ])
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_sync_swaps_emails(self, client, create_test_employee):
+        """Test two employees can exchange emails in one sync."""
+        create_test_employee(employee_id="EMP001", full_name="First", email="one@example.com")
+        create_test_employee(employee_id="EMP002", full_name="Second", email="two@example.com")
+
+        response = client.post("/api/employees/sync", json=[
+            self.roster_entry("EMP001", "First", "two@example.com"),
+            self.roster_entry("EMP002", "Second", "one@example.com"),
+        ])
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["fields"] for row in response.json()["updated"]] == [["email"], ["email"]]
+
+        listed = {e["employee_id"]: e["email"] for e in client.get("/api/employees/").json()}
+        assert listed == {"EMP001": "two@example.com", "EMP002": "one@example.com"}
+
+    def test_sync_query_budget(self, client, query_counter, create_test_employee):
+        """Test the sync uses a fixed number of statements regardless of roster size."""
+        create_test_employee(employee_id="EMP000", email="zero@example.com")
+        roster = [self.roster_entry(f"EMP{i:03d}", f"Employee {i}", f"e{i}@example.com") for i in range(1, 51)]
+
+        with query_counter() as queries:
+            response = client.post("/api/employees/sync", json=roster)
+
+        assert len(response.json()["created"]) == 50
+        assert len(queries) <= 5
+
+
+class TestEmployeeSummaries:
+    """Tests for the batch attendance summary endpoint."""
+
+    def test_summaries_for_ids(self, client, create_test_employee, create_test_attendance):
+        """Test summaries are returned for every requested employee, including ones without records."""
+        first = create_test_employee(employee_id="EMP001", email="one@example.com")
+        second = create_test_employee(employee_id="EMP002", email="two@example.com")
+        create_test_attendance(first, date.today(), AttendanceStatus.PRESENT)
+        create_test_attendance(first, date.today() - timedelta(days=1), AttendanceStatus.PRESENT)
+        create_test_attendance(first, date.today() - timedelta(days=2), AttendanceStatus.ABSENT)
+
+        response = client.post("/api/employees/summaries", json={
+            "employee_ids": [second.id, first.id, "non-existent-id"]
+        })
+        assert response.status_code == status.HTTP_200_OK
+
+        data = response.json()
+        assert [summary["employee_code"] for summary in data] == ["EMP001", "EMP002"]
+        assert data[0]["total_present"] == 2
+        assert data[0]["total_absent"] == 1
+        assert data[0]["attendance_rate"] == 66.67
+        assert data[1]["total_present"] == 0
+        assert data[1]["attendance_rate"] == 0
+
+    def test_summaries_match_single_summary(self, client, create_test_employee, create_test_attendance):
+        """Test batch entries have the same shape and values as the per-employee summary."""
+        employee = create_test_employee()
+        create_test_attendance(employee, date.today(), AttendanceStatus.ABSENT)
+
+        batch = client.post("/api/employees/summaries", json={"employee_ids": [employee.id]}).json()
+        single = client.get(f"/api/employees/{employee.id}/summary").json()
+        assert batch == [single]
+
+    def test_summaries_date_range(self, client, create_test_employee, create_test_attendance):
+        """Test only records inside the date range are counted."""
+        employee = create_test_employee()
+        create_test_attendance(employee, date(2026, 1, 31), AttendanceStatus.ABSENT)
+        create_test_attendance(employee, date(2026, 2, 1), AttendanceStatus.PRESENT)
+        create_test_attendance(employee, date(2026, 2, 28), AttendanceStatus.PRESENT)
+        create_test_attendance(employee, date(2026, 3, 1), AttendanceStatus.ABSENT)
+
+        response = client.post("/api/employees/summaries", json={
+            "employee_ids": [employee.id], "start_date": "2026-02-01", "end_date": "2026-02-28"
+        })
+        data = response.json()
+        assert data[0]["total_present"] == 2
+        assert data[0]["total_absent"] == 0
+        assert data[0]["attendance_rate"] == 100.0
+
+    def test_summaries_by_department(self, client, create_test_employee):
+        """Test a department selects its active employees only."""
+        create_test_employee(employee_id="EMP001", email="one@example.com", department="Engineering")
+        create_test_employee(employee_id="EMP002", email="two@example.com", department="Sales")
+        inactive = create_test_employee(employee_id="EMP003", email="three@example.com", department="Engineering")
+        client.delete(f"/api/employees/{inactive.id}")
+
+        response = client.post("/api/employees/summaries", json={"department": "Engineering"})
+        assert [summary["employee_code"] for summary in response.json()] == ["EMP001"]
+
+    def test_summaries_for_ids_skip_inactive(self, client, create_test_employee):
+        """Test requested IDs are filtered to active employees, like a department."""
+        active = create_test_employee(employee_id="EMP001", email="one@example.com")
+        inactive = create_test_employee(employee_id="EMP002", email="two@example.com", is_active=False)
+
+        response = client.post("/api/employees/summaries", json={"employee_ids": [active.id, inactive.id]})
+        assert [summary["employee_code"] for summary in response.json()] == ["EMP001"]
+
+    def test_summaries_single_query(self, client, query_counter, create_test_employee, create_test_attendance):
+        """Test any number of employees is summarized with one statement."""
+        employees = [create_test_employee(employee_id=f"EMP{i:03d}", email=f"e{i}@example.com") for i in range(20)]
+        for employee in employees:
+            create_test_attendance(employee, date.today(), AttendanceStatus.PRESENT)
+        employee_ids = [employee.id for employee in employees]
+
+        with query_counter() as queries:
+            response = client.post("/api/employees/summaries", json={"employee_ids": employee_ids})
+
+        assert len(response.json()) == 20
+        assert len(queries) == 1
+
+    @pytest.mark.parametrize("body", [
+        {},
+        {"employee_ids": []},
+        {"employee_ids": ["id"] * 1001},
+        {"department": "Engineering", "start_date": "2026-02-02", "end_date": "2026-02-01"},
+    ])
+    def test_summaries_validation(self, client, body):
+        """Test requests without a selection, with too many IDs or an inverted range are rejected."""
+        response = client.post("/api/employees/summaries", json=body)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
 
 class TestHealthAndRootEndpoints:
     """Tests for health check and root endpoints."""
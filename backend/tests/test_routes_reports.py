@@ -0,0 +1,176 @@
+"""
+Integration tests for background report jobs.
+"""
+import csv
+import io
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi import status
+
+from app.enums import JobStatus
+from app.jobs import JobRunner, job_runner
+from app.routes import reports
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def jobs(db_session, tmp_path):
+    """Run report jobs against the test database and a temporary result directory."""
+    saved = {field: getattr(job_runner, field) for field in
+             ("session_factory", "read_session_factory", "result_dir", "persist", "max_pending", "result_ttl")}
+    job_runner.session_factory = job_runner.read_session_factory = TestingSessionLocal
+    job_runner.result_dir = tmp_path
+    job_runner.persist = False
+    yield job_runner
+    job_runner.clear()
+    for field, value in saved.items():
+        setattr(job_runner, field, value)
+
+
+def run_report(client, jobs, url, body=None):
+    response = client.post(url, json=body or {})
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()["id"]
+    jobs.wait(job_id, timeout=10)
+    return job_id
+
+
+class TestReportJobs:
+    """Tests for queuing, polling and downloading reports."""
+    
+    def test_attendance_export(self, client, jobs, sample_attendance_records):
+        """Test an export job is queued, reports its progress and serves the CSV."""
+        response = client.post("/api/reports/attendance-export", json={})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job = response.json()
+        assert job["status"] in (JobStatus.QUEUED.value, JobStatus.RUNNING.value, JobStatus.SUCCEEDED.value)
+        assert response.headers["Location"] == f"/api/reports/{job['id']}"
+        jobs.wait(job["id"], timeout=10)
+        
+        polled = client.get(f"/api/reports/{job['id']}").json()
+        assert polled["status"] == JobStatus.SUCCEEDED.value
+        assert polled["done"] == polled["total"] == len(sample_attendance_records)
+        assert polled["progress"] == 100.0
+        assert polled["result_url"] == f"/api/reports/{job['id']}/result"
+        
+        result = client.get(polled["result_url"])
+        assert result.status_code == status.HTTP_200_OK
+        assert result.headers["content-type"].startswith("text/csv")
+        assert "attachment" in result.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(result.text)))
+        assert len(rows) == len(sample_attendance_records)
+    
+    def test_attendance_export_matches_streaming_export(self, client, jobs, sample_attendance_records):
+        """Test the background export produces the same NDJSON as the streaming endpoint."""
+        job_id = run_report(client, jobs, "/api/reports/attendance-export",
+                            {"format": "ndjson", "department": "Engineering"})
+        
+        result = client.get(f"/api/reports/{job_id}/result")
+        streamed = client.get("/api/attendance/export?format=ndjson&department=Engineering")
+        assert result.text == streamed.text
+        assert all(json.loads(line)["department"] == "Engineering" for line in result.text.splitlines())
+    
+    def test_employee_summaries(self, client, jobs, monkeypatch, sample_attendance_records):
+        """Test the summaries report covers every active employee across keyset batches."""
+        monkeypatch.setattr(reports, "SUMMARY_BATCH_SIZE", 2)
+        job_id = run_report(client, jobs, "/api/reports/employee-summaries")
+        
+        summaries = client.get(f"/api/reports/{job_id}/result").json()
+        assert [s["employee_code"] for s in summaries] == ["EMP001", "EMP002", "EMP003"]
+        assert summaries[0]["total_present"] == 2
+        
+        expected = client.post("/api/employees/summaries", json={"department": "Engineering"}).json()
+        job_id = run_report(client, jobs, "/api/reports/employee-summaries", {"department": "Engineering"})
+        assert client.get(f"/api/reports/{job_id}/result").json() == expected
+    
+    def test_result_not_ready(self, client, jobs):
+        """Test the result of an unfinished job is refused with a retry hint."""
+        release = threading.Event()
+        job = jobs.submit("blocking", lambda db, out, progress: release.wait(10), "text/plain", "blocking.txt")
+        try:
+            response = client.get(f"/api/reports/{job['id']}/result")
+            assert response.status_code == status.HTTP_409_CONFLICT
+            assert response.headers["Retry-After"] == "1"
+            assert client.get(f"/api/reports/{job['id']}").headers["Retry-After"] == "1"
+        finally:
+            release.set()
+        jobs.wait(job["id"], timeout=10)
+        assert client.get(f"/api/reports/{job['id']}/result").status_code == status.HTTP_200_OK
+    
+    def test_failed_job(self, client, jobs):
+        """Test a failing job reports a generic error and has no result."""
+        def fail(db, out, progress):
+            raise RuntimeError("connection details")
+        
+        job = jobs.submit("failing", fail, "text/plain", "failing.txt")
+        jobs.wait(job["id"], timeout=10)
+        
+        polled = client.get(f"/api/reports/{job['id']}").json()
+        assert polled["status"] == JobStatus.FAILED.value
+        assert polled["error"] == "Report generation failed"
+        assert polled["result_url"] is None
+        assert client.get(f"/api/reports/{job['id']}/result").status_code == status.HTTP_409_CONFLICT
+    
+    def test_unknown_job(self, client, jobs):
+        """Test unknown job IDs return 404."""
+        assert client.get("/api/reports/missing").status_code == status.HTTP_404_NOT_FOUND
+        assert client.get("/api/reports/missing/result").status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_queue_full(self, client, jobs):
+        """Test submissions beyond the pending limit are refused with 503."""
+        jobs.max_pending = 1
+        release = threading.Event()
+        job = jobs.submit("blocking", lambda db, out, progress: release.wait(10), "text/plain", "blocking.txt")
+        try:
+            response = client.post("/api/reports/employee-summaries", json={})
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert response.headers["Retry-After"] == "30"
+        finally:
+            release.set()
+        jobs.wait(job["id"], timeout=10)
+    
+    def test_expired_results_are_purged(self, client, jobs, multiple_employees):
+        """Test finished jobs and their files are removed once the TTL has passed, on the next poll."""
+        job_id = run_report(client, jobs, "/api/reports/employee-summaries")
+        path = jobs.get(job_id)["result_path"]
+        
+        jobs.result_ttl = 0
+        
+        assert client.get(f"/api/reports/{job_id}").status_code == status.HTTP_404_NOT_FOUND
+        assert not Path(path).exists()
+    
+    def test_failed_submission_frees_its_slot(self, client, jobs, monkeypatch):
+        """Test a job whose state cannot be persisted is not left queued against the pending limit."""
+        jobs.max_pending = 1
+        
+        def broken(job, force=False):
+            raise RuntimeError("database unavailable")
+        
+        with monkeypatch.context() as patch:
+            patch.setattr(jobs, "_persist", broken)
+            with pytest.raises(RuntimeError):
+                jobs.submit("broken", lambda db, out, progress: None, "text/plain", "broken.txt")
+        
+        job = jobs.submit("working", lambda db, out, progress: None, "text/plain", "working.txt")
+        jobs.wait(job["id"], timeout=10)
+        assert jobs.get(job["id"])["status"] == JobStatus.SUCCEEDED
+    
+    def test_persisted_jobs_visible_to_other_runners(self, client, jobs, multiple_employees):
+        """Test persisted job state can be read by another process's runner."""
+        jobs.persist = True
+        job_id = run_report(client, jobs, "/api/reports/employee-summaries")
+        
+        other = JobRunner(persist=True, session_factory=TestingSessionLocal)
+        job = other.get(job_id)
+        assert job["status"] == JobStatus.SUCCEEDED
+        assert job["done"] == job["total"] == 3
+        assert json.loads(open(job["result_path"]).read())[0]["employee_code"] == "EMP001"
+    
+    @pytest.mark.parametrize("url", ["/api/reports/attendance-export", "/api/reports/employee-summaries"])
+    def test_invalid_date_range(self, client, jobs, url):
+        """Test reports reject a start date after the end date."""
+        response = client.post(url, json={"start_date": "2025-02-01", "end_date": "2025-01-01"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
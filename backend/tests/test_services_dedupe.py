@@ -0,0 +1,43 @@
+"""
+Tests for removing duplicate attendance records before the unique index is created.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.enums import AttendanceStatus
+from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceDailySummary
+from app.services import dedupe
+
+
+class TestDedupeAttendance:
+    """Tests for the startup dedupe of attendance records."""
+
+    def test_not_needed_with_unique_index(self, db_session):
+        """Test databases that already have the unique index are left alone."""
+        assert not dedupe.needs_dedupe(db_session.connection())
+
+    def test_keeps_latest_record_and_fixes_rollup(self, db_session, create_test_employee):
+        """Test the latest duplicate survives, the rollup is recomputed and the index is created."""
+        employee = create_test_employee(department="Engineering")
+        today = date.today()
+        earlier = datetime.now(timezone.utc) - timedelta(hours=1)
+        db_session.execute(text(f"DROP INDEX {dedupe.UNIQUE_INDEX}"))
+        db_session.add_all([
+            Attendance(employee_id=employee.id, date=today, status=AttendanceStatus.PRESENT, created_at=earlier),
+            Attendance(employee_id=employee.id, date=today, status=AttendanceStatus.ABSENT),
+            Attendance(employee_id=employee.id, date=today - timedelta(days=1), status=AttendanceStatus.PRESENT),
+        ])
+        db_session.commit()
+        connection = db_session.connection()
+        assert dedupe.needs_dedupe(connection)
+
+        assert dedupe.dedupe_attendance(connection) == 1
+        db_session.commit()
+
+        statuses = dict(db_session.query(Attendance.date, Attendance.status).all())
+        assert statuses == {today: AttendanceStatus.ABSENT, today - timedelta(days=1): AttendanceStatus.PRESENT}
+        summary = db_session.query(AttendanceDailySummary).filter_by(date=today).one()
+        assert (summary.present_count, summary.absent_count) == (0, 1)
+        assert not dedupe.needs_dedupe(db_session.connection())
@@ -0,0 +1,126 @@
+"""
+Tests for the in-process employee cache and its invalidation by employee writes.
+"""
+from datetime import date
+
+from fastapi import status
+
+from app.enums import AttendanceStatus
+from app.services.employee_cache import EmployeeCache, employee_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEmployeeCache:
+    """Tests for LRU, TTL and counters."""
+
+    def test_hit_after_miss(self, db_session, create_test_employee):
+        """Test the second lookup is served from the cache without a query."""
+        employee = create_test_employee()
+        cache = EmployeeCache(maxsize=10, ttl=60)
+
+        first = cache.get(db_session, employee.id)
+        second = cache.get(db_session, employee.id)
+
+        assert first == second
+        assert first.full_name == "John Doe"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_missing_employee_not_cached(self, db_session):
+        """Test lookups for unknown IDs return None and are retried."""
+        cache = EmployeeCache(maxsize=10, ttl=60)
+        assert cache.get(db_session, "missing") is None
+        assert cache.get(db_session, "missing") is None
+        assert cache.stats()["size"] == 0
+        assert cache.misses == 2
+
+    def test_ttl_expiry(self, db_session, create_test_employee):
+        """Test entries are reloaded once their TTL has passed."""
+        employee = create_test_employee()
+        clock = FakeClock()
+        cache = EmployeeCache(maxsize=10, ttl=30, clock=clock)
+
+        cache.get(db_session, employee.id)
+        clock.now = 31
+        cache.get(db_session, employee.id)
+
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_lru_eviction(self, db_session, create_test_employee):
+        """Test the least recently used entry is evicted at capacity."""
+        first = create_test_employee(employee_id="EMP001", email="one@example.com")
+        second = create_test_employee(employee_id="EMP002", email="two@example.com")
+        third = create_test_employee(employee_id="EMP003", email="three@example.com")
+        cache = EmployeeCache(maxsize=2, ttl=60)
+
+        cache.get(db_session, first.id)
+        cache.get(db_session, second.id)
+        cache.get(db_session, first.id)
+        cache.get(db_session, third.id)
+
+        stats = cache.stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+        cache.get(db_session, second.id)
+        assert cache.misses == 4
+
+
+class TestCacheInvalidation:
+    """Tests for write-through invalidation from the employee routes."""
+
+    def test_update_invalidates(self, client, create_test_employee):
+        """Test renaming an employee is visible to cached attendance lookups."""
+        employee = create_test_employee()
+        client.get(f"/api/employees/{employee.id}/summary")
+
+        client.put(f"/api/employees/{employee.id}", json={"full_name": "Jane Roe"})
+
+        response = client.get(f"/api/employees/{employee.id}/summary")
+        assert response.json()["full_name"] == "Jane Roe"
+
+    def test_delete_invalidates(self, client, create_test_employee):
+        """Test a deleted employee can no longer be marked from a stale entry."""
+        employee = create_test_employee()
+        client.get(f"/api/attendance/employee/{employee.id}")
+
+        client.delete(f"/api/employees/{employee.id}")
+
+        response = client.post("/api/attendance/", json={
+            "employee_id": employee.id,
+            "date": str(date.today()),
+            "status": AttendanceStatus.PRESENT.value
+        })
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_roster_deactivation_invalidates(self, client, create_test_employee):
+        """Test employees deactivated by a roster sync cannot be marked present."""
+        employee = create_test_employee()
+        client.get(f"/api/employees/{employee.id}/summary")
+
+        client.post("/api/employees/sync", json=[])
+
+        response = client.post("/api/attendance/", json={
+            "employee_id": employee.id,
+            "date": str(date.today()),
+            "status": AttendanceStatus.PRESENT.value
+        })
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_cache_health(self, client, create_test_employee):
+        """Test hit/miss counters are exposed."""
+        employee = create_test_employee()
+        client.get(f"/api/employees/{employee.id}/summary")
+        client.get(f"/api/attendance/employee/{employee.id}")
+
+        response = client.get("/api/health/cache")
+        assert response.status_code == status.HTTP_200_OK
+        stats = response.json()["employees"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats == employee_cache.stats()
@@ -0,0 +1,254 @@
+"""
+Tests for the attendance partition layout and partition-friendly queries.
+
+Partition maintenance is a no-op on SQLite. `TestPartitionDDL` checks the SQL it
+issues against a recording stand-in for a PostgreSQL connection; `TestPostgresPartitions`
+runs it for real when TEST_POSTGRES_URL points at a scratch PostgreSQL database.
+"""
+import os
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.database import Base
+from app.enums import AttendanceStatus
+from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceDailySummary
+from app.models.employee import Employee
+from app.models.table_version import TableVersion
+from app.services import partitions
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+class RecordingConnection:
+    """Records the SQL it is given, compiled for PostgreSQL, and answers queries with `answer(sql, params)`"""
+
+    dialect = postgresql.dialect()
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        compiled = statement.compile(dialect=self.dialect)
+        sql = str(compiled)
+        self.statements.append((sql, {**compiled.params, **(params or {})}))
+        return RecordedResult(self.answer(sql, {**compiled.params, **(params or {})}))
+
+    def exec_driver_sql(self, sql):
+        self.statements.append((sql, {}))
+
+    def sql(self):
+        return [sql for sql, _ in self.statements]
+
+
+class RecordedResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self.value)
+
+    def __iter__(self):
+        return iter(self.value)
+
+
+def partitioned_database(existing=(), stranded_months=()):
+    """Answers for a partitioned attendance table with the given partitions and default-partition months"""
+    def answer(sql, params):
+        if "pg_partitioned_table" in sql:
+            return True
+        if "pg_inherits" in sql:
+            return set(existing)
+        if "date_trunc" in sql:
+            return list(stranded_months)
+        if "SELECT EXISTS" in sql:
+            return params["start"] in stranded_months
+        return None
+    return answer
+
+
+class TestPartitionLayout:
+    """Tests for the partitioned table definition and month helpers."""
+
+    def test_postgres_table_partitioned_by_date(self):
+        """Test PostgreSQL DDL partitions by date with date in the primary key."""
+        ddl = str(CreateTable(Attendance.__table__).compile(dialect=postgresql.dialect()))
+        assert "PARTITION BY RANGE (date)" in ddl
+        assert "PRIMARY KEY (id, date)" in ddl
+
+    def test_partition_name(self):
+        """Test partitions are named after their month."""
+        assert partitions.partition_name(date(2026, 2, 14)) == "attendance_y2026m02"
+
+    def test_months_ahead_crosses_year(self):
+        """Test the months to create roll over into the next year."""
+        assert partitions.months_ahead(date(2026, 11, 30), 2) == [
+            date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1)
+        ]
+
+    def test_next_month(self):
+        """Test month bounds end on the first day of the following month."""
+        assert partitions.next_month(date(2026, 1, 31)) == date(2026, 2, 1)
+        assert partitions.next_month(date(2026, 12, 1)) == date(2027, 1, 1)
+
+    def test_maintenance_skipped_without_postgres(self, db_session):
+        """Test SQLite keeps a single table and partition maintenance does nothing."""
+        connection = db_session.connection()
+        assert not partitions.is_partitioned(connection)
+        assert partitions.ensure_partitions(connection) == []
+        assert partitions.partition_existing(connection) is False
+
+
+class TestPartitionPruning:
+    """Tests that paged attendance reads bound the partition key."""
+
+    def test_cursor_page_bounds_date(self, client, query_counter, create_test_employee, create_test_attendance):
+        """Test the keyset cursor adds a plain date bound next to the row comparison."""
+        employee = create_test_employee()
+        for days in range(3):
+            create_test_attendance(employee, date.today() - timedelta(days=days))
+
+        first = client.get("/api/attendance/?limit=2")
+        with query_counter() as queries:
+            second = client.get(f"/api/attendance/?limit=2&cursor={first.headers['X-Next-Cursor']}")
+
+        assert [record["date"] for record in second.json()] == [str(date.today() - timedelta(days=2))]
+        assert any("attendance.date <= ?" in statement for statement in queries)
+
+
+class TestPartitionDDL:
+    """Tests for the PostgreSQL statements issued by partition maintenance."""
+
+    def test_ensure_partitions_creates_missing_months(self):
+        """Test missing months are created under the advisory lock, with month bounds."""
+        connection = RecordingConnection(partitioned_database(existing={"attendance_y2026m11"}))
+
+        created = partitions.ensure_partitions(connection, count=2, today=date(2026, 11, 15))
+
+        assert created == ["attendance_y2026m12", "attendance_y2027m01"]
+        statements = connection.sql()
+        assert any("pg_advisory_xact_lock" in sql for sql in statements)
+        assert (
+            "CREATE TABLE attendance_y2026m12 PARTITION OF attendance "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        ) in statements
+        assert not any("attendance_y2026m11" in sql for sql in statements)
+
+    def test_stranded_rows_move_out_of_default_partition(self):
+        """Test a month with rows in the default partition is built aside, filled, then attached."""
+        stranded = date(2025, 3, 1)
+        connection = RecordingConnection(partitioned_database(stranded_months=[stranded]))
+
+        partitions.create_partition(connection, stranded)
+
+        statements = connection.sql()
+        assert statements[1:] == [
+            "CREATE TABLE attendance_y2025m03 (LIKE attendance INCLUDING DEFAULTS)",
+            "INSERT INTO attendance_y2025m03 SELECT * FROM attendance_default WHERE date >= %(start)s AND date < %(end)s",
+            "DELETE FROM attendance_default WHERE date >= %(start)s AND date < %(end)s",
+            "ALTER TABLE attendance ATTACH PARTITION attendance_y2025m03 FOR VALUES FROM ('2025-03-01') TO ('2025-04-01')",
+        ]
+
+    def test_detach_partition_drops_month_and_rollup_rows(self):
+        """Test detaching drops the partition, the month's rollup rows and bumps both versions."""
+        connection = RecordingConnection(partitioned_database(existing={"attendance_y2025m01"}))
+
+        assert partitions.detach_partition(connection, date(2025, 1, 1), drop=True) == "attendance_y2025m01"
+
+        statements = connection.statements
+        sql = [statement for statement, _ in statements]
+        assert "ALTER TABLE attendance DETACH PARTITION attendance_y2025m01" in sql
+        assert "DROP TABLE attendance_y2025m01" in sql
+        summary_delete = next(params for statement, params in statements
+                              if statement.startswith("DELETE FROM attendance_daily_summary"))
+        assert sorted(summary_delete.values()) == [date(2025, 1, 1), date(2025, 2, 1)]
+        bump = next(params for statement, params in statements if statement.startswith("INSERT INTO table_versions"))
+        assert {"attendance", "attendance_daily_summary"} <= set(bump.values())
+
+    def test_detach_unknown_month_is_rejected(self):
+        """Test detaching a month without a partition raises before issuing any DDL."""
+        connection = RecordingConnection(partitioned_database())
+
+        with pytest.raises(ValueError):
+            partitions.detach_partition(connection, date(2025, 1, 1))
+        assert not any("ALTER TABLE" in sql for sql in connection.sql())
+
+
+@pytest.mark.postgresql
+class TestPostgresPartitions:
+    """Partition maintenance against a real PostgreSQL database (set TEST_POSTGRES_URL)."""
+
+    @pytest.fixture
+    def connection(self):
+        if not POSTGRES_URL:
+            pytest.skip("TEST_POSTGRES_URL is not set")
+        engine = create_engine(POSTGRES_URL)
+        # DDL is transactional on PostgreSQL, so everything is rolled back afterwards
+        with engine.connect() as connection:
+            transaction = connection.begin()
+            Base.metadata.create_all(connection)
+            yield connection
+            transaction.rollback()
+        engine.dispose()
+
+    @staticmethod
+    def add_attendance(connection, day):
+        employee_id = str(uuid.uuid4())
+        connection.execute(insert(Employee).values(
+            id=employee_id, employee_id=employee_id[:20], full_name="Partition Test",
+            email=f"{employee_id}@example.com", department="Engineering", is_active=True
+        ))
+        connection.execute(insert(Attendance).values(
+            id=str(uuid.uuid4()), employee_id=employee_id, date=day, status=AttendanceStatus.PRESENT
+        ))
+
+    def test_rows_move_from_default_into_new_partition(self, connection):
+        """Test ensure_partitions creates months ahead and re-homes rows stranded in the default partition."""
+        self.add_attendance(connection, date(2020, 1, 15))
+
+        created = partitions.ensure_partitions(connection, count=1, today=date(2026, 1, 1))
+
+        assert created == ["attendance_y2020m01", "attendance_y2026m01", "attendance_y2026m02"]
+        assert connection.execute(text("SELECT count(*) FROM attendance_y2020m01")).scalar() == 1
+        assert connection.execute(text("SELECT count(*) FROM attendance_default")).scalar() == 0
+        assert partitions.partition_existing(connection) is False
+
+    def test_lookup_with_date_prunes_to_one_partition(self, connection):
+        """Test an (id, date) lookup plans a scan of a single month partition."""
+        partitions.ensure_partitions(connection, count=1, today=date(2026, 1, 1))
+
+        plan = "\n".join(connection.execute(text(
+            "EXPLAIN SELECT * FROM attendance WHERE id = 'x' AND date = '2026-01-10'"
+        )).scalars())
+
+        assert "attendance_y2026m01" in plan
+        assert "attendance_y2026m02" not in plan
+
+    def test_detach_partition_removes_rows_and_rollup(self, connection):
+        """Test detaching a month removes its attendance and only that month's rollup rows."""
+        self.add_attendance(connection, date(2020, 1, 15))
+        self.add_attendance(connection, date(2020, 2, 15))
+        partitions.ensure_partitions(connection, count=0, today=date(2020, 1, 1))
+        connection.execute(insert(AttendanceDailySummary), [
+            {"date": date(2020, 1, 15), "department": "Engineering", "present_count": 1, "absent_count": 0},
+            {"date": date(2020, 2, 15), "department": "Engineering", "present_count": 1, "absent_count": 0},
+        ])
+
+        partitions.detach_partition(connection, date(2020, 1, 1), drop=True)
+
+        assert connection.execute(select(Attendance.date)).scalars().all() == [date(2020, 2, 15)]
+        assert connection.execute(select(AttendanceDailySummary.date)).scalars().all() == [date(2020, 2, 15)]
+        bumped = dict(connection.execute(select(TableVersion.name, TableVersion.version)).all())
+        assert bumped["attendance_daily_summary"] >= 1
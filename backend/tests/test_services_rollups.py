@@ -0,0 +1,90 @@
+"""
+Tests for the incrementally maintained attendance rollup table.
+Verifies the summary stays in sync with attendance writes and can be rebuilt.
+"""
+from datetime import date, timedelta
+from fastapi import status
+
+from app.enums import AttendanceStatus
+from app.models.attendance_summary import AttendanceDailySummary
+from app.services import rollups
+
+
+def summary_counts(db_session):
+    """Return {(date, department): (present, absent)} for non-empty summary rows."""
+    db_session.expire_all()
+    return {
+        (row.date, row.department): (row.present_count, row.absent_count)
+        for row in db_session.query(AttendanceDailySummary).all()
+        if row.present_count or row.absent_count
+    }
+
+
+class TestRollupSync:
+    """Tests for keeping attendance_daily_summary in sync with writes."""
+
+    def test_mark_attendance_increments_rollup(self, client, db_session, create_test_employee):
+        """Test marking attendance adds to the employee's department bucket."""
+        employee = create_test_employee(department="Engineering")
+
+        response = client.post("/api/attendance/", json={
+            "employee_id": employee.id,
+            "date": str(date.today()),
+            "status": AttendanceStatus.PRESENT.value
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+
+        assert summary_counts(db_session) == {(date.today(), "Engineering"): (1, 0)}
+
+    def test_update_attendance_moves_count(self, client, db_session, create_test_attendance):
+        """Test changing status moves the count between present and absent."""
+        attendance = create_test_attendance(status=AttendanceStatus.PRESENT)
+
+        response = client.put(f"/api/attendance/{attendance.id}?status=Absent")
+        assert response.status_code == status.HTTP_200_OK
+
+        assert summary_counts(db_session) == {(date.today(), "Engineering"): (0, 1)}
+
+    def test_delete_attendance_decrements_rollup(self, client, db_session, create_test_attendance):
+        """Test deleting attendance removes it from the rollup."""
+        attendance = create_test_attendance(status=AttendanceStatus.ABSENT)
+
+        response = client.delete(f"/api/attendance/{attendance.id}")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        assert summary_counts(db_session) == {}
+
+    def test_department_change_reassigns_history(self, client, db_session, create_test_employee, create_test_attendance):
+        """Test moving an employee to another department moves their counts."""
+        employee = create_test_employee(department="Engineering")
+        yesterday = date.today() - timedelta(days=1)
+        create_test_attendance(employee, date.today(), AttendanceStatus.PRESENT)
+        create_test_attendance(employee, yesterday, AttendanceStatus.ABSENT)
+
+        response = client.put(f"/api/employees/{employee.id}", json={"department": "Sales"})
+        assert response.status_code == status.HTTP_200_OK
+
+        assert summary_counts(db_session) == {
+            (date.today(), "Sales"): (1, 0),
+            (yesterday, "Sales"): (0, 1),
+        }
+
+    def test_employee_delete_removes_counts(self, client, db_session, sample_attendance_records, multiple_employees):
+        """Test deleting an employee removes their cascaded attendance from the rollup."""
+        response = client.delete(f"/api/employees/{multiple_employees[0].id}")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        assert summary_counts(db_session) == {
+            (date.today(), "Marketing"): (0, 1),
+            (date.today() - timedelta(days=1), "Engineering"): (1, 0),
+        }
+
+    def test_rebuild_matches_incremental_state(self, db_session, sample_data):
+        """Test a full rebuild reproduces the incrementally maintained counts."""
+        sample_data(employee_count=8)
+        incremental = summary_counts(db_session)
+
+        rows = rollups.rebuild(db_session)
+
+        assert rows == len(incremental)
+        assert summary_counts(db_session) == incremental
@@ -0,0 +1,91 @@
+"""
+Tests for the slow-query log and its EXPLAIN capture.
+"""
+import logging
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app.slow_queries import redact, slow_query_log
+
+
+@pytest.fixture
+def slow_log(caplog):
+    """Log every statement as slow for the duration of a test."""
+    saved = (slow_query_log.threshold_ms, slow_query_log.sample_rate, slow_query_log.explain)
+    slow_query_log.threshold_ms, slow_query_log.sample_rate, slow_query_log.explain = 0, 1.0, True
+    slow_query_log.reset()
+    caplog.set_level(logging.WARNING, logger="app.slow_queries")
+    yield caplog
+    slow_query_log.threshold_ms, slow_query_log.sample_rate, slow_query_log.explain = saved
+    slow_query_log.reset()
+
+
+def slow_records(caplog, fragment):
+    return [record for record in caplog.records
+            if record.name == "app.slow_queries" and fragment in record.statement]
+
+
+class TestRedact:
+    """Tests for bound parameter redaction."""
+
+    def test_strings_are_redacted(self):
+        """Test strings and bytes are replaced by their type and length, other values kept."""
+        assert redact(("alice@example.com", 3, None, date(2025, 1, 2), b"ab")) == (
+            "<str:17>", 3, None, date(2025, 1, 2), "<bytes:2>"
+        )
+
+    def test_named_parameters(self):
+        """Test dict parameters keep their keys."""
+        assert redact({"email": "bob@example.com", "limit": 10}) == {"email": "<str:15>", "limit": 10}
+
+
+class TestSlowQueryLog:
+    """Tests for slow statement logging."""
+
+    def test_logs_route_parameters_and_plan(self, client, slow_log, create_test_employee):
+        """Test a slow statement is logged with its route, redacted parameters and query plan."""
+        employee = create_test_employee()
+        slow_log.clear()
+
+        client.get(f"/api/employees/{employee.id}")
+
+        record = slow_records(slow_log, "FROM employees")[0]
+        assert record.route == "GET /api/employees/{employee_id}"
+        assert employee.id not in str(record.parameters)
+        assert f"<str:{len(employee.id)}>" in str(record.parameters)
+        assert any("employees" in line for line in record.plan)
+        assert "Plan:" in record.getMessage()
+
+    def test_below_threshold_not_logged(self, client, slow_log, multiple_employees):
+        """Test statements faster than the threshold are not logged."""
+        slow_query_log.threshold_ms = 60_000
+        client.get("/api/employees/")
+
+        assert not [record for record in slow_log.records if record.name == "app.slow_queries"]
+
+    def test_sampling(self, client, slow_log, multiple_employees):
+        """Test a sample rate of zero logs nothing."""
+        slow_query_log.sample_rate = 0.0
+        client.get("/api/employees/")
+
+        assert not [record for record in slow_log.records if record.name == "app.slow_queries"]
+
+    def test_plan_captured_once_per_interval(self, client, slow_log, multiple_employees):
+        """Test a repeated statement is logged each time but explained once per interval."""
+        client.get("/api/employees/?department=Engineering")
+        client.get("/api/employees/?department=Marketing")
+
+        records = slow_records(slow_log, "lower(employees.department)")
+        assert len(records) == 2
+        assert records[0].plan is not None
+        assert records[1].plan is None
+
+    def test_unexplainable_statement(self, db_session, slow_log):
+        """Test statements EXPLAIN does not accept are logged without a plan and outside any route."""
+        db_session.execute(text("PRAGMA user_version"))
+
+        record = slow_records(slow_log, "PRAGMA user_version")[0]
+        assert record.plan is None
+        assert record.route == "-"
@@ -7,6 +7,8 @@ const api = axios.create({
   headers: {
     'Content-Type': 'application/json',
   },
+  // Sends the backend's read-replica stickiness cookie back after writes
+  withCredentials: true,
 });
 
 // Employee APIs
@@ -17,6 +19,7 @@ export const employeeService = {
   update: (id, data) => api.put(`/api/employees/${id}`, data),
   delete: (id) => api.delete(`/api/employees/${id}`),
   getSummary: (id) => api.get(`/api/employees/${id}/summary`),
+  getSummaries: (data) => api.post('/api/employees/summaries', data),
   getDashboardStats: () => api.get('/api/employees/dashboard/stats'),
 };
 
@@ -28,6 +31,15 @@ export const attendanceService = {
   update: (id, status) => api.put(`/api/attendance/${id}?status=${status}`),
   delete: (id) => api.delete(`/api/attendance/${id}`),
   getToday: () => api.get('/api/attendance/today'),
+  getMatrix: (params = {}) => api.get('/api/attendance/matrix', { params }),
+};
+
+// Background report APIs: create a job, poll it, then download the result
+export const reportService = {
+  createAttendanceExport: (data = {}) => api.post('/api/reports/attendance-export', data),
+  createEmployeeSummaries: (data = {}) => api.post('/api/reports/employee-summaries', data),
+  getJob: (id) => api.get(`/api/reports/${id}`),
+  getResult: (id) => api.get(`/api/reports/${id}/result`, { responseType: 'blob' }),
 };
 
 export default api;
@@ -1,6 +1,6 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest';
 import axios from 'axios';
-import { employeeService, attendanceService } from '../../services/api';
+import { employeeService, attendanceService, reportService } from '../../services/api';
 
 // Mock axios
 vi.mock('axios', () => {
@@ -122,6 +122,24 @@ describe('API Service', () => {
       });
     });
 
+    describe('getSummaries', () => {
+      it('calls POST /api/employees/summaries', async () => {
+        const request = { employee_ids: ['123', '456'], start_date: '2026-02-01' };
+        const mockResponse = { 
+          data: [
+            { employee_id: '123', total_present: 10, attendance_rate: 90 },
+            { employee_id: '456', total_present: 8, attendance_rate: 80 }
+          ] 
+        };
+        axios.post.mockResolvedValueOnce(mockResponse);
+
+        const result = await employeeService.getSummaries(request);
+
+        expect(axios.post).toHaveBeenCalledWith('/api/employees/summaries', request);
+        expect(result).toEqual(mockResponse);
+      });
+    });
+
     describe('getDashboardStats', () => {
       it('calls GET /api/employees/dashboard/stats', async () => {
         const mockResponse = { 
@@ -242,5 +260,71 @@ describe('API Service', () => {
         expect(result).toEqual(mockResponse);
       });
     });
+
+    describe('getMatrix', () => {
+      it('calls GET /api/attendance/matrix with month and department', async () => {
+        const mockResponse = { data: { month: '2026-02', days: 28, employees: [] } };
+        axios.get.mockResolvedValueOnce(mockResponse);
+
+        const result = await attendanceService.getMatrix({ month: '2026-02', department: 'Engineering' });
+
+        expect(axios.get).toHaveBeenCalledWith('/api/attendance/matrix', {
+          params: { month: '2026-02', department: 'Engineering' }
+        });
+        expect(result).toEqual(mockResponse);
+      });
+    });
+  });
+
+  describe('reportService', () => {
+    describe('createAttendanceExport', () => {
+      it('calls POST /api/reports/attendance-export with filters', async () => {
+        const mockResponse = { data: { id: 'job-1', status: 'queued' } };
+        axios.post.mockResolvedValueOnce(mockResponse);
+
+        const result = await reportService.createAttendanceExport({ format: 'csv', start_date: '2026-01-01' });
+
+        expect(axios.post).toHaveBeenCalledWith('/api/reports/attendance-export', {
+          format: 'csv', start_date: '2026-01-01'
+        });
+        expect(result).toEqual(mockResponse);
+      });
+    });
+
+    describe('createEmployeeSummaries', () => {
+      it('calls POST /api/reports/employee-summaries', async () => {
+        const mockResponse = { data: { id: 'job-2', status: 'queued' } };
+        axios.post.mockResolvedValueOnce(mockResponse);
+
+        const result = await reportService.createEmployeeSummaries({ department: 'Engineering' });
+
+        expect(axios.post).toHaveBeenCalledWith('/api/reports/employee-summaries', { department: 'Engineering' });
+        expect(result).toEqual(mockResponse);
+      });
+    });
+
+    describe('getJob', () => {
+      it('calls GET /api/reports/:id', async () => {
+        const mockResponse = { data: { id: 'job-1', status: 'running', progress: 40 } };
+        axios.get.mockResolvedValueOnce(mockResponse);
+
+        const result = await reportService.getJob('job-1');
+
+        expect(axios.get).toHaveBeenCalledWith('/api/reports/job-1');
+        expect(result).toEqual(mockResponse);
+      });
+    });
+
+    describe('getResult', () => {
+      it('calls GET /api/reports/:id/result as a blob', async () => {
+        const mockResponse = { data: new Blob(['id,date\n']) };
+        axios.get.mockResolvedValueOnce(mockResponse);
+
+        const result = await reportService.getResult('job-1');
+
+        expect(axios.get).toHaveBeenCalledWith('/api/reports/job-1/result', { responseType: 'blob' });
+        expect(result).toEqual(mockResponse);
+      });
+    });
   });
 });